@@ -1,5 +1,7 @@
 import streamlit as st
 from utils.carga_datos import cargar_datos_loteria
+from utils.agregados import obtener_cubo_agregados
+from utils.estadisticas import obtener_resumen_estadistico
 
 st.set_page_config(
     page_title="Proyecto Integrador – Lotería Medellín",
@@ -21,6 +23,7 @@ identificando patrones en números ganadores, series, tendencias temporales y ge
 # Cargar datos para mostrar métricas clave
 try:
     df = cargar_datos_loteria()
+    estadisticas = obtener_resumen_estadistico(df)
     
     # Métricas clave en la portada
     st.header("📊 Métricas Clave del Proyecto")
@@ -30,20 +33,20 @@ try:
     with col1:
         st.metric(
             label="Total de Sorteos",
-            value=f"{len(df):,}",
-            delta=f"{df['año'].nunique()} años"
+            value=f"{estadisticas.filas:,}",
+            delta=f"{estadisticas.años} años"
         )
     
     with col2:
         st.metric(
             label="Periodo Analizado",
-            value=f"{df['año'].min()}-{df['año'].max()}",
-            delta=f"{df['año'].max() - df['año'].min()} años"
+            value=f"{estadisticas.año_min}-{estadisticas.año_max}",
+            delta=f"{estadisticas.año_max - estadisticas.año_min} años"
         )
     
     with col3:
-        numero_mas_comun = df['número'].mode()[0]
-        frecuencia = (df['número'] == numero_mas_comun).sum()
+        numero_mas_comun = estadisticas.numero.moda
+        frecuencia = estadisticas.numero.frecuencia_moda
         st.metric(
             label="Número Más Frecuente",
             value=f"{numero_mas_comun:04d}",
@@ -51,8 +54,8 @@ try:
         )
     
     with col4:
-        serie_mas_comun = df['serie'].mode()[0]
-        frecuencia_serie = (df['serie'] == serie_mas_comun).sum()
+        serie_mas_comun = estadisticas.serie.moda
+        frecuencia_serie = estadisticas.serie.frecuencia_moda
         st.metric(
             label="Serie Más Frecuente",
             value=f"{serie_mas_comun}",
@@ -90,11 +93,11 @@ try:
     with col2:
         st.info(f"""
         **Información del Dataset:**
-        - 📅 Periodo: {df['fecha'].min().strftime('%Y-%m-%d')} a {df['fecha'].max().strftime('%Y-%m-%d')}
-        - 📊 Total Sorteos: {len(df):,}
+        - 📅 Periodo: {estadisticas.fecha_min.strftime('%Y-%m-%d')} a {estadisticas.fecha_max.strftime('%Y-%m-%d')}
+        - 📊 Total Sorteos: {estadisticas.filas:,}
         - 🎲 Rango Números: 0-9999
-        - 🎫 Rango Series: {df['serie'].min()}-{df['serie'].max()}
-        - 📈 Años Cobertura: {df['año'].nunique()}
+        - 🎫 Rango Series: {estadisticas.serie.minimo}-{estadisticas.serie.maximo}
+        - 📈 Años Cobertura: {estadisticas.años}
         """)
     
     # Estadísticas rápidas
@@ -104,23 +107,23 @@ try:
     
     with col1:
         st.subheader("Números")
-        st.write(f"**Promedio:** {df['número'].mean():.0f}")
-        st.write(f"**Mediana:** {df['número'].median():.0f}")
-        st.write(f"**Desv. Estándar:** {df['número'].std():.0f}")
-        st.write(f"**Mínimo:** {df['número'].min()}")
-        st.write(f"**Máximo:** {df['número'].max()}")
+        st.write(f"**Promedio:** {estadisticas.numero.media:.0f}")
+        st.write(f"**Mediana:** {estadisticas.numero.mediana:.0f}")
+        st.write(f"**Desv. Estándar:** {estadisticas.numero.desviacion:.0f}")
+        st.write(f"**Mínimo:** {estadisticas.numero.minimo}")
+        st.write(f"**Máximo:** {estadisticas.numero.maximo}")
     
     with col2:
         st.subheader("Series")
-        st.write(f"**Promedio:** {df['serie'].mean():.0f}")
-        st.write(f"**Mediana:** {df['serie'].median():.0f}")
-        st.write(f"**Desv. Estándar:** {df['serie'].std():.0f}")
-        st.write(f"**Mínimo:** {df['serie'].min()}")
-        st.write(f"**Máximo:** {df['serie'].max()}")
+        st.write(f"**Promedio:** {estadisticas.serie.media:.0f}")
+        st.write(f"**Mediana:** {estadisticas.serie.mediana:.0f}")
+        st.write(f"**Desv. Estándar:** {estadisticas.serie.desviacion:.0f}")
+        st.write(f"**Mínimo:** {estadisticas.serie.minimo}")
+        st.write(f"**Máximo:** {estadisticas.serie.maximo}")
     
     with col3:
         st.subheader("Sorteos por Año")
-        sorteos_año = df.groupby('año').size()
+        sorteos_año = obtener_cubo_agregados(df)['por_año']
         st.write(f"**Promedio:** {sorteos_año.mean():.1f}")
         st.write(f"**Año con más:** {sorteos_año.idxmax()} ({sorteos_año.max()})")
         st.write(f"**Año con menos:** {sorteos_año.idxmin()} ({sorteos_año.min()})")
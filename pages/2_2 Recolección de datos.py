@@ -1,5 +1,6 @@
 import streamlit as st
 from utils.carga_datos import cargar_datos_loteria, obtener_metadata_dataset
+from utils.estadisticas import obtener_resumen_estadistico
 import pandas as pd
 
 st.title("📂 2. Recolección de Datos")
@@ -17,6 +18,7 @@ st.markdown("---")
 try:
     df = cargar_datos_loteria()
     metadata = obtener_metadata_dataset()
+    estadisticas = obtener_resumen_estadistico(df)
     
     st.header("📊 Fuente de Datos")
     
@@ -52,14 +54,14 @@ try:
             "Variable": "fecha",
             "Tipo": "datetime",
             "Descripción": "Fecha en que se realizó el sorteo",
-            "Rango": f"{df['fecha'].min().strftime('%Y-%m-%d')} a {df['fecha'].max().strftime('%Y-%m-%d')}",
+            "Rango": f"{estadisticas.fecha_min.strftime('%Y-%m-%d')} a {estadisticas.fecha_max.strftime('%Y-%m-%d')}",
             "Ejemplo": df['fecha'].iloc[0].strftime('%Y-%m-%d')
         },
         {
             "Variable": "sorteo",
             "Tipo": "int",
             "Descripción": "Número consecutivo del sorteo",
-            "Rango": f"{df['sorteo'].min()} a {df['sorteo'].max()}",
+            "Rango": f"{estadisticas.sorteo.minimo} a {estadisticas.sorteo.maximo}",
             "Ejemplo": str(df['sorteo'].iloc[0])
         },
         {
@@ -73,7 +75,7 @@ try:
             "Variable": "serie",
             "Tipo": "int",
             "Descripción": "Serie del billete ganador",
-            "Rango": f"{df['serie'].min()} a {df['serie'].max()}",
+            "Rango": f"{estadisticas.serie.minimo} a {estadisticas.serie.maximo}",
             "Ejemplo": str(df['serie'].iloc[0])
         }
     ])
@@ -89,7 +91,7 @@ try:
     with col1:
         st.metric(
             label="Completitud",
-            value=f"{((1 - df.isnull().sum().sum() / (len(df) * len(df.columns))) * 100):.1f}%",
+            value=f"{estadisticas.completitud:.1f}%",
             delta="Excelente"
         )
     
@@ -2,6 +2,10 @@ import streamlit as st
 from utils.carga_datos import cargar_datos_loteria
 from utils.eda_helpers import *
 from utils.graficos import *
+from utils.agregados import obtener_cubo_agregados
+from utils.estadisticas import obtener_resumen_estadistico
+from utils.aleatoriedad import conteos_digitos_por_grupo
+from utils.digitos import COLUMNAS_DIGITOS
 import pandas as pd
 
 st.title("🔍 3. Exploración Inicial y Comprensión de los Datos (EDA)")
@@ -15,6 +19,7 @@ antes de cualquier modelado o análisis avanzado.
 
 try:
     df = cargar_datos_loteria()
+    estadisticas = obtener_resumen_estadistico(df)
     
     # Tabs para organizar el EDA
     tab1, tab2, tab3, tab4, tab5 = st.tabs([
@@ -37,9 +42,9 @@ try:
         with col2:
             st.metric("Columnas", resumen['Columnas'])
         with col3:
-            st.metric("Años", df['año'].nunique())
+            st.metric("Años", estadisticas.años)
         with col4:
-            st.metric("Periodo", f"{df['año'].min()}-{df['año'].max()}")
+            st.metric("Periodo", f"{estadisticas.año_min}-{estadisticas.año_max}")
         
         st.subheader("Tipos de Datos")
         tipos_df = pd.DataFrame({
@@ -94,6 +99,15 @@ try:
             st.warning(f"Se detectaron {outliers_info['cantidad_outliers']} outliers ({outliers_info['porcentaje_outliers']:.2f}%)")
         else:
             st.success("No se detectaron outliers significativos")
+        
+        st.markdown("**Comparación de métodos de detección**")
+        comparacion_outliers = pd.DataFrame({
+            metodo.upper(): detectar_outliers(df, ['número', 'serie', 'suma_digitos'], metodo=metodo).conteos
+            for metodo in FACTORES_OUTLIERS
+        })
+        comparacion_outliers.index.name = 'Columna'
+        st.dataframe(comparacion_outliers.reset_index(), use_container_width=True, hide_index=True)
+        st.caption("IQR: fuera de 1.5·IQR · MAD: z modificado > 3.5 · Z-SCORE: |z| > 3")
     
     # TAB 3: Análisis de Series
     with tab3:
@@ -113,8 +127,9 @@ try:
         
         # Estadísticas de series
         st.subheader("📊 Estadísticas de Series")
-        stats_series = estadisticas_por_grupo(df, 'rango_serie', 'serie')
+        stats_series = obtener_estadisticas_por_grupo(df, 'rango_serie', 'serie', intervalos=True)
         st.dataframe(stats_series, use_container_width=True, hide_index=True)
+        st.caption("Columnas *_ic_inf / *_ic_sup: intervalos de confianza bootstrap al 95% (10,000 réplicas)")
     
     # TAB 4: Análisis Temporal
     with tab4:
@@ -151,6 +166,23 @@ try:
             st.info(f"Se detectó una tendencia {tendencias['tendencia']} estadísticamente significativa (p-value: {tendencias['p_valor']:.4f})")
         else:
             st.success(f"No hay tendencia significativa en los números (p-value: {tendencias['p_valor']:.4f})")
+        
+        st.markdown("**Tendencias de todas las series** (regresión lineal sobre el orden de los sorteos)")
+        tendencias_series = tendencias_por_grupo(df, 'fecha', ['número', 'serie'] + COLUMNAS_DIGITOS + ['suma_digitos'])
+        tendencias_series = tendencias_series[['columna', 'tendencia', 'pendiente', 'r_cuadrado', 'p_valor']]
+        tendencias_series.columns = ['Serie', 'Tendencia', 'Pendiente', 'R²', 'P-value']
+        st.dataframe(tendencias_series.round(4), use_container_width=True, hide_index=True)
+        
+        # Proporción anual de cada dígito en cada posición: 40 series ajustadas a la vez
+        años_digitos, conteos_digitos = conteos_digitos_por_grupo(df, 'año')
+        proporciones = conteos_digitos / conteos_digitos.sum(axis=2, keepdims=True)
+        tendencias_digitos = tendencias_lineales(proporciones.reshape(len(años_digitos), -1).T, x=np.asarray(años_digitos))
+        significativas = int((tendencias_digitos['p_valor'] < 0.05).sum())
+        st.metric(
+            "Dígitos con tendencia anual significativa",
+            f"{significativas} de {len(tendencias_digitos)}",
+            help="Proporción anual de cada dígito (0-9) en cada posición; con 40 pruebas se esperan ~2 por azar al 5%"
+        )
     
     # TAB 5: Análisis Estadístico
     with tab5:
@@ -165,8 +197,9 @@ try:
         st.dataframe(freq_series.head(20), use_container_width=True, hide_index=True)
         
         st.subheader("Análisis por Rango de Números")
-        stats_rangos = estadisticas_por_grupo(df, 'rango_numero', 'número')
+        stats_rangos = obtener_estadisticas_por_grupo(df, 'rango_numero', 'número', intervalos=True)
         st.dataframe(stats_rangos, use_container_width=True, hide_index=True)
+        st.caption("Columnas *_ic_inf / *_ic_sup: intervalos de confianza bootstrap al 95% (10,000 réplicas)")
         
         st.subheader("Valores Faltantes")
         faltantes = detectar_valores_faltantes(df)
@@ -183,25 +216,25 @@ try:
     st.markdown(f"""
     ### Hallazgos Principales:
     
-    1. **Cobertura de Datos**: El dataset contiene **{len(df):,} sorteos** desde **{df['año'].min()}** hasta **{df['año'].max()}** ({df['año'].nunique()} años).
+    1. **Cobertura de Datos**: El dataset contiene **{estadisticas.filas:,} sorteos** desde **{estadisticas.año_min}** hasta **{estadisticas.año_max}** ({estadisticas.años} años).
     
     2. **Distribución de Números**: 
        - Rango: 0-9999
-       - Promedio: {df['número'].mean():.0f}
-       - Mediana: {df['número'].median():.0f}
-       - Números únicos: {df['número'].nunique():,}
+       - Promedio: {estadisticas.numero.media:.0f}
+       - Mediana: {estadisticas.numero.mediana:.0f}
+       - Números únicos: {estadisticas.numero.distintos:,}
     
     3. **Distribución de Series**:
-       - Rango: {df['serie'].min()}-{df['serie'].max()}
-       - Promedio: {df['serie'].mean():.0f}
-       - Series únicas: {df['serie'].nunique():,}
+       - Rango: {estadisticas.serie.minimo}-{estadisticas.serie.maximo}
+       - Promedio: {estadisticas.serie.media:.0f}
+       - Series únicas: {estadisticas.serie.distintos:,}
     
     4. **Patrones Temporales**:
-       - Sorteos por año: {df.groupby('año').size().mean():.1f} (promedio)
-       - Día más común: {df['dia_semana_nombre'].mode()[0]}
+       - Sorteos por año: {obtener_cubo_agregados(df)['por_año'].mean():.1f} (promedio)
+       - Día más común: {estadisticas.dia_mas_comun}
     
     5. **Calidad de Datos**: 
-       - Completitud: {((1 - df.isnull().sum().sum() / (len(df) * len(df.columns))) * 100):.1f}%
+       - Completitud: {estadisticas.completitud:.1f}%
        - Sin duplicados
     """)
     
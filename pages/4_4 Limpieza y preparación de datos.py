@@ -1,5 +1,5 @@
 import streamlit as st
-from utils.carga_datos import cargar_datos_loteria
+from utils.carga_datos import cargar_datos_loteria, reporte_memoria
 from utils.validaciones import validar_columnas
 import pandas as pd
 
@@ -130,6 +130,11 @@ try:
                 "Transformación": "Limpieza de nulos",
                 "Descripción": "Eliminar filas con valores nulos en columnas clave",
                 "Estado": "✅ Aplicada"
+            },
+            {
+                "Transformación": "Esquema compacto",
+                "Descripción": "Enteros pequeños, categorías y booleanos según el rango de cada columna",
+                "Estado": "✅ Aplicada"
             }
         ]
         
@@ -145,6 +150,11 @@ try:
         with col3:
             completitud = (1 - df.isnull().sum().sum() / (len(df) * len(df.columns))) * 100
             st.metric("Completitud", f"{completitud:.1f}%")
+        
+        st.subheader("Uso de Memoria")
+        memoria = reporte_memoria(df)
+        st.metric("Memoria Total", f"{memoria['bytes'].sum() / 1024:.1f} KB")
+        st.dataframe(memoria, use_container_width=True, hide_index=True)
     
     # TAB 3: Features Derivadas
     with tab3:
@@ -169,11 +179,18 @@ try:
         
         st.subheader("2. Features de Números")
         features_numeros = [
-            {"Feature": "primer_digito", "Descripción": "Primer dígito del número", "Ejemplo": str(df['primer_digito'].iloc[0])},
+            {"Feature": "primer_digito", "Descripción": "Primer dígito del número (relleno a 4 cifras, 0123 → 0)", "Ejemplo": str(df['primer_digito'].iloc[0])},
+            {"Feature": "segundo_digito", "Descripción": "Segundo dígito del número", "Ejemplo": str(df['segundo_digito'].iloc[0])},
+            {"Feature": "tercer_digito", "Descripción": "Tercer dígito del número", "Ejemplo": str(df['tercer_digito'].iloc[0])},
             {"Feature": "ultimo_digito", "Descripción": "Último dígito del número", "Ejemplo": str(df['ultimo_digito'].iloc[0])},
             {"Feature": "suma_digitos", "Descripción": "Suma de todos los dígitos", "Ejemplo": str(df['suma_digitos'].iloc[0])},
+            {"Feature": "producto_digitos", "Descripción": "Producto de todos los dígitos", "Ejemplo": str(df['producto_digitos'].iloc[0])},
+            {"Feature": "digitos_distintos", "Descripción": "Cantidad de dígitos distintos (1-4)", "Ejemplo": str(df['digitos_distintos'].iloc[0])},
+            {"Feature": "max_repeticiones", "Descripción": "Máximo de veces que se repite un dígito", "Ejemplo": str(df['max_repeticiones'].iloc[0])},
+            {"Feature": "tiene_digitos_repetidos", "Descripción": "True si algún dígito se repite", "Ejemplo": str(df['tiene_digitos_repetidos'].iloc[0])},
+            {"Feature": "es_palindromo", "Descripción": "True si el número se lee igual al revés (ej. 1221)", "Ejemplo": str(df['es_palindromo'].iloc[0])},
             {"Feature": "rango_numero", "Descripción": "Categoría del número (0-2500, 2500-5000, etc.)", "Ejemplo": str(df['rango_numero'].iloc[0])},
-            {"Feature": "numero_par", "Descripción": "1 si es par, 0 si es impar", "Ejemplo": str(df['numero_par'].iloc[0])}
+            {"Feature": "numero_par", "Descripción": "True si es par, False si es impar", "Ejemplo": str(df['numero_par'].iloc[0])}
         ]
         st.dataframe(pd.DataFrame(features_numeros), use_container_width=True, hide_index=True)
         
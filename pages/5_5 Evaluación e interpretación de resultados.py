@@ -2,6 +2,14 @@ import streamlit as st
 from utils.carga_datos import cargar_datos_loteria
 from utils.eda_helpers import *
 from utils.graficos import *
+from utils.agregados import obtener_cubo_agregados
+from utils.estadisticas import obtener_resumen_estadistico
+from utils.simulacion import pvalores_monte_carlo_cacheado
+from utils.aleatoriedad import bateria_aleatoriedad, uniformidad_digitos_por_grupo
+from utils.deriva import deriva_por_grupo
+from utils.transiciones import obtener_transiciones, conteos_transicion, independencia_transiciones
+from utils.digitos import COLUMNAS_DIGITOS
+from utils.autocorrelacion import obtener_autocorrelaciones, resumen_autocorrelaciones, COLUMNAS_AUTOCORRELACION
 import pandas as pd
 from scipy import stats
 
@@ -16,6 +24,7 @@ basados en los datos históricos de la lotería.
 
 try:
     df = cargar_datos_loteria()
+    estadisticas = obtener_resumen_estadistico(df)
     
     # Tabs para organizar
     tab1, tab2, tab3, tab4 = st.tabs([
@@ -36,12 +45,12 @@ try:
         with col1:
             st.metric(
                 "Cobertura Temporal",
-                f"{df['año'].nunique()} años",
-                delta=f"{df['año'].min()}-{df['año'].max()}"
+                f"{estadisticas.años} años",
+                delta=f"{estadisticas.año_min}-{estadisticas.año_max}"
             )
         
         with col2:
-            completitud = (1 - df.isnull().sum().sum() / (len(df) * len(df.columns))) * 100
+            completitud = estadisticas.completitud
             st.metric(
                 "Completitud",
                 f"{completitud:.1f}%",
@@ -49,7 +58,7 @@ try:
             )
         
         with col3:
-            numeros_unicos = df['número'].nunique()
+            numeros_unicos = estadisticas.numero.distintos
             st.metric(
                 "Números Únicos",
                 f"{numeros_unicos:,}",
@@ -57,7 +66,7 @@ try:
             )
         
         with col4:
-            series_unicas = df['serie'].nunique()
+            series_unicas = estadisticas.serie.distintos
             st.metric(
                 "Series Únicas",
                 f"{series_unicas:,}",
@@ -66,7 +75,7 @@ try:
         
         st.subheader("Frecuencia de Sorteos")
         
-        sorteos_año = df.groupby('año').size()
+        sorteos_año = obtener_cubo_agregados(df)['por_año']
         
         col1, col2, col3 = st.columns(3)
         
@@ -87,17 +96,17 @@ try:
         
         with col1:
             st.write("**Estadísticas de Números**")
-            st.write(f"Media: {df['número'].mean():.2f}")
-            st.write(f"Mediana: {df['número'].median():.0f}")
-            st.write(f"Desv. Estándar: {df['número'].std():.2f}")
-            st.write(f"Coef. Variación: {(df['número'].std()/df['número'].mean()*100):.2f}%")
+            st.write(f"Media: {estadisticas.numero.media:.2f}")
+            st.write(f"Mediana: {estadisticas.numero.mediana:.0f}")
+            st.write(f"Desv. Estándar: {estadisticas.numero.desviacion:.2f}")
+            st.write(f"Coef. Variación: {estadisticas.numero.coef_variacion:.2f}%")
         
         with col2:
             st.write("**Estadísticas de Series**")
-            st.write(f"Media: {df['serie'].mean():.2f}")
-            st.write(f"Mediana: {df['serie'].median():.0f}")
-            st.write(f"Desv. Estándar: {df['serie'].std():.2f}")
-            st.write(f"Coef. Variación: {(df['serie'].std()/df['serie'].mean()*100):.2f}%")
+            st.write(f"Media: {estadisticas.serie.media:.2f}")
+            st.write(f"Mediana: {estadisticas.serie.mediana:.0f}")
+            st.write(f"Desv. Estándar: {estadisticas.serie.desviacion:.2f}")
+            st.write(f"Coef. Variación: {estadisticas.serie.coef_variacion:.2f}%")
     
     # TAB 2: Pruebas Estadísticas
     with tab2:
@@ -155,17 +164,38 @@ try:
         
         st.subheader("3. Prueba de Independencia (Autocorrelación)")
         
-        # Calcular autocorrelación lag-1
+        # ACF/PACF hasta 40 rezagos con pruebas de Ljung-Box y Box-Pierce
         numeros_array = df.sort_values('fecha')['número'].values
         if len(numeros_array) > 1:
-            autocorr = np.corrcoef(numeros_array[:-1], numeros_array[1:])[0, 1]
+            autocorrelaciones = obtener_autocorrelaciones(df, lags=40)
+            autocorr = autocorrelaciones['número']['acf'][1]
+            p_ljung_box = autocorrelaciones['número']['p_ljung_box'][-1]
             
-            st.metric("Autocorrelación (lag-1)", f"{autocorr:.4f}")
+            col1, col2 = st.columns(2)
             
-            if abs(autocorr) < 0.1:
+            with col1:
+                st.metric("Autocorrelación (lag-1)", f"{autocorr:.4f}")
+            
+            with col2:
+                st.metric("P-value Ljung-Box (40 rezagos)", f"{p_ljung_box:.4f}")
+            
+            if abs(autocorr) < 0.1 and p_ljung_box > 0.05:
                 st.success(f"✅ Los sorteos parecen ser independientes (autocorrelación ≈ 0)")
             else:
-                st.warning(f"⚠️ Posible dependencia entre sorteos consecutivos")
+                st.warning(f"⚠️ Posible dependencia entre sorteos")
+            
+            columna_acf = st.selectbox(
+                "Serie para el correlograma:",
+                options=COLUMNAS_AUTOCORRELACION
+            )
+            st.plotly_chart(grafico_acf_pacf(df, columna_acf, lags=40), use_container_width=True)
+            
+            tabla_independencia = resumen_autocorrelaciones(autocorrelaciones)
+            tabla_independencia.columns = [
+                'Serie', 'ACF lag-1', 'Rezagos', 'Ljung-Box Q', 'P-value Ljung-Box',
+                'Box-Pierce Q', 'P-value Box-Pierce', 'Rezagos fuera de banda'
+            ]
+            st.dataframe(tabla_independencia.round(4), use_container_width=True, hide_index=True)
         
         st.subheader("4. Análisis de Pares vs Impares")
         
@@ -191,6 +221,172 @@ try:
             st.success("✅ La proporción de pares e impares es aproximadamente 50-50")
         else:
             st.info(f"ℹ️ Hay un ligero sesgo hacia números {'pares' if p_pares > 0.5 else 'impares'}")
+        
+        st.subheader("5. Validación por Simulación (Monte Carlo)")
+        st.markdown("""
+        Los p-values anteriores usan aproximaciones asintóticas. Aquí se comparan los estadísticos observados
+        con los de 10,000 historias simuladas de sorteos uniformes e independientes del mismo tamaño.
+        """)
+        
+        monte_carlo = pvalores_monte_carlo_cacheado(numeros_array, replicas=10_000)
+        
+        if len(numeros_array) > 1:
+            p_autocorr_asintotico = autocorrelaciones['número']['p_ljung_box'][1]
+        else:
+            p_autocorr_asintotico = np.nan
+        
+        tabla_monte_carlo = pd.DataFrame([
+            {
+                "Prueba": "Uniformidad (χ², 20 bins)",
+                "Estadístico": round(monte_carlo['chi2']['observado'], 4),
+                "P-value asintótico": round(p_value, 4),
+                "P-value Monte Carlo": round(monte_carlo['chi2']['p_valor'], 4)
+            },
+            {
+                "Prueba": "Shapiro-Wilk (W) frente a uniforme",
+                "Estadístico": round(monte_carlo['shapiro_w']['observado'], 4),
+                "P-value asintótico": round(p_shapiro, 4),
+                "P-value Monte Carlo": round(monte_carlo['shapiro_w']['p_valor'], 4)
+            },
+            {
+                "Prueba": "Autocorrelación lag-1",
+                "Estadístico": round(monte_carlo['autocorr_lag1']['observado'], 4),
+                "P-value asintótico": round(p_autocorr_asintotico, 4),
+                "P-value Monte Carlo": round(monte_carlo['autocorr_lag1']['p_valor'], 4)
+            }
+        ])
+        
+        st.dataframe(tabla_monte_carlo, use_container_width=True, hide_index=True)
+        
+        st.info("""
+        ℹ️ En la simulación, el p-value de Shapiro-Wilk mide si W es inusualmente bajo **para sorteos uniformes**,
+        no frente a una distribución normal: un p-value alto indica que la forma de la distribución es la esperada en una lotería justa.
+        """)
+        
+        st.subheader("6. Batería de Pruebas de Aleatoriedad")
+        st.markdown("""
+        Pruebas clásicas de generadores aleatorios sobre la secuencia cronológica de números ganadores:
+        rachas, huecos, póker sobre los 4 dígitos, pares seriales, coleccionista de cupones y Kolmogorov-Smirnov.
+        """)
+        
+        bateria = bateria_aleatoriedad(numeros_array)
+        
+        tabla_bateria = pd.DataFrame({
+            "Prueba": bateria['prueba'],
+            "Estadístico": bateria['estadistico'].round(4),
+            "P-value": bateria['p_valor'].round(4),
+            "Resultado": np.where(bateria['aleatorio_5%'], "✅ Compatible con aleatoriedad", "⚠️ Se rechaza al 5%")
+        })
+        
+        st.dataframe(tabla_bateria, use_container_width=True, hide_index=True)
+        
+        st.subheader("7. Uniformidad de Dígitos por Año")
+        st.markdown("""
+        Prueba χ² de uniformidad para cada posición de dígito en cada año. Como se hacen muchas pruebas a la vez,
+        los p-values se corrigen con Holm y Benjamini-Hochberg para no confundir falsos positivos con sesgos reales.
+        """)
+        
+        uniformidad_digitos = uniformidad_digitos_por_grupo(df, grupo='año')
+        
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("Pruebas realizadas", len(uniformidad_digitos))
+        
+        with col2:
+            st.metric("Rechazos sin corregir", int((uniformidad_digitos['p_valor'] < 0.05).sum()))
+        
+        with col3:
+            st.metric("Rechazos (Holm)", int(uniformidad_digitos['rechazo_holm'].sum()))
+        
+        with col4:
+            st.metric("Rechazos (Benjamini-Hochberg)", int(uniformidad_digitos['rechazo_bh'].sum()))
+        
+        if uniformidad_digitos['rechazo_bh'].any():
+            st.warning("⚠️ Algunas posiciones de dígitos no son uniformes incluso después de corregir por comparaciones múltiples")
+        else:
+            st.success("✅ Ninguna posición de dígito se aparta de la uniformidad tras la corrección por comparaciones múltiples")
+        
+        tabla_uniformidad = uniformidad_digitos.sort_values('p_valor').round(4)
+        tabla_uniformidad.columns = [
+            'Año', 'Posición', 'Sorteos', 'χ²', 'P-value', 'P-value Holm',
+            'P-value BH', 'Rechazo Holm', 'Rechazo BH'
+        ]
+        st.dataframe(tabla_uniformidad, use_container_width=True, hide_index=True)
+        
+        st.subheader("8. Monitoreo de Deriva (Ventanas Deslizantes)")
+        st.markdown("""
+        La uniformidad se evalúa sobre los últimos 200 sorteos en cada punto de la historia (10 bins).
+        Un CUSUM acumula las desviaciones persistentes del χ² y dispara una alarma si supera el umbral.
+        """)
+        
+        deriva = deriva_por_grupo(df, ventana=200, bins=10)
+        
+        if deriva.empty:
+            st.info("ℹ️ No hay suficientes sorteos para una ventana de 200")
+        else:
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.metric("Ventanas evaluadas", f"{len(deriva):,}")
+            
+            with col2:
+                st.metric("Ventanas con χ² significativo", int((deriva['p_valor'] < 0.05).sum()))
+            
+            with col3:
+                st.metric("Ventanas en alarma (CUSUM)", int(deriva['alarma'].sum()))
+            
+            st.plotly_chart(grafico_deriva_uniformidad(df, ventana=200, bins=10), use_container_width=True)
+            
+            if deriva['alarma'].any():
+                primera_alarma = deriva.loc[deriva['alarma'], 'fecha'].min()
+                st.warning(f"⚠️ El CUSUM detectó una deriva en la uniformidad a partir del {primera_alarma:%Y-%m-%d}")
+            else:
+                st.success("✅ No se detectan derivas persistentes en la uniformidad de los números")
+        
+        st.subheader("9. Transiciones de Dígitos (Cadenas de Markov)")
+        st.markdown("""
+        Para cada posición se cuenta cuántas veces el dígito *i* de un sorteo es seguido por el dígito *j*
+        en el sorteo siguiente (o 2 y 3 sorteos después). Si los sorteos son independientes, la matriz 10×10
+        no debería mostrar asociación: se evalúa con una prueba χ² de independencia por matriz.
+        """)
+        
+        lags_transicion = (1, 2, 3)
+        claves_transicion, conteos_transiciones = obtener_transiciones(df, lags_transicion)
+        independencia = independencia_transiciones(claves_transicion, conteos_transiciones, lags_transicion)
+        independencia_año = independencia_transiciones(*conteos_transicion(df, (1,), grupo='año'), (1,))
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric("Matrices evaluadas", len(independencia))
+        
+        with col2:
+            st.metric("Dependencias (BH)", int(independencia['rechazo_bh'].sum()))
+        
+        with col3:
+            st.metric("Dependencias por año (BH)", f"{int(independencia_año['rechazo_bh'].sum())} de {independencia_año['p_valor'].notna().sum()}")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            posicion_transicion = st.selectbox("Posición del dígito", COLUMNAS_DIGITOS, key="posicion_transicion")
+        
+        with col2:
+            lag_transicion = st.selectbox("Rezago", lags_transicion, key="lag_transicion")
+        
+        st.plotly_chart(grafico_matriz_transicion(df, posicion_transicion, lag_transicion), use_container_width=True)
+        
+        tabla_transiciones = independencia.drop(columns='grupo').round(4)
+        tabla_transiciones.columns = [
+            'Posición', 'Rezago', 'Transiciones', 'χ²', 'Grados', 'P-value', 'P-value BH', 'Rechazo BH'
+        ]
+        st.dataframe(tabla_transiciones, use_container_width=True, hide_index=True)
+        
+        if independencia['rechazo_bh'].any():
+            st.warning("⚠️ Algunas posiciones muestran dependencia entre sorteos consecutivos")
+        else:
+            st.success("✅ Los dígitos de cada sorteo son independientes de los sorteos anteriores")
     
     # TAB 3: Insights
     with tab3:
@@ -198,47 +394,48 @@ try:
         
         st.subheader("🎲 Sobre los Números Ganadores")
         
-        numero_mas_frecuente = df['número'].mode()[0]
-        frecuencia_max = (df['número'] == numero_mas_frecuente).sum()
+        numero_mas_frecuente = estadisticas.numero.moda
+        frecuencia_max = estadisticas.numero.frecuencia_moda
         
         st.markdown(f"""
         1. **Número más frecuente**: {numero_mas_frecuente:04d} (apareció {frecuencia_max} veces)
-        2. **Diversidad**: {df['número'].nunique():,} números únicos de 10,000 posibles ({df['número'].nunique()/10000*100:.1f}%)
+        2. **Diversidad**: {numeros_unicos:,} números únicos de 10,000 posibles ({numeros_unicos/10000*100:.1f}%)
         3. **Distribución**: {'Aproximadamente uniforme' if p_value > 0.05 else 'Con algunos sesgos'}
         4. **Pares vs Impares**: {pares} pares ({p_pares*100:.1f}%) vs {impares} impares ({(1-p_pares)*100:.1f}%)
         """)
         
         st.subheader("🎫 Sobre las Series")
         
-        serie_mas_frecuente = df['serie'].mode()[0]
-        frecuencia_serie = (df['serie'] == serie_mas_frecuente).sum()
+        serie_mas_frecuente = estadisticas.serie.moda
+        frecuencia_serie = estadisticas.serie.frecuencia_moda
         
         st.markdown(f"""
         1. **Serie más frecuente**: {serie_mas_frecuente} (apareció {frecuencia_serie} veces)
-        2. **Diversidad**: {df['serie'].nunique():,} series únicas
-        3. **Rango**: {df['serie'].min()} a {df['serie'].max()}
-        4. **Promedio**: {df['serie'].mean():.0f}
+        2. **Diversidad**: {series_unicas:,} series únicas
+        3. **Rango**: {estadisticas.serie.minimo} a {estadisticas.serie.maximo}
+        4. **Promedio**: {estadisticas.serie.media:.0f}
         """)
         
         st.subheader("📅 Sobre los Patrones Temporales")
         
-        dia_mas_comun = df['dia_semana_nombre'].mode()[0]
-        sorteos_dia = (df['dia_semana_nombre'] == dia_mas_comun).sum()
+        dia_mas_comun = estadisticas.dia_mas_comun
+        sorteos_dia = estadisticas.frecuencia_dia
         
-        mes_mas_comun = df['mes_nombre'].mode()[0]
-        sorteos_mes = (df['mes_nombre'] == mes_mas_comun).sum()
+        mes_mas_comun = estadisticas.mes_mas_comun
+        sorteos_mes = estadisticas.frecuencia_mes
         
         st.markdown(f"""
         1. **Día más común**: {dia_mas_comun} ({sorteos_dia} sorteos)
         2. **Mes más común**: {mes_mas_comun} ({sorteos_mes} sorteos)
         3. **Frecuencia promedio**: {sorteos_año.mean():.1f} sorteos por año
-        4. **Tendencia**: {'Creciente' if df.groupby('año').size().corr(pd.Series(range(len(sorteos_año)))) > 0 else 'Decreciente'} en el tiempo
+        4. **Tendencia**: {'Creciente' if sorteos_año.corr(pd.Series(range(len(sorteos_año)))) > 0 else 'Decreciente'} en el tiempo
         """)
         
         st.subheader("🔢 Sobre los Dígitos")
         
-        primer_digito_comun = df['primer_digito'].mode()[0]
-        ultimo_digito_comun = df['ultimo_digito'].mode()[0]
+        frecuencia_digitos = obtener_cubo_agregados(df)['digitos']
+        primer_digito_comun = frecuencia_digitos['primer_digito'].idxmax()
+        ultimo_digito_comun = frecuencia_digitos['ultimo_digito'].idxmax()
         
         st.markdown(f"""
         1. **Primer dígito más común**: {primer_digito_comun}
@@ -253,7 +450,7 @@ try:
         st.markdown(f"""
         ## Resumen Ejecutivo
         
-        Basado en el análisis de **{len(df):,} sorteos** realizados entre **{df['año'].min()}** y **{df['año'].max()}**:
+        Basado en el análisis de **{estadisticas.filas:,} sorteos** realizados entre **{estadisticas.año_min}** y **{estadisticas.año_max}**:
         
         ### ✅ Validación de Aleatoriedad
         
@@ -264,8 +461,8 @@ try:
         ### 📊 Características del Dataset
         
         - **Completitud**: {completitud:.1f}% - Excelente calidad de datos
-        - **Cobertura**: {df['año'].nunique()} años de historia
-        - **Diversidad**: {df['número'].nunique():,} números únicos ({df['número'].nunique()/10000*100:.1f}% del espacio posible)
+        - **Cobertura**: {estadisticas.años} años de historia
+        - **Diversidad**: {numeros_unicos:,} números únicos ({numeros_unicos/10000*100:.1f}% del espacio posible)
         
         ### 🎯 Implicaciones
         
@@ -1,6 +1,14 @@
 import streamlit as st
 from utils.carga_datos import cargar_datos_loteria
 from utils.graficos import *
+from utils.agregados import obtener_cubo_agregados
+from utils.estadisticas import obtener_resumen_estadistico
+from utils.indice_filtros import obtener_indice_filtros, filtrar_posiciones
+from utils.indice_recencia import obtener_indice_recencia, consultar_recencia
+from utils.indice_patrones import obtener_indice_patrones, buscar_patron
+from utils.indice_billetes import obtener_indice_billetes, buscar_billetes, parsear_billetes
+from utils.digitos import CLASES_PATRON
+import numpy as np
 import pandas as pd
 
 st.title("📊 6. Comunicación de Resultados (Storytelling & Visualización)")
@@ -14,6 +22,7 @@ que cuente la historia de 18 años de sorteos de la Lotería de Medellín.
 
 try:
     df = cargar_datos_loteria()
+    estadisticas = obtener_resumen_estadistico(df)
     
     # Estructura: Contexto → Hallazgos → Impacto → Recomendaciones
     
@@ -21,8 +30,8 @@ try:
     st.header("📖 Contexto")
     
     st.markdown(f"""
-    Este análisis examina **{len(df):,} sorteos** de la Lotería de Medellín realizados entre 
-    **{df['año'].min()}** y **{df['año'].max()}**, abarcando **{df['año'].nunique()} años** de historia.
+    Este análisis examina **{estadisticas.filas:,} sorteos** de la Lotería de Medellín realizados entre 
+    **{estadisticas.año_min}** y **{estadisticas.año_max}**, abarcando **{estadisticas.años} años** de historia.
     
     Cada sorteo genera un número ganador (0-9999) y una serie específica, creando una rica base de datos
     para análisis estadístico y de patrones.
@@ -31,13 +40,13 @@ try:
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Sorteos", f"{len(df):,}")
+        st.metric("Total Sorteos", f"{estadisticas.filas:,}")
     with col2:
-        st.metric("Años Analizados", df['año'].nunique())
+        st.metric("Años Analizados", estadisticas.años)
     with col3:
-        st.metric("Números Únicos", f"{df['número'].nunique():,}")
+        st.metric("Números Únicos", f"{estadisticas.numero.distintos:,}")
     with col4:
-        st.metric("Series Únicas", f"{df['serie'].nunique():,}")
+        st.metric("Series Únicas", f"{estadisticas.serie.distintos:,}")
     
     st.markdown("---")
     
@@ -69,16 +78,16 @@ try:
             st.plotly_chart(grafico_frecuencia_digitos(df, 'ultimo'), use_container_width=True)
         
         # Insights de números
-        numero_mas_frecuente = df['número'].mode()[0]
-        frecuencia = (df['número'] == numero_mas_frecuente).sum()
-        pares = (df['numero_par'] == 1).sum()
-        p_pares = pares / len(df)
+        numero_mas_frecuente = estadisticas.numero.moda
+        frecuencia = estadisticas.numero.frecuencia_moda
+        pares = estadisticas.pares
+        p_pares = pares / estadisticas.filas
         
         st.info(f"""
         **Insights Clave:**
         - El número más frecuente es **{numero_mas_frecuente:04d}** (apareció {frecuencia} veces)
-        - {df['número'].nunique():,} números únicos de 10,000 posibles ({df['número'].nunique()/10000*100:.1f}%)
-        - Distribución pares/impares: {pares} pares ({p_pares*100:.1f}%) vs {len(df)-pares} impares ({(1-p_pares)*100:.1f}%)
+        - {estadisticas.numero.distintos:,} números únicos de 10,000 posibles ({estadisticas.numero.distintos/10000*100:.1f}%)
+        - Distribución pares/impares: {pares} pares ({p_pares*100:.1f}%) vs {estadisticas.filas-pares} impares ({(1-p_pares)*100:.1f}%)
         - La distribución es aproximadamente uniforme, sugiriendo aleatoriedad
         """)
     
@@ -96,14 +105,14 @@ try:
         st.plotly_chart(grafico_scatter_numero_serie(df), use_container_width=True)
         
         # Insights de series
-        serie_mas_frecuente = df['serie'].mode()[0]
-        frecuencia_serie = (df['serie'] == serie_mas_frecuente).sum()
+        serie_mas_frecuente = estadisticas.serie.moda
+        frecuencia_serie = estadisticas.serie.frecuencia_moda
         
         st.info(f"""
         **Insights Clave:**
         - La serie más frecuente es **{serie_mas_frecuente}** (apareció {frecuencia_serie} veces)
-        - {df['serie'].nunique():,} series únicas en el rango {df['serie'].min()}-{df['serie'].max()}
-        - Serie promedio: {df['serie'].mean():.0f}
+        - {estadisticas.serie.distintos:,} series únicas en el rango {estadisticas.serie.minimo}-{estadisticas.serie.maximo}
+        - Serie promedio: {estadisticas.serie.media:.0f}
         - No hay correlación significativa entre número y serie
         """)
     
@@ -123,8 +132,8 @@ try:
         st.plotly_chart(grafico_heatmap_mes_año(df), use_container_width=True)
         
         # Insights temporales
-        sorteos_año = df.groupby('año').size()
-        dia_mas_comun = df['dia_semana_nombre'].mode()[0]
+        sorteos_año = obtener_cubo_agregados(df)['por_año']
+        dia_mas_comun = estadisticas.dia_mas_comun
         
         st.info(f"""
         **Insights Clave:**
@@ -154,8 +163,8 @@ try:
     with col2:
         st.subheader("📊 Hallazgos Estadísticos")
         st.markdown(f"""
-        - **Diversidad**: {df['número'].nunique():,} números únicos ({df['número'].nunique()/10000*100:.1f}% del espacio)
-        - **Cobertura**: {df['año'].nunique()} años de datos históricos
+        - **Diversidad**: {estadisticas.numero.distintos:,} números únicos ({estadisticas.numero.distintos/10000*100:.1f}% del espacio)
+        - **Cobertura**: {estadisticas.años} años de datos históricos
         - **Consistencia**: Distribución estable en el tiempo
         - **Equidad**: Pares e impares aproximadamente 50-50
         - **Patrones**: No se detectaron patrones predecibles explotables
@@ -228,14 +237,16 @@ try:
     Usa los filtros para explorar los datos de manera interactiva:
     """)
     
+    indice = obtener_indice_filtros(df)
+    
     # Filtros
     col1, col2, col3 = st.columns(3)
     
     with col1:
         años_seleccionados = st.multiselect(
             "Filtrar por Año",
-            options=sorted(df['año'].unique()),
-            default=sorted(df['año'].unique())[-5:]  # Últimos 5 años por defecto
+            options=indice['años'].tolist(),
+            default=indice['años'].tolist()[-5:]  # Últimos 5 años por defecto
         )
     
     with col2:
@@ -248,18 +259,46 @@ try:
     with col3:
         rango_serie = st.slider(
             "Rango de Series",
-            int(df['serie'].min()), int(df['serie'].max()),
-            (int(df['serie'].min()), int(df['serie'].max()))
+            int(estadisticas.serie.minimo), int(estadisticas.serie.maximo),
+            (int(estadisticas.serie.minimo), int(estadisticas.serie.maximo))
+        )
+    
+    # Filtros por patrón de dígitos
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        patron = st.text_input(
+            "Patrón de Dígitos",
+            value="****",
+            max_chars=4,
+            help="4 caracteres: un dígito o * por posición (p. ej. *7*3)"
+        )
+    
+    with col2:
+        suma = st.selectbox("Suma de Dígitos", ["Todas"] + list(range(37)))
+    
+    with col3:
+        clase = st.selectbox(
+            "Clase de Patrón",
+            ["Todas"] + CLASES_PATRON,
+            help="ABCD: todos distintos, AABC: un par, AABB: dos pares, AAAB: trío, AAAA: póker"
         )
     
-    # Aplicar filtros
-    df_filtrado = df[
-        (df['año'].isin(años_seleccionados)) &
-        (df['número'] >= rango_numero[0]) &
-        (df['número'] <= rango_numero[1]) &
-        (df['serie'] >= rango_serie[0]) &
-        (df['serie'] <= rango_serie[1])
-    ]
+    # Aplicar filtros con los índices (solo se copian las filas seleccionadas)
+    posiciones = filtrar_posiciones(indice, años_seleccionados, rango_numero, rango_serie)
+    
+    try:
+        coincidencias = buscar_patron(
+            obtener_indice_patrones(df),
+            patron=patron or None,
+            suma=None if suma == "Todas" else suma,
+            clase=None if clase == "Todas" else clase
+        )
+        posiciones = np.intersect1d(posiciones, coincidencias, assume_unique=True)
+    except ValueError as e:
+        st.warning(str(e))
+    
+    df_filtrado = df.iloc[posiciones]
     
     st.info(f"Mostrando {len(df_filtrado):,} sorteos de {len(df):,} totales")
     
@@ -280,6 +319,87 @@ try:
     else:
         st.warning("No hay datos que coincidan con los filtros seleccionados")
     
+    # Consulta de recencia (lectura directa en el índice, sin recorrer la historia)
+    st.subheader("⏱️ Recencia de un Número o Serie")
+    
+    recencia = obtener_indice_recencia(df)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        espacio = st.radio("Consultar", ["Número", "Serie"], horizontal=True)
+    
+    with col2:
+        clave = st.number_input(
+            "Valor",
+            min_value=0,
+            max_value=9999 if espacio == "Número" else len(recencia['series']['apariciones']) - 1,
+            value=int(estadisticas.numero.moda) if espacio == "Número" else int(estadisticas.serie.moda)
+        )
+    
+    consulta = consultar_recencia(recencia, clave, 'numeros' if espacio == "Número" else 'series')
+    
+    if consulta['apariciones'] == 0:
+        st.warning(f"{espacio} {clave} no ha salido en la historia analizada")
+    else:
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("Apariciones", consulta['apariciones'])
+        with col2:
+            st.metric("Última vez", consulta['ultima_fecha'].strftime('%Y-%m-%d'))
+        with col3:
+            st.metric("Sorteos desde entonces", f"{consulta['sorteos_desde_ultima']:,}")
+        with col4:
+            st.metric(
+                "Hueco medio (máx.)",
+                f"{consulta['hueco_medio']:.0f} ({consulta['hueco_maximo']})" if consulta['hueco_medio'] is not None else "N/A"
+            )
+        
+        if consulta['histograma']:
+            st.caption("Distribución de huecos (sorteos entre apariciones consecutivas)")
+            st.bar_chart(pd.Series(consulta['histograma'], name='huecos'), sort=False)
+    
+    # Verificación de billetes en lote (búsqueda binaria sobre claves empaquetadas)
+    st.subheader("🎟️ Verificar Billetes")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        texto_billetes = st.text_area(
+            "Billetes (uno por línea: número y serie)",
+            placeholder="1234 056\n0539-120",
+            height=150
+        )
+    
+    with col2:
+        archivo_billetes = st.file_uploader("O sube un archivo de texto/CSV", type=['txt', 'csv'])
+    
+    if archivo_billetes is not None:
+        texto_billetes = archivo_billetes.getvalue().decode('utf-8', errors='ignore')
+    
+    if texto_billetes.strip():
+        numeros, series, invalidas = parsear_billetes(texto_billetes)
+        
+        if invalidas:
+            st.warning(f"{len(invalidas)} líneas no se pudieron leer (p. ej. '{invalidas[0]}')")
+        
+        if len(numeros) > 0:
+            verificacion = buscar_billetes(obtener_indice_billetes(df), numeros, series)
+            ganadores = verificacion[verificacion['ganador']]
+            
+            st.info(f"{len(ganadores):,} de {len(verificacion):,} billetes han ganado el premio mayor")
+            
+            if len(ganadores) > 0:
+                st.dataframe(
+                    ganadores.assign(
+                        número=ganadores['número'].map('{:04d}'.format),
+                        fechas=ganadores['fechas'].map(lambda f: ', '.join(pd.to_datetime(f).strftime('%Y-%m-%d')))
+                    ).drop(columns='ganador'),
+                    use_container_width=True,
+                    hide_index=True
+                )
+    
     st.success("✅ Etapa 6 completada. Procede a la siguiente sección: IA Generativa con Gemini.")
 
 except Exception as e:
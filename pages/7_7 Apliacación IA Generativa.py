@@ -1,6 +1,9 @@
 import streamlit as st
 from utils.carga_datos import cargar_datos_loteria
 from utils.ai_helpers import *
+from utils.agregados import obtener_cubo_agregados
+from utils.estadisticas import obtener_resumen_estadistico
+from utils.autocorrelacion import obtener_autocorrelaciones
 import pandas as pd
 
 st.title("🤖 7. Aplicación de IA Generativa (Gemini)")
@@ -48,6 +51,7 @@ st.success("✅ Gemini inicializado correctamente")
 # Cargar datos
 try:
     df = cargar_datos_loteria()
+    estadisticas = obtener_resumen_estadistico(df)
     
     # Tabs para diferentes funcionalidades
     tab1, tab2, tab3, tab4, tab5 = st.tabs([
@@ -195,14 +199,14 @@ try:
         
         # Métricas disponibles
         metricas = {
-            "Promedio de números": df['número'].mean(),
-            "Desviación estándar de números": df['número'].std(),
-            "Coeficiente de variación": (df['número'].std() / df['número'].mean() * 100),
-            "Números únicos": df['número'].nunique(),
-            "Proporción de números pares": (df['numero_par'] == 1).sum() / len(df) * 100,
-            "Sorteos por año (promedio)": df.groupby('año').size().mean(),
-            "Serie promedio": df['serie'].mean(),
-            "Autocorrelación (lag-1)": df.sort_values('fecha')['número'].autocorr(lag=1) if len(df) > 1 else 0
+            "Promedio de números": estadisticas.numero.media,
+            "Desviación estándar de números": estadisticas.numero.desviacion,
+            "Coeficiente de variación": estadisticas.numero.coef_variacion,
+            "Números únicos": estadisticas.numero.distintos,
+            "Proporción de números pares": estadisticas.pares / estadisticas.filas * 100,
+            "Sorteos por año (promedio)": obtener_cubo_agregados(df)['por_año'].mean(),
+            "Serie promedio": estadisticas.serie.media,
+            "Autocorrelación (lag-1)": obtener_autocorrelaciones(df)['número']['acf'][1] if len(df) > 1 else 0
         }
         
         metrica_seleccionada = st.selectbox(
@@ -216,7 +220,7 @@ try:
         
         if st.button("📖 Explicar esta Métrica", type="primary"):
             with st.spinner("🤓 Gemini está preparando la explicación..."):
-                contexto = f"Dataset de lotería con {len(df)} sorteos desde {df['año'].min()} hasta {df['año'].max()}"
+                contexto = f"Dataset de lotería con {estadisticas.filas} sorteos desde {estadisticas.año_min} hasta {estadisticas.año_max}"
                 explicacion = explicar_metrica(model, metrica_seleccionada, valor_metrica, contexto)
                 st.markdown("### 💡 Explicación:")
                 st.markdown(explicacion)
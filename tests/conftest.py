@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Permite importar el paquete utils al ejecutar pytest desde cualquier directorio
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+RUTA_CSV = os.path.join(RAIZ, 'data', 'premio_mayor_loteria_medellin.csv')
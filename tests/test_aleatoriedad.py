@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from utils.aleatoriedad import (
+    prueba_huecos, prueba_serial, prueba_coleccionista, bateria_aleatoriedad
+)
+
+def _segmentos_fuerza_bruta(valores, d=10, maximo=10000):
+    """
+    Cantidad de segmentos completos del coleccionista, recorriendo sorteo a sorteo.
+    """
+    clases = (np.asarray(valores) * d) // maximo
+    segmentos, vistos = 0, set()
+    for c in clases:
+        vistos.add(c)
+        if len(vistos) == d:
+            segmentos, vistos = segmentos + 1, set()
+    return segmentos
+
+@pytest.mark.parametrize('n', [0, 9, 10, 31, 975, 5000])
+def test_coleccionista_encadena_segmentos_como_fuerza_bruta(n):
+    rng = np.random.default_rng(n)
+    for _ in range(10):
+        valores = rng.integers(0, 10000, n)
+        assert prueba_coleccionista(valores)['segmentos'] == _segmentos_fuerza_bruta(valores)
+
+@pytest.mark.parametrize('prueba', [prueba_huecos, prueba_serial, prueba_coleccionista])
+def test_pruebas_chi2_calibradas_bajo_la_nula(prueba):
+    # Con historias uniformes del tamaño del dataset real, el rechazo al 5% debe rondar el 5%
+    rng = np.random.default_rng(12)
+    p_valores = np.array([prueba(rng.integers(0, 10000, 975))['p_valor'] for _ in range(1000)])
+    
+    assert not np.isnan(p_valores).any()
+    assert 0.03 <= (p_valores < 0.05).mean() <= 0.07
+
+def test_pruebas_chi2_con_celdas_de_al_menos_cinco_esperados():
+    valores = np.random.default_rng(3).integers(0, 10000, 975)
+    
+    # 487 pares en 100 celdas (4.87 esperados) se agrupan de a dos
+    assert prueba_serial(valores)['celdas'] == 50
+    assert prueba_coleccionista(valores)['celdas'] < 21
+    assert prueba_huecos(valores)['celdas'] < 21
+
+def test_bateria_detecta_secuencia_no_aleatoria():
+    tabla = bateria_aleatoriedad(np.tile(np.arange(0, 10000, 37), 4)[:975])
+    assert not tabla['aleatorio_5%'].all()
@@ -0,0 +1,62 @@
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+from utils.carga_datos import cache_por_version, huella_filas
+from utils.cache_figuras import figura_cacheada, limpiar_cache_figuras
+
+def _con_version(df, version='v1'):
+    df.attrs.update(version_datos=version, filas_datos=len(df), huella_datos=huella_filas(df))
+    return df
+
+@pytest.fixture
+def df():
+    return _con_version(pd.DataFrame({'sorteo': range(100), 'número': range(100)}))
+
+def test_cache_por_version(df):
+    llamadas = []
+    
+    def contar(df, columna='número', minimo=0):
+        llamadas.append((columna, minimo))
+        return int((df[columna] >= minimo).sum())
+    
+    obtener = cache_por_version(contar)
+    
+    assert obtener(df) == 100
+    assert obtener(df, 'número', 0) == 100  # mismos parámetros normalizados
+    assert obtener(df, minimo=50) == 50
+    assert len(llamadas) == 2
+    
+    # Un subconjunto no tiene versión: se calcula siempre, sin usar la caché
+    assert obtener(df.iloc[:10]) == 10
+    assert obtener(df.iloc[:10]) == 10
+    assert len(llamadas) == 4
+    
+    # Otra versión del dataset es otra entrada
+    assert obtener(_con_version(df.copy(), 'v2'), minimo=90) == 10
+    assert len(llamadas) == 5
+
+def test_caches_separadas_por_constructor(df):
+    def primero(df):
+        return 'primero'
+    
+    def segundo(df):
+        return 'segundo'
+    
+    assert cache_por_version(primero)(df) == 'primero'
+    assert cache_por_version(segundo)(df) == 'segundo'
+
+def test_figura_cacheada_devuelve_copias(df):
+    limpiar_cache_figuras()
+    llamadas = []
+    
+    @figura_cacheada
+    def grafico(df, titulo='x'):
+        llamadas.append(titulo)
+        return go.Figure(layout_title_text=titulo)
+    
+    grafico(df).update_layout(title_text='modificada')
+    assert grafico(df, 'x').layout.title.text == 'x'
+    assert len(llamadas) == 1
+    
+    grafico(df.iloc[:5])
+    assert len(llamadas) == 2
@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+from conftest import RUTA_CSV
+from utils.carga_datos import (
+    procesar_datos_loteria, actualizar_incremental, escribir_snapshot,
+    ruta_snapshot, hash_archivo, version_dataset, huella_filas
+)
+
+@pytest.fixture(scope='module')
+def lineas_csv():
+    with open(RUTA_CSV, 'rb') as f:
+        return f.readlines()
+
+@pytest.mark.parametrize('filas_prefijo', [1, 500, 900, 974])
+def test_actualizacion_incremental_igual_a_carga_completa(tmp_path, lineas_csv, filas_prefijo):
+    # Snapshot de un prefijo del CSV (encabezado + filas_prefijo filas)
+    ruta = tmp_path / 'loteria.csv'
+    ruta.write_bytes(b''.join(lineas_csv[:filas_prefijo + 1]))
+    tamaño_prefijo = ruta.stat().st_size
+    directorio = tmp_path / 'snapshots'
+    escribir_snapshot(
+        procesar_datos_loteria(pd.read_csv(ruta)),
+        ruta_snapshot(hash_archivo(ruta), tamaño_prefijo, str(directorio))
+    )
+    
+    # El archivo crece con el resto de las filas (incluye sorteos extra con numeración propia)
+    ruta.write_bytes(b''.join(lineas_csv))
+    incremental = actualizar_incremental(str(ruta), ruta.stat().st_size, str(directorio))
+    completo = procesar_datos_loteria(pd.read_csv(ruta))
+    
+    assert incremental is not None
+    assert len(incremental) == len(completo)
+    pd.testing.assert_frame_equal(incremental, completo)
+
+def test_actualizacion_incremental_rechaza_archivo_modificado(tmp_path, lineas_csv):
+    ruta = tmp_path / 'loteria.csv'
+    ruta.write_bytes(b''.join(lineas_csv[:500]))
+    directorio = tmp_path / 'snapshots'
+    escribir_snapshot(
+        procesar_datos_loteria(pd.read_csv(ruta)),
+        ruta_snapshot(hash_archivo(ruta), ruta.stat().st_size, str(directorio))
+    )
+    
+    # Una fila del prefijo cambia: ya no es una extensión del archivo anterior
+    modificadas = list(lineas_csv)
+    modificadas[10] = modificadas[11]
+    ruta.write_bytes(b''.join(modificadas))
+    
+    assert actualizar_incremental(str(ruta), ruta.stat().st_size, str(directorio)) is None
+
+def test_version_dataset_solo_para_el_frame_completo():
+    df = procesar_datos_loteria(pd.read_csv(RUTA_CSV))
+    df.attrs.update(version_datos='v', filas_datos=len(df), huella_datos=huella_filas(df))
+    
+    assert version_dataset(df) == 'v'
+    assert version_dataset(df.iloc[:100]) is None
+    assert version_dataset(df.sort_values('número')) is None
+    assert version_dataset(df.reset_index(drop=True)) == 'v'
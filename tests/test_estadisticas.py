@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import RUTA_CSV
+from utils.carga_datos import procesar_datos_loteria
+from utils.estadisticas import resumir_columna, construir_resumen_estadistico
+
+@pytest.fixture(scope='module')
+def df():
+    return procesar_datos_loteria(pd.read_csv(RUTA_CSV))
+
+@pytest.mark.parametrize('columna', ['número', 'serie', 'sorteo'])
+def test_resumen_igual_a_pandas(df, columna):
+    valores = df[columna]
+    resumen = resumir_columna(valores)
+    
+    assert resumen.conteo == valores.count()
+    assert resumen.minimo == valores.min() and resumen.maximo == valores.max()
+    assert resumen.q1 == pytest.approx(valores.quantile(0.25))
+    assert resumen.mediana == pytest.approx(valores.median())
+    assert resumen.q3 == pytest.approx(valores.quantile(0.75))
+    assert resumen.media == pytest.approx(valores.mean())
+    assert resumen.desviacion == pytest.approx(valores.std())
+    assert resumen.moda == valores.mode()[0]
+    assert resumen.frecuencia_moda == (valores == valores.mode()[0]).sum()
+    assert resumen.distintos == valores.nunique()
+
+def test_resumen_con_nulos_y_vacio():
+    resumen = resumir_columna(pd.Series([3, np.nan, 1, 3]))
+    assert (resumen.conteo, resumen.nulos, resumen.moda, resumen.frecuencia_moda) == (3, 1, 3, 2)
+    
+    vacio = resumir_columna(pd.Series([], dtype=float))
+    assert vacio.conteo == 0 and np.isnan(vacio.media)
+
+def test_resumen_dataset(df):
+    resumen = construir_resumen_estadistico(df)
+    assert resumen.filas == len(df)
+    assert resumen.numero.moda == df['número'].mode()[0]
+    assert resumen.pares == (df['número'] % 2 == 0).sum()
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import RUTA_CSV
+from utils.carga_datos import procesar_datos_loteria
+from utils.frecuencias import TablaFrecuencias
+from utils.agregados import construir_cubo_agregados
+
+@pytest.fixture(scope='module')
+def df():
+    return procesar_datos_loteria(pd.read_csv(RUTA_CSV))
+
+@pytest.mark.parametrize('columna', ['número', 'serie'])
+def test_top_igual_a_value_counts(df, columna):
+    esperado = df[columna].value_counts().rename_axis(columna).reset_index(name='frecuencia')
+    esperado = esperado.sort_values(['frecuencia', columna], ascending=[False, True], kind='stable')
+    
+    tabla = TablaFrecuencias.desde_valores(df[columna])
+    for k in (1, 10, None):
+        top = tabla.top(k)
+        referencia = esperado if k is None else esperado.head(k)
+        np.testing.assert_array_equal(top[columna], referencia[columna])
+        np.testing.assert_array_equal(top['frecuencia'], referencia['frecuencia'])
+
+def test_moda_total_y_distintos(df):
+    tabla = TablaFrecuencias.desde_valores(df['serie'])
+    assert tabla.moda() == (df['serie'].mode()[0], (df['serie'] == df['serie'].mode()[0]).sum())
+    assert tabla.total == len(df)
+    assert tabla.distintos == df['serie'].nunique()
+    assert TablaFrecuencias.desde_valores([]).moda() == (None, 0)
+
+def test_por_grupo_combinar_y_restar(df):
+    por_año = TablaFrecuencias.por_grupo(df['número'], df['año'], 10000)
+    completa = TablaFrecuencias.desde_valores(df['número'], 10000)
+    
+    suma = sum(por_año.values(), TablaFrecuencias(np.zeros(10000)))
+    np.testing.assert_array_equal(suma.conteos, completa.conteos)
+    
+    año = min(por_año)
+    sin_año = completa - por_año[año]
+    esperado = TablaFrecuencias.desde_valores(df.loc[df['año'] != año, 'número'], 10000)
+    np.testing.assert_array_equal(sin_año.conteos, esperado.conteos)
+    
+    with pytest.raises(ValueError):
+        por_año[año] - completa
+
+def test_cubo_igual_a_groupby(df):
+    cubo = construir_cubo_agregados(df)
+    
+    pd.testing.assert_series_equal(cubo['por_año'], df.groupby('año').size().rename('cantidad'), check_names=False, check_dtype=False)
+    np.testing.assert_array_equal(cubo['año_mes'].to_numpy(), pd.crosstab(df['año'], df['mes']).reindex(columns=range(1, 13), fill_value=0).to_numpy())
+    np.testing.assert_array_equal(cubo['por_dia_semana'].to_numpy(), np.bincount(df['dia_semana'], minlength=7))
+    for columna in ('primer_digito', 'ultimo_digito'):
+        np.testing.assert_array_equal(cubo['digitos'][columna].to_numpy(), np.bincount(df[columna], minlength=10))
+    np.testing.assert_array_equal(cubo['por_rango_serie'].to_numpy(), df['rango_serie'].value_counts(sort=False).to_numpy())
+    assert cubo['paridad']['Par'] == (df['número'] % 2 == 0).sum()
+    assert cubo['frecuencia_numero'].top(1)['número'][0] == df['número'].value_counts().sort_index(kind='stable').idxmax()
@@ -0,0 +1,29 @@
+import pandas as pd
+import pytest
+from conftest import RUTA_CSV
+from utils.carga_datos import procesar_datos_loteria
+from utils.graficos import (
+    grafico_distribucion_numeros, grafico_distribucion_series, grafico_scatter_numero_serie
+)
+
+@pytest.fixture(scope='module')
+def df():
+    return procesar_datos_loteria(pd.read_csv(RUTA_CSV))
+
+@pytest.mark.parametrize('constructor', [grafico_distribucion_numeros, grafico_distribucion_series])
+def test_histogramas_con_filtro_vacio(df, constructor):
+    fig = constructor(df.iloc[:0])
+    assert sum(fig.data[0].y) == 0
+
+@pytest.mark.parametrize('constructor, columna', [
+    (grafico_distribucion_numeros, 'número'),
+    (grafico_distribucion_series, 'serie')
+])
+def test_histogramas_cuentan_todos_los_sorteos(df, constructor, columna):
+    assert sum(constructor(df).data[0].y) == df[columna].notna().sum()
+
+def test_dispersion_numero_serie_determinista(df):
+    # Sin caché de por medio, dos construcciones deben tomar la misma muestra
+    primera = grafico_scatter_numero_serie.__wrapped__(df)
+    segunda = grafico_scatter_numero_serie.__wrapped__(df)
+    assert list(primera.data[0].x) == list(segunda.data[0].x)
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import RUTA_CSV
+from utils.carga_datos import procesar_datos_loteria
+from utils.indice_recencia import (
+    construir_indice_recencia, actualizar_indice_recencia, consultar_recencia
+)
+
+@pytest.fixture(scope='module')
+def df():
+    return procesar_datos_loteria(pd.read_csv(RUTA_CSV))
+
+def _recencia_fuerza_bruta(df, columna, clave):
+    """
+    Recencia de una clave filtrando la historia completa.
+    """
+    posiciones = np.flatnonzero(df[columna].to_numpy() == clave)
+    if len(posiciones) == 0:
+        return None
+    huecos = np.diff(posiciones)
+    return {
+        'apariciones': len(posiciones),
+        'ultima_fecha': df['fecha'].iloc[posiciones[-1]],
+        'sorteos_desde_ultima': len(df) - 1 - posiciones[-1],
+        'hueco_medio': float(huecos.mean()) if len(huecos) else None,
+        'hueco_maximo': int(huecos.max()) if len(huecos) else None
+    }
+
+@pytest.mark.parametrize('columna, espacio', [('número', 'numeros'), ('serie', 'series')])
+def test_recencia_igual_a_fuerza_bruta(df, columna, espacio):
+    indice = construir_indice_recencia(df)
+    claves = np.r_[df[columna].value_counts().index[:20], df[columna].iloc[-5:], 0, 9999]
+    
+    for clave in claves:
+        esperado = _recencia_fuerza_bruta(df, columna, clave)
+        resultado = consultar_recencia(indice, clave, espacio)
+        if esperado is None:
+            assert resultado['apariciones'] == 0
+        else:
+            assert {k: resultado[k] for k in esperado} == esperado
+
+def test_ultima_aparicion_con_claves_repetidas():
+    # Muchas repeticiones de pocas claves: la última aparición debe ser la más reciente
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'fecha': pd.date_range('2000-01-01', periods=5000, freq='D'),
+        'número': rng.integers(0, 3, 5000),
+        'serie': rng.integers(0, 2, 5000)
+    })
+    indice = construir_indice_recencia(df)
+    
+    for clave in range(3):
+        assert indice['numeros']['ultima'][clave] == np.flatnonzero(df['número'] == clave)[-1]
+    for clave in range(2):
+        assert indice['series']['ultima'][clave] == np.flatnonzero(df['serie'] == clave)[-1]
+
+def test_actualizacion_igual_a_construccion_completa(df):
+    indice = construir_indice_recencia(df.iloc[:900])
+    for fila in df.iloc[900:].itertuples():
+        actualizar_indice_recencia(indice, getattr(fila, 'número'), fila.serie, fila.fecha)
+    completo = construir_indice_recencia(df)
+    
+    assert indice['sorteos'] == completo['sorteos']
+    for espacio in ('numeros', 'series'):
+        for clave, array in completo[espacio].items():
+            np.testing.assert_array_equal(indice[espacio][clave][:len(array)], array)
+
+def test_dataset_vacio(df):
+    indice = construir_indice_recencia(df.iloc[:0])
+    assert indice['sorteos'] == 0
+    assert consultar_recencia(indice, 1234)['apariciones'] == 0
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import RUTA_CSV
+from utils.carga_datos import procesar_datos_loteria
+from utils.digitos import matriz_digitos, CLASES_PATRON
+from utils.indice_filtros import construir_indice_filtros, filtrar_posiciones
+from utils.indice_patrones import construir_indice_patrones, buscar_patron
+from utils.indice_billetes import construir_indice_billetes, buscar_billetes, parsear_billetes
+from utils.transiciones import conteos_transicion, MatricesTransicion
+
+@pytest.fixture(scope='module')
+def df():
+    return procesar_datos_loteria(pd.read_csv(RUTA_CSV))
+
+@pytest.mark.parametrize('años, rango_numero, rango_serie', [
+    (None, None, None),
+    ([2015, 2020], None, None),
+    (None, (1000, 4999), None),
+    ([2018], (0, 9999), (100, 200)),
+    ([1900], None, None),
+    (None, (5000, 4000), None)
+])
+def test_filtros_igual_a_mascara(df, años, rango_numero, rango_serie):
+    mascara = np.ones(len(df), dtype=bool)
+    if años is not None:
+        mascara &= df['año'].isin(años).to_numpy()
+    if rango_numero is not None:
+        mascara &= df['número'].between(*rango_numero).to_numpy()
+    if rango_serie is not None:
+        mascara &= df['serie'].between(*rango_serie).to_numpy()
+    
+    posiciones = filtrar_posiciones(construir_indice_filtros(df), años, rango_numero, rango_serie)
+    np.testing.assert_array_equal(posiciones, np.flatnonzero(mascara))
+
+@pytest.mark.parametrize('criterios', [
+    {'patron': '*7*3'},
+    {'patron': '12??'},
+    {'patron': '****'},
+    {'suma': 18},
+    {'repeticiones': 2, 'palindromo': False},
+    {'clase': 'AABB'},
+    {'patron': '1***', 'suma': 10, 'clase': 'ABCD'},
+    {'palindromo': True}
+])
+def test_patrones_igual_a_fuerza_bruta(df, criterios):
+    texto = df['número'].map('{:04d}'.format)
+    digitos = matriz_digitos(df['número'])
+    mascara = np.ones(len(df), dtype=bool)
+    
+    if 'patron' in criterios:
+        regex = ''.join('.' if c in '*?' else c for c in criterios['patron'])
+        mascara &= texto.str.fullmatch(regex).to_numpy()
+    if 'suma' in criterios:
+        mascara &= digitos.sum(axis=1) == criterios['suma']
+    if 'repeticiones' in criterios:
+        repeticiones = [max(np.bincount(fila)) for fila in digitos]
+        mascara &= np.array(repeticiones) == criterios['repeticiones']
+    if 'clase' in criterios:
+        mascara &= (df['patron_digitos'] == criterios['clase']).to_numpy()
+    if 'palindromo' in criterios:
+        mascara &= (texto == texto.str[::-1]).to_numpy() == criterios['palindromo']
+    
+    posiciones = buscar_patron(construir_indice_patrones(df), **criterios)
+    np.testing.assert_array_equal(posiciones, np.flatnonzero(mascara))
+
+def test_patrones_sin_features_precalculadas(df):
+    basico = df[['número']]
+    indice = construir_indice_patrones(basico)
+    for clase in CLASES_PATRON:
+        np.testing.assert_array_equal(
+            buscar_patron(indice, clase=clase),
+            np.flatnonzero(df['patron_digitos'] == clase)
+        )
+
+def test_billetes_igual_a_fuerza_bruta(df):
+    rng = np.random.default_rng(0)
+    ganadores = df[['número', 'serie']].sample(30, random_state=1)
+    numeros = np.r_[ganadores['número'], rng.integers(0, 10000, 30), -1, 10000]
+    series = np.r_[ganadores['serie'], rng.integers(0, 1000, 30), 5, 5]
+    
+    resultado = buscar_billetes(construir_indice_billetes(df), numeros, series)
+    
+    for fila, numero, serie in zip(resultado.itertuples(), numeros, series):
+        fechas = df.loc[(df['número'] == numero) & (df['serie'] == serie), 'fecha'].sort_values()
+        assert fila.veces == len(fechas)
+        assert fila.ganador == (len(fechas) > 0)
+        np.testing.assert_array_equal(fila.fechas, fechas.to_numpy())
+        if len(fechas):
+            assert fila.ultima_fecha == fechas.iloc[-1]
+        else:
+            assert pd.isna(fila.ultima_fecha)
+
+def test_parsear_billetes():
+    numeros, series, invalidas = parsear_billetes("1234 056\n\n0007-12\n99,3\nabc\n12345 1")
+    assert numeros.tolist() == [1234, 7, 99]
+    assert series.tolist() == [56, 12, 3]
+    assert invalidas == ['abc', '12345 1']
+
+def _transiciones_fuerza_bruta(df, lags, grupo):
+    """
+    Conteos (grupos, posición, rezago, origen, destino) recorriendo cada historia.
+    """
+    claves = sorted(df[grupo].unique()) if grupo else ['total']
+    conteos = np.zeros((len(claves), 4, len(lags), 10, 10), dtype=np.int64)
+    for g, clave in enumerate(claves):
+        historia = df[df[grupo] == clave] if grupo else df
+        digitos = matriz_digitos(historia.sort_values('fecha', kind='stable')['número'])
+        for i, lag in enumerate(lags):
+            for t in range(lag, len(digitos)):
+                for p in range(4):
+                    conteos[g, p, i, digitos[t - lag, p], digitos[t, p]] += 1
+    return conteos
+
+@pytest.mark.parametrize('grupo', [None, 'año'])
+def test_transiciones_igual_a_fuerza_bruta(df, grupo):
+    lags = (1, 2, 5)
+    claves, conteos = conteos_transicion(df, lags, grupo)
+    
+    np.testing.assert_array_equal(conteos, _transiciones_fuerza_bruta(df, lags, grupo))
+    assert len(claves) == conteos.shape[0]
+
+def test_matrices_transicion_incrementales(df):
+    lags = (1, 3)
+    matrices = MatricesTransicion.desde_historia(df.iloc[:600], lags)
+    for numero in df['número'].iloc[600:]:
+        matrices.agregar(numero)
+    
+    _, completos = conteos_transicion(df, lags)
+    np.testing.assert_array_equal(matrices.conteos, completos)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from scipy import stats
+from statsmodels.stats.diagnostic import acorr_ljungbox
+from statsmodels.tsa.stattools import pacf
+from utils.simulacion import estadisticos_aleatoriedad, simular_distribucion_nula, pvalores_monte_carlo
+from utils.bootstrap import bootstrap_por_grupo
+from utils.autocorrelacion import analizar_autocorrelacion
+
+def test_estadisticos_igual_a_scipy():
+    rng = np.random.default_rng(0)
+    muestras = rng.integers(0, 10000, size=(5, 300))
+    resultado = estadisticos_aleatoriedad(muestras)
+    
+    for i, x in enumerate(muestras):
+        observados = np.bincount(x * 20 // 10000, minlength=20)
+        assert resultado['chi2'][i] == pytest.approx(stats.chisquare(observados).statistic)
+        assert resultado['shapiro_w'][i] == pytest.approx(stats.shapiro(x).statistic, abs=1e-4)
+        assert resultado['autocorr_lag1'][i] == pytest.approx(np.corrcoef(x[:-1], x[1:])[0, 1])
+
+def test_simulacion_reproducible_con_y_sin_procesos():
+    secuencial = simular_distribucion_nula(500, replicas=300, tamaño_lote=40, semilla=7)
+    paralelo = simular_distribucion_nula(500, replicas=300, tamaño_lote=40, procesos=2, semilla=7)
+    
+    for clave in secuencial:
+        assert len(secuencial[clave]) == 300
+        np.testing.assert_array_equal(secuencial[clave], paralelo[clave])
+
+def test_pvalores_uniformes_bajo_la_nula():
+    rng = np.random.default_rng(1)
+    p = [pvalores_monte_carlo(rng.integers(0, 10000, 200), replicas=200, semilla=i)['chi2']['p_valor']
+         for i in range(60)]
+    
+    # p-values empíricos de historias uniformes: aproximadamente U(0, 1)
+    assert stats.kstest(p, 'uniform').pvalue > 0.01
+
+def test_bootstrap_igual_a_remuestreo_por_grupo():
+    rng = np.random.default_rng(2)
+    valores = rng.normal(size=200)
+    grupos = np.repeat(['a', 'b'], 100)
+    claves, distribuciones = bootstrap_por_grupo(valores, grupos, replicas=4000, semilla=3)
+    
+    assert list(claves) == ['a', 'b']
+    for g, clave in enumerate(claves):
+        x = valores[grupos == clave]
+        # Error estándar de la media: el bootstrap debe aproximar s/√n
+        assert distribuciones['media'][g].std() == pytest.approx(x.std(ddof=1) / np.sqrt(len(x)), rel=0.1)
+        assert distribuciones['media'][g].mean() == pytest.approx(x.mean(), abs=0.02)
+
+def test_autocorrelacion_igual_a_statsmodels():
+    x = np.random.default_rng(4).integers(0, 10000, 975).astype(float)
+    resultado = analizar_autocorrelacion(x, lags=20)
+    
+    np.testing.assert_allclose(resultado['pacf'], pacf(x, nlags=20, method='ldb'), atol=1e-10)
+    referencia = acorr_ljungbox(x, lags=20, boxpierce=True)
+    np.testing.assert_allclose(resultado['ljung_box'][1:], referencia['lb_stat'], rtol=1e-10)
+    np.testing.assert_allclose(resultado['box_pierce'][1:], referencia['bp_stat'], rtol=1e-10)
+    np.testing.assert_allclose(resultado['p_box_pierce'][1:], referencia['bp_pvalue'], rtol=1e-8)
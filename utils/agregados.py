@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+from utils.carga_datos import cache_por_version
+from utils.digitos import COLUMNAS_DIGITOS
+from utils.frecuencias import TablaFrecuencias
+
+def _tabla_cruzada(codigos_a, n_a, codigos_b, n_b):
+    """
+    Cuenta combinaciones de dos columnas codificadas con un solo np.bincount.
+    
+    Los códigos negativos (valores nulos) se descartan.
+    
+    Returns:
+        np.ndarray: Matriz de conteos de forma (n_a, n_b)
+    """
+    validos = (codigos_a >= 0) & (codigos_b >= 0)
+    indices = codigos_a[validos].astype(np.int64) * n_b + codigos_b[validos]
+    return np.bincount(indices, minlength=n_a * n_b).reshape(n_a, n_b)
+
+def construir_cubo_agregados(df):
+    """
+    Calcula de una vez los conteos agregados que usan las páginas y gráficos.
+    
+    Incluye conteos por año, mes, periodo mensual, día de semana, dígito por
+    posición, rango de número y rango de serie, sus cruces con el año, y las
+    frecuencias de números, series y paridad.
+    
+    Args:
+        df: DataFrame con los datos procesados
+    
+    Returns:
+        dict: Nombre del agregado → Serie o DataFrame de conteos (las
+              frecuencias de números y series son TablaFrecuencias)
+    """
+    años, cod_año = np.unique(df['año'].to_numpy(), return_inverse=True)
+    n_años = len(años)
+    
+    cubo = {}
+    
+    # Año × mes (el mapa de calor) y sus marginales
+    año_mes = _tabla_cruzada(cod_año, n_años, df['mes'].to_numpy() - 1, 12)
+    cubo['año_mes'] = pd.DataFrame(año_mes, index=pd.Index(años, name='año'),
+                                   columns=pd.Index(range(1, 13), name='mes'))
+    cubo['por_año'] = cubo['año_mes'].sum(axis=1).rename('cantidad')
+    cubo['por_mes'] = cubo['año_mes'].sum(axis=0).rename('cantidad')
+    
+    # Periodos mensuales con al menos un sorteo
+    periodos, conteos = np.unique(df['fecha'].to_numpy().astype('datetime64[M]'), return_counts=True)
+    cubo['por_periodo_mes'] = pd.Series(conteos, index=pd.DatetimeIndex(periodos, name='mes'), name='cantidad')
+    
+    # Año × día de semana
+    año_dia = _tabla_cruzada(cod_año, n_años, df['dia_semana'].to_numpy(), 7)
+    cubo['año_dia_semana'] = pd.DataFrame(año_dia, index=pd.Index(años, name='año'),
+                                          columns=pd.Index(range(7), name='dia_semana'))
+    cubo['por_dia_semana'] = cubo['año_dia_semana'].sum(axis=0).rename('cantidad')
+    
+    # Dígito (0-9) × posición
+    columnas = [c for c in COLUMNAS_DIGITOS if c in df.columns]
+    cubo['digitos'] = pd.DataFrame(
+        {c: np.bincount(df[c].to_numpy(), minlength=10) for c in columnas},
+        index=pd.Index(range(10), name='digito')
+    )
+    
+    # Rangos de número y serie, y su cruce con el año
+    for rango in ('rango_numero', 'rango_serie'):
+        if rango in df.columns:
+            categorias = df[rango].cat.categories
+            cruce = _tabla_cruzada(cod_año, n_años, df[rango].cat.codes.to_numpy(), len(categorias))
+            cubo[f'año_{rango}'] = pd.DataFrame(cruce, index=pd.Index(años, name='año'),
+                                                columns=pd.CategoricalIndex(categorias, name=rango))
+            cubo[f'por_{rango}'] = cubo[f'año_{rango}'].sum(axis=0).rename('cantidad')
+    
+    # Tablas densas de frecuencias de números y series (ver TablaFrecuencias.top)
+    cubo['frecuencia_numero'] = TablaFrecuencias.desde_valores(df['número'], 10000)
+    cubo['frecuencia_serie'] = TablaFrecuencias.desde_valores(df['serie'])
+    
+    if 'numero_par' in df.columns:
+        pares = int(df['numero_par'].sum())
+        cubo['paridad'] = pd.Series({'Par': pares, 'Impar': len(df) - pares}, name='cantidad')
+    
+    return cubo
+
+# Compartido entre sesiones: se construye una vez por versión del dataset
+obtener_cubo_agregados = cache_por_version(construir_cubo_agregados)
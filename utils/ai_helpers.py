@@ -1,6 +1,10 @@
 import streamlit as st
 import google.generativeai as genai
 import pandas as pd
+import re
+from utils.indice_recencia import obtener_indice_recencia, consultar_recencia
+from utils.indice_patrones import obtener_indice_patrones, buscar_patron
+from utils.indice_billetes import obtener_indice_billetes, buscar_billetes
 
 def inicializar_gemini():
     """
@@ -30,6 +34,122 @@ def inicializar_gemini():
         st.error(f"Error al inicializar Gemini: {e}")
         return None
 
+def contexto_recencia(df, pregunta_usuario):
+    """
+    Resume la recencia de los números y series que menciona la pregunta.
+    
+    Cada consulta es una lectura directa en el índice de recencia, así que
+    el costo no depende del tamaño de la historia.
+    
+    Args:
+        df: DataFrame con los datos
+        pregunta_usuario: Pregunta del usuario
+    
+    Returns:
+        str: Una línea por número o serie mencionado (vacío si no hay ninguno)
+    """
+    indice = obtener_indice_recencia(df)
+    
+    consultas = [('serie', 'series', s) for s in re.findall(r'serie\s+(\d{1,4})', pregunta_usuario, re.IGNORECASE)]
+    consultas += [('número', 'numeros', n) for n in re.findall(r'(?<!\d)\d{4}(?!\d)', pregunta_usuario)
+                  if n not in {s for _, _, s in consultas}]
+    
+    lineas = []
+    for nombre, espacio, clave in consultas:
+        r = consultar_recencia(indice, clave, espacio)
+        if r['apariciones'] == 0:
+            lineas.append(f"- {nombre.capitalize()} {clave}: nunca ha salido")
+            continue
+        
+        linea = (
+            f"- {nombre.capitalize()} {clave}: {r['apariciones']} apariciones, última el "
+            f"{r['ultima_fecha']:%Y-%m-%d} (hace {r['sorteos_desde_ultima']} sorteos)"
+        )
+        if r['hueco_medio'] is not None:
+            linea += f", hueco medio {r['hueco_medio']:.0f} sorteos, hueco máximo {r['hueco_maximo']}"
+        lineas.append(linea)
+    
+    return "\n".join(lineas)
+
+def contexto_billetes(df, pregunta_usuario):
+    """
+    Indica si los billetes (número + serie) que menciona la pregunta han ganado.
+    
+    Reconoce menciones como '1234 serie 056' y las verifica todas juntas
+    con el índice de billetes.
+    
+    Args:
+        df: DataFrame con los datos
+        pregunta_usuario: Pregunta del usuario
+    
+    Returns:
+        str: Una línea por billete mencionado (vacío si no hay ninguno)
+    """
+    menciones = re.findall(r'(?<!\d)(\d{4})(?!\d)\D{0,12}?serie\s+(\d{1,4})', pregunta_usuario, re.IGNORECASE)
+    
+    if not menciones:
+        return ""
+    
+    numeros, series = zip(*menciones)
+    verificacion = buscar_billetes(obtener_indice_billetes(df), numeros, series)
+    
+    lineas = []
+    for billete in verificacion.itertuples():
+        if billete.ganador:
+            fechas = ', '.join(pd.to_datetime(billete.fechas).strftime('%Y-%m-%d'))
+            lineas.append(f"- Billete {billete.número:04d} serie {billete.serie}: ganó el premio mayor ({fechas})")
+        else:
+            lineas.append(f"- Billete {billete.número:04d} serie {billete.serie}: nunca ha ganado el premio mayor")
+    
+    return "\n".join(lineas)
+
+def contexto_patrones(df, pregunta_usuario):
+    """
+    Resume los sorteos que cumplen los patrones de dígitos de la pregunta.
+    
+    Reconoce patrones con comodines '*' (p. ej. '*7*3'; el '?' se confunde
+    con la puntuación de la pregunta) y sumas de dígitos
+    ('suma de dígitos 18') y los resuelve con el índice de patrones.
+    
+    Args:
+        df: DataFrame con los datos
+        pregunta_usuario: Pregunta del usuario
+    
+    Returns:
+        str: Una línea por criterio mencionado (vacío si no hay ninguno)
+    """
+    consultas = [
+        (f"Patrón {p}", {'patron': p})
+        for p in re.findall(r'(?<![\w*])[\d*]{4}(?![\w*])', pregunta_usuario)
+        if any(c.isdigit() for c in p) and '*' in p
+    ]
+    consultas += [
+        (f"Suma de dígitos {s}", {'suma': int(s)})
+        for s in re.findall(r'suma[^\d]{0,20}(\d{1,2})', pregunta_usuario, re.IGNORECASE)
+        if int(s) <= 36
+    ]
+    
+    if not consultas:
+        return ""
+    
+    indice = obtener_indice_patrones(df)
+    
+    lineas = []
+    for nombre, criterios in consultas:
+        posiciones = buscar_patron(indice, **criterios)
+        if len(posiciones) == 0:
+            lineas.append(f"- {nombre}: ningún sorteo")
+            continue
+        
+        coincidencias = df.iloc[posiciones]
+        ultimo = coincidencias.loc[coincidencias['fecha'].idxmax()]
+        lineas.append(
+            f"- {nombre}: {len(posiciones)} sorteos ({len(posiciones) / len(df) * 100:.2f}%), "
+            f"último el {ultimo['fecha']:%Y-%m-%d} con el número {int(ultimo['número']):04d}"
+        )
+    
+    return "\n".join(lineas)
+
 def generar_prompt_contexto(df, pregunta_usuario):
     """
     Genera un prompt con contexto del dataset para Gemini.
@@ -46,18 +166,28 @@ def generar_prompt_contexto(df, pregunta_usuario):
 Contexto del Dataset - Lotería de Medellín:
 - Total de registros: {len(df)}
 - Periodo: {df['fecha'].min()} a {df['fecha'].max()}
-- Ciudades: {', '.join(df['ciudad'].unique())}
-- Premio promedio: {df['premio_mayor_millones'].mean():.2f} millones
-- Premio mínimo: {df['premio_mayor_millones'].min()} millones
-- Premio máximo: {df['premio_mayor_millones'].max()} millones
+- Números distintos: {df['número'].nunique()}
+- Series distintas: {df['serie'].nunique()} (de {df['serie'].min()} a {df['serie'].max()})
 
 Columnas disponibles:
 - fecha: Fecha del sorteo
+- sorteo: Número de sorteo
 - número: Número ganador (4 dígitos)
 - serie: Serie del billete
-- premio_mayor_millones: Monto del premio en millones
-- ciudad: Ciudad donde se vendió el billete ganador
-
+"""
+    
+    datos = "\n".join(filter(None, [
+        contexto_billetes(df, pregunta_usuario),
+        contexto_recencia(df, pregunta_usuario),
+        contexto_patrones(df, pregunta_usuario)
+    ]))
+    if datos:
+        resumen += f"""
+Datos calculados para la pregunta:
+{datos}
+"""
+    
+    resumen += f"""
 Primeras filas del dataset:
 {df.head(3).to_string()}
 
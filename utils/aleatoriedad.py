@@ -0,0 +1,394 @@
+import math
+import numpy as np
+import pandas as pd
+from scipy import stats
+from statsmodels.stats.multitest import multipletests
+from utils.digitos import descomponer_digitos, matriz_digitos, COLUMNAS_DIGITOS
+
+# Probabilidades de cada mano en la prueba de póker con 4 dígitos (0-9)
+PROBABILIDADES_POKER = {
+    'todos distintos': 10 * 9 * 8 * 7 / 10 ** 4,
+    'un par': 6 * 10 * 9 * 8 / 10 ** 4,
+    'dos pares': 3 * 10 * 9 / 10 ** 4,
+    'trío o póker': (4 * 10 * 9 + 10) / 10 ** 4,
+}
+
+# Observaciones esperadas mínimas por celda para que la aproximación chi² sea válida
+ESPERADO_MINIMO = 5
+
+def _resultado(prueba, estadistico, p_valor, **detalles):
+    """
+    Formato común del resultado de cada prueba.
+    """
+    return {"prueba": prueba, "estadistico": float(estadistico), "p_valor": float(p_valor), **detalles}
+
+def _prueba_z(prueba, observado, media, varianza, **detalles):
+    """
+    Prueba bilateral con aproximación normal.
+    """
+    z = (observado - media) / np.sqrt(varianza) if varianza > 0 else 0.0
+    return _resultado(prueba, z, 2 * stats.norm.sf(abs(z)), observado=float(observado), esperado=float(media), **detalles)
+
+def _agrupar_celdas(observados, esperados, minimo=ESPERADO_MINIMO):
+    """
+    Une celdas consecutivas hasta que cada una tenga al menos `minimo`
+    observaciones esperadas; el sobrante del final se une a la última.
+    
+    Returns:
+        tuple: (observados, esperados) agrupados
+    """
+    cortes = []
+    acumulado = 0.0
+    for i, esperado in enumerate(esperados):
+        acumulado += esperado
+        if acumulado >= minimo:
+            cortes.append(i + 1)
+            acumulado = 0.0
+    
+    if not cortes:
+        cortes = [len(esperados)]
+    cortes[-1] = len(esperados)
+    inicios = np.array([0] + cortes[:-1])
+    
+    return np.add.reduceat(observados, inicios), np.add.reduceat(esperados, inicios)
+
+def _chi2_agrupado(observados, esperados):
+    """
+    Chi-cuadrado de bondad de ajuste con las celdas agrupadas (ver _agrupar_celdas).
+    
+    Returns:
+        tuple: (chi2, p_valor, celdas); NaN si queda una sola celda
+    """
+    observados, esperados = _agrupar_celdas(np.asarray(observados, dtype=np.float64),
+                                            np.asarray(esperados, dtype=np.float64))
+    if len(observados) < 2:
+        return np.nan, np.nan, len(observados)
+    
+    # Igualar los totales (evita el error de tolerancia de chisquare por redondeo)
+    esperados = esperados * observados.sum() / esperados.sum()
+    chi2, p_valor = stats.chisquare(observados, esperados)
+    return chi2, p_valor, len(observados)
+
+def prueba_rachas_mediana(valores):
+    """
+    Prueba de rachas por encima/debajo de la mediana (Wald-Wolfowitz).
+    
+    Los valores iguales a la mediana se descartan.
+    
+    Args:
+        valores: Array en orden cronológico
+    
+    Returns:
+        dict: Estadístico z, p-value, rachas observadas y esperadas
+    """
+    x = np.asarray(valores, dtype=np.float64)
+    mediana = np.median(x)
+    arriba = x[x != mediana] > mediana
+    
+    n1 = int(arriba.sum())
+    n2 = len(arriba) - n1
+    n = n1 + n2
+    rachas = 1 + int(np.count_nonzero(arriba[1:] != arriba[:-1])) if n else 0
+    
+    media = 2 * n1 * n2 / n + 1 if n else 0
+    varianza = 2 * n1 * n2 * (2 * n1 * n2 - n) / (n ** 2 * (n - 1)) if n > 1 else 0
+    
+    return _prueba_z("Rachas sobre/bajo la mediana", rachas, media, varianza)
+
+def prueba_rachas_ascendentes(valores):
+    """
+    Prueba de rachas ascendentes/descendentes.
+    
+    Se cuentan los cambios de dirección entre diferencias consecutivas
+    (las diferencias nulas se descartan).
+    
+    Args:
+        valores: Array en orden cronológico
+    
+    Returns:
+        dict: Estadístico z, p-value, rachas observadas y esperadas
+    """
+    signos = np.sign(np.diff(np.asarray(valores, dtype=np.float64)))
+    signos = signos[signos != 0]
+    
+    n = len(signos) + 1
+    rachas = 1 + int(np.count_nonzero(signos[1:] != signos[:-1])) if len(signos) else 0
+    
+    return _prueba_z("Rachas ascendentes/descendentes", rachas, (2 * n - 1) / 3, (16 * n - 29) / 90)
+
+def prueba_huecos(valores, alfa=0.0, beta=0.1, maximo=10000, t=20):
+    """
+    Prueba de huecos (gap test).
+    
+    Mide cuántos sorteos pasan entre dos apariciones de un valor en
+    [alfa, beta) (en proporción del dominio) y compara esas longitudes con
+    la distribución geométrica esperada mediante chi-cuadrado.
+    
+    Args:
+        valores: Array en orden cronológico
+        alfa, beta: Intervalo marcado, como fracción de [0, maximo)
+        maximo: Límite superior (exclusivo) del dominio
+        t: Los huecos de longitud >= t se agrupan en una sola clase. Las
+           celdas con menos de ESPERADO_MINIMO esperados se unen a la siguiente.
+    
+    Returns:
+        dict: Estadístico chi², p-value, cantidad de huecos y de celdas
+    """
+    u = np.asarray(valores, dtype=np.float64) / maximo
+    posiciones = np.flatnonzero((u >= alfa) & (u < beta))
+    huecos = np.diff(posiciones) - 1
+    
+    if len(huecos) == 0:
+        return _resultado("Huecos (gap test)", np.nan, np.nan, huecos=0, celdas=0)
+    
+    p = beta - alfa
+    observados = np.bincount(np.minimum(huecos, t), minlength=t + 1)
+    probabilidades = np.append(p * (1 - p) ** np.arange(t), (1 - p) ** t)
+    esperados = probabilidades * len(huecos)
+    
+    chi2, p_valor, celdas = _chi2_agrupado(observados, esperados)
+    return _resultado("Huecos (gap test)", chi2, p_valor, huecos=int(len(huecos)), celdas=celdas)
+
+def prueba_poker(numeros):
+    """
+    Prueba de póker sobre los 4 dígitos de cada número.
+    
+    Clasifica cada número según sus dígitos repetidos (todos distintos, un
+    par, dos pares, trío o póker) y compara con las probabilidades teóricas.
+    Trío y póker se agrupan porque el póker es demasiado raro para chi².
+    
+    Args:
+        numeros: Array de números entre 0 y 9999
+    
+    Returns:
+        dict: Estadístico chi², p-value y conteos observados por mano
+    """
+    # 0: todos distintos, 1: un par, 2: dos pares, 3: trío o póker
+    clase = np.minimum(descomponer_digitos(numeros)['patron_digitos'].codes, 3)
+    observados = np.bincount(clase, minlength=4)
+    esperados = np.array(list(PROBABILIDADES_POKER.values())) * len(clase)
+    
+    chi2, p_valor = stats.chisquare(observados, esperados)
+    return _resultado("Póker (4 dígitos)", chi2, p_valor,
+                      observados=dict(zip(PROBABILIDADES_POKER, observados.tolist())))
+
+def prueba_serial(valores, d=10, maximo=10000):
+    """
+    Prueba serial de pares no solapados.
+    
+    Agrupa los valores en d clases y cuenta los pares consecutivos
+    (x1, x2), (x3, x4), ... en una tabla d×d que debería ser uniforme. Si
+    hay menos de ESPERADO_MINIMO pares esperados por celda, las celdas
+    consecutivas de la tabla se unen.
+    
+    Args:
+        valores: Array en orden cronológico
+        d: Cantidad de clases
+        maximo: Límite superior (exclusivo) del dominio
+    
+    Returns:
+        dict: Estadístico chi², p-value y cantidad de pares y de celdas
+    """
+    clases = (np.asarray(valores, dtype=np.int64) * d) // maximo
+    pares = clases[: len(clases) // 2 * 2].reshape(-1, 2)
+    
+    observados = np.bincount(pares[:, 0] * d + pares[:, 1], minlength=d * d)
+    esperados = np.full(d * d, len(pares) / (d * d))
+    
+    chi2, p_valor, celdas = _chi2_agrupado(observados, esperados)
+    return _resultado("Serial (pares)", chi2, p_valor, pares=int(len(pares)), celdas=celdas)
+
+def _stirling2(n, k):
+    """
+    Número de Stirling de segundo tipo S(n, k) (entero exacto).
+    """
+    return sum((-1) ** i * math.comb(k, i) * (k - i) ** n for i in range(k + 1)) // math.factorial(k)
+
+def prueba_coleccionista(valores, d=10, maximo=10000, t=None):
+    """
+    Prueba del coleccionista de cupones.
+    
+    Divide la secuencia en segmentos que terminan cuando ya aparecieron las
+    d clases, y compara las longitudes de los segmentos con su distribución
+    teórica. La longitud desde cada posición se calcula vectorialmente con
+    la próxima aparición de cada clase, y los segmentos se encadenan por
+    duplicación de saltos (log2(n) pasos vectorizados). Las celdas con
+    menos de ESPERADO_MINIMO segmentos esperados se unen a la siguiente.
+    
+    Args:
+        valores: Array en orden cronológico
+        d: Cantidad de clases (cupones)
+        maximo: Límite superior (exclusivo) del dominio
+        t: Las longitudes >= t se agrupan. Si es None, se usa 3*d.
+    
+    Returns:
+        dict: Estadístico chi², p-value y cantidad de segmentos completos y de celdas
+    """
+    if t is None:
+        t = 3 * d
+    
+    clases = (np.asarray(valores, dtype=np.int64) * d) // maximo
+    n = len(clases)
+    posiciones = np.arange(n)
+    
+    # Próxima aparición de cada clase desde cada posición (n si no hay)
+    proxima = np.full(n, -1, dtype=np.int64)
+    for c in range(d):
+        siguiente = np.where(clases == c, posiciones, n)
+        siguiente = np.minimum.accumulate(siguiente[::-1])[::-1]
+        proxima = np.maximum(proxima, siguiente)
+    
+    # Inicios de los segmentos encadenados desde 0: el segmento que empieza
+    # en i sigue en proxima[i] + 1 (n es un sumidero). Cada paso duplica el
+    # alcance de los saltos y agrega los inicios a esa distancia.
+    saltos = np.append(np.minimum(proxima + 1, n), n)
+    inicios = np.zeros(1, dtype=np.int64)
+    for _ in range(max(1, n.bit_length())):
+        inicios = np.union1d(inicios, saltos[inicios])
+        saltos = saltos[saltos]
+    inicios = inicios[inicios < n]
+    inicios = inicios[proxima[inicios] < n]
+    
+    if len(inicios) == 0:
+        return _resultado("Coleccionista de cupones", np.nan, np.nan, segmentos=0, celdas=0)
+    
+    longitudes = np.minimum(proxima[inicios] - inicios + 1, t)
+    observados = np.bincount(longitudes - d, minlength=t - d + 1)
+    
+    factorial = math.factorial(d)
+    probabilidades = [factorial * _stirling2(r - 1, d - 1) / d ** r for r in range(d, t)]
+    probabilidades.append(1 - factorial * _stirling2(t - 1, d) / d ** (t - 1))
+    esperados = np.array(probabilidades) * len(longitudes)
+    
+    chi2, p_valor, celdas = _chi2_agrupado(observados, esperados)
+    return _resultado("Coleccionista de cupones", chi2, p_valor, segmentos=int(len(longitudes)), celdas=celdas)
+
+def prueba_ks_uniforme_discreta(valores, maximo=10000):
+    """
+    Kolmogorov-Smirnov contra la uniforme discreta en {0, ..., maximo-1}.
+    
+    Ambas funciones de distribución son escalonadas en los mismos puntos,
+    así que D se evalúa en cada entero del dominio con un bincount acumulado.
+    El p-value usa la distribución de Kolmogorov para continuas, que es
+    conservadora en el caso discreto.
+    
+    Args:
+        valores: Array de enteros entre 0 y maximo-1
+        maximo: Tamaño del dominio
+    
+    Returns:
+        dict: Estadístico D y p-value
+    """
+    x = np.asarray(valores, dtype=np.int64)
+    n = len(x)
+    
+    empirica = np.cumsum(np.bincount(x, minlength=maximo)) / n
+    teorica = np.arange(1, maximo + 1) / maximo
+    d = np.abs(empirica - teorica).max()
+    
+    return _resultado("Kolmogorov-Smirnov (uniforme discreta)", d, stats.kstwo.sf(d, n))
+
+def bateria_aleatoriedad(numeros):
+    """
+    Ejecuta todas las pruebas de aleatoriedad sobre los números ganadores.
+    
+    Args:
+        numeros: Números ganadores (0-9999) en orden cronológico
+    
+    Returns:
+        DataFrame: Una fila por prueba con estadístico, p-value y decisión al 5%
+    """
+    numeros = np.asarray(numeros)
+    
+    resultados = [
+        prueba_rachas_mediana(numeros),
+        prueba_rachas_ascendentes(numeros),
+        prueba_huecos(numeros),
+        prueba_poker(numeros),
+        prueba_serial(numeros),
+        prueba_coleccionista(numeros),
+        prueba_ks_uniforme_discreta(numeros),
+    ]
+    
+    tabla = pd.DataFrame([
+        {"prueba": r["prueba"], "estadistico": r["estadistico"], "p_valor": r["p_valor"]}
+        for r in resultados
+    ])
+    tabla["aleatorio_5%"] = tabla["p_valor"] > 0.05
+    
+    return tabla
+
+def conteos_digitos_por_grupo(df, grupo='año'):
+    """
+    Cuenta cada dígito en cada posición para cada grupo con un solo bincount.
+    
+    El índice aplanado (grupo, posición, dígito) permite construir todas las
+    tablas 4×10 a la vez, sin un value_counts por grupo y posición.
+    
+    Args:
+        df: DataFrame con la columna 'número' (o las columnas de dígitos)
+        grupo: Columna o lista de columnas que definen los grupos
+    
+    Returns:
+        tuple: (claves, conteos) donde claves es un Index/MultiIndex con un
+               elemento por grupo y conteos una matriz (grupos, 4, 10)
+    """
+    columnas = [grupo] if isinstance(grupo, str) else list(grupo)
+    codigos, claves = pd.MultiIndex.from_frame(df[columnas]).factorize(sort=True)
+    claves = claves.set_names(columnas)
+    if len(columnas) == 1:
+        claves = claves.get_level_values(0)
+    
+    if set(COLUMNAS_DIGITOS).issubset(df.columns):
+        digitos = df[COLUMNAS_DIGITOS].to_numpy(dtype=np.int64)
+    else:
+        digitos = matriz_digitos(df['número']).astype(np.int64)
+    
+    grupos = len(claves)
+    posiciones = len(COLUMNAS_DIGITOS)
+    indices = (codigos[:, None] * posiciones + np.arange(posiciones)) * 10 + digitos
+    
+    conteos = np.bincount(indices.ravel(), minlength=grupos * posiciones * 10)
+    return claves, conteos.reshape(grupos, posiciones, 10)
+
+def uniformidad_digitos_por_grupo(df, grupo='año', alfa=0.05):
+    """
+    Chi-cuadrado de uniformidad para cada posición de dígito en cada grupo.
+    
+    Todas las pruebas se calculan como una sola operación matricial y los
+    p-values se corrigen por comparaciones múltiples con Holm (controla la
+    probabilidad de algún falso positivo) y Benjamini-Hochberg (controla la
+    proporción de falsos descubrimientos).
+    
+    Args:
+        df: DataFrame con los datos procesados
+        grupo: Columna o lista de columnas (p. ej. 'año' o ['loteria', 'año'])
+        alfa: Nivel de significancia de la corrección
+    
+    Returns:
+        DataFrame: Una fila por grupo y posición con sorteos, chi², p-value,
+                   p-values corregidos y si se rechaza la uniformidad
+    """
+    claves, conteos = conteos_digitos_por_grupo(df, grupo)
+    
+    sorteos = conteos.sum(axis=2)
+    esperados = sorteos[:, :, None] / 10
+    with np.errstate(divide='ignore', invalid='ignore'):
+        chi2 = ((conteos - esperados) ** 2 / esperados).sum(axis=2)
+    p_valores = stats.chi2.sf(chi2, 9).ravel()
+    
+    rechazo_holm, p_holm, _, _ = multipletests(p_valores, alpha=alfa, method='holm')
+    rechazo_bh, p_bh, _, _ = multipletests(p_valores, alpha=alfa, method='fdr_bh')
+    
+    tabla = claves.repeat(len(COLUMNAS_DIGITOS)).to_frame(index=False)
+    tabla['posicion'] = np.tile(COLUMNAS_DIGITOS, len(claves))
+    
+    return tabla.assign(**{
+        'sorteos': sorteos.ravel(),
+        'chi2': chi2.ravel(),
+        'p_valor': p_valores,
+        'p_holm': p_holm,
+        'p_bh': p_bh,
+        'rechazo_holm': rechazo_holm,
+        'rechazo_bh': rechazo_bh
+    })
@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+from statsmodels.tsa.stattools import acf, levinson_durbin
+from utils.carga_datos import cache_por_version
+from utils.digitos import COLUMNAS_DIGITOS
+
+# Series cuya independencia se evalúa por defecto
+COLUMNAS_AUTOCORRELACION = ['número', 'serie'] + COLUMNAS_DIGITOS
+
+def analizar_autocorrelacion(valores, lags=40, alfa=0.05):
+    """
+    ACF, PACF y estadísticos de Ljung-Box y Box-Pierce de una serie.
+    
+    La ACF se calcula con FFT (O(n log n)), así que cientos de rezagos
+    cuestan lo mismo que uno, y la PACF se obtiene de la ACF con
+    Levinson-Durbin sin volver a recorrer los datos. Las bandas de la ACF
+    usan la fórmula de Bartlett y las de la PACF ±z/√n.
+    
+    Args:
+        valores: Array en orden cronológico
+        lags: Cantidad máxima de rezagos
+        alfa: Nivel de significancia de las bandas
+    
+    Returns:
+        dict: Arrays indexados por rezago (el índice 0 es el rezago 0):
+              'acf', 'banda_acf', 'pacf', 'banda_pacf', 'ljung_box',
+              'p_ljung_box', 'box_pierce', 'p_box_pierce'
+    """
+    x = np.asarray(valores, dtype=np.float64)
+    n = len(x)
+    lags = int(min(lags, n - 1))
+    
+    correlaciones, intervalos, ljung_box, p_ljung_box = acf(x, nlags=lags, fft=True, qstat=True, alpha=alfa)
+    
+    # Box-Pierce: n · Σ r_k² hasta cada rezago
+    grados = np.arange(1, lags + 1)
+    box_pierce = n * np.cumsum(correlaciones[1:] ** 2)
+    
+    # PACF por Levinson-Durbin sobre la ACF (equivale a pacf(method='ldb'))
+    if lags > 0:
+        parciales = levinson_durbin(correlaciones, nlags=lags, isacov=True)[2]
+    else:
+        parciales = np.ones(1)
+    
+    z = stats.norm.ppf(1 - alfa / 2)
+    
+    return {
+        'acf': correlaciones,
+        'banda_acf': intervalos[:, 1] - correlaciones,
+        'pacf': parciales,
+        'banda_pacf': np.full(lags + 1, z / np.sqrt(n)),
+        'ljung_box': np.r_[0.0, ljung_box],
+        'p_ljung_box': np.r_[1.0, p_ljung_box],
+        'box_pierce': np.r_[0.0, box_pierce],
+        'p_box_pierce': np.r_[1.0, stats.chi2.sf(box_pierce, grados)]
+    }
+
+def _en_orden_cronologico(df):
+    """
+    Devuelve el DataFrame ordenado por fecha (sin copiar si ya lo está).
+    """
+    if df['fecha'].is_monotonic_increasing:
+        return df
+    return df.sort_values('fecha', kind='stable')
+
+def construir_autocorrelaciones(df, columnas=None, lags=40, alfa=0.05, grupo=None):
+    """
+    Analiza la autocorrelación de varias columnas del dataset.
+    
+    Args:
+        df: DataFrame con los datos procesados
+        columnas: Columnas a analizar. Si es None, COLUMNAS_AUTOCORRELACION.
+        lags: Cantidad máxima de rezagos
+        alfa: Nivel de significancia
+        grupo: Columna para analizar cada historia por separado (p. ej. 'loteria')
+    
+    Returns:
+        dict: {columna: resultado} o, con grupo, {(grupo, columna): resultado};
+              cada resultado como en analizar_autocorrelacion
+    """
+    if columnas is None:
+        columnas = COLUMNAS_AUTOCORRELACION
+    
+    if grupo is None:
+        ordenado = _en_orden_cronologico(df)
+        return {
+            columna: analizar_autocorrelacion(ordenado[columna].to_numpy(), lags, alfa)
+            for columna in columnas
+        }
+    
+    resultados = {}
+    for nombre, parte in df.groupby(grupo, observed=True, sort=True):
+        ordenado = _en_orden_cronologico(parte)
+        for columna in columnas:
+            resultados[(nombre, columna)] = analizar_autocorrelacion(ordenado[columna].to_numpy(), lags, alfa)
+    
+    return resultados
+
+def resumen_autocorrelaciones(resultados):
+    """
+    Tabla resumen de construir_autocorrelaciones.
+    
+    Args:
+        resultados: Diccionario devuelto por construir_autocorrelaciones
+    
+    Returns:
+        DataFrame: Una fila por serie con la ACF en el rezago 1, los
+                   estadísticos Q en el último rezago y los rezagos fuera de banda
+    """
+    filas = []
+    for clave, r in resultados.items():
+        fuera_de_banda = np.abs(r['acf'][1:]) > r['banda_acf'][1:]
+        filas.append({
+            'serie': ' / '.join(map(str, clave)) if isinstance(clave, tuple) else clave,
+            'acf_lag1': r['acf'][1],
+            'rezagos': len(r['acf']) - 1,
+            'ljung_box': r['ljung_box'][-1],
+            'p_ljung_box': r['p_ljung_box'][-1],
+            'box_pierce': r['box_pierce'][-1],
+            'p_box_pierce': r['p_box_pierce'][-1],
+            'rezagos_significativos': int(fuera_de_banda.sum())
+        })
+    
+    return pd.DataFrame(filas)
+
+# Compartido entre sesiones: se construye una vez por versión del dataset
+obtener_autocorrelaciones = cache_por_version(construir_autocorrelaciones)
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+# Elementos (réplicas × observaciones) remuestreados por lote, para acotar la memoria
+ELEMENTOS_POR_LOTE = 2_000_000
+
+# Estadísticos con intervalo bootstrap
+ESTADISTICOS_BOOTSTRAP = ['media', 'mediana', 'desviacion']
+
+def _bootstrap_lote(args):
+    """
+    Remuestrea todos los grupos a la vez para un lote de réplicas.
+    
+    Los valores vienen ordenados por (grupo, valor), así que cada grupo ocupa
+    un tramo contiguo y ordenado. La matriz de índices (réplicas × n) se
+    arma como inicio del grupo + floor(U · tamaño del grupo); al ordenar
+    cada fila de índices, cada tramo queda ordenado por valor y la mediana
+    se lee directamente en el centro del tramo.
+    """
+    semilla, valores, inicios, tamaños, replicas = args
+    rng = np.random.default_rng(semilla)
+    
+    grupo_de = np.repeat(np.arange(len(tamaños)), tamaños)
+    u = rng.random((replicas, len(valores)))
+    indices = inicios[grupo_de] + (u * tamaños[grupo_de]).astype(np.int64)
+    indices.sort(axis=1)
+    
+    muestras = valores[indices]
+    
+    medias = np.add.reduceat(muestras, inicios, axis=1) / tamaños
+    desvios = muestras - medias[:, grupo_de]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        desviaciones = np.sqrt(np.add.reduceat(desvios ** 2, inicios, axis=1) / (tamaños - 1))
+    medianas = (muestras[:, inicios + (tamaños - 1) // 2] + muestras[:, inicios + tamaños // 2]) / 2
+    
+    return {'media': medias, 'mediana': medianas, 'desviacion': desviaciones}
+
+def bootstrap_por_grupo(valores, grupos, replicas=10_000, tamaño_lote=None, procesos=None, semilla=None):
+    """
+    Distribuciones bootstrap de media, mediana y desviación de cada grupo.
+    
+    Todas las réplicas de todos los grupos salen de una misma matriz de
+    índices por lote, sin iterar en Python sobre grupos ni réplicas. Cada
+    lote recibe su propia semilla derivada, así que el resultado es el
+    mismo con o sin procesos paralelos.
+    
+    Args:
+        valores: Array o Serie con los valores (los nulos se descartan)
+        grupos: Array o Serie del mismo largo con el grupo de cada valor
+        replicas: Cantidad de réplicas bootstrap
+        tamaño_lote: Réplicas por lote. Si es None, se ajusta a ELEMENTOS_POR_LOTE.
+        procesos: Procesos en paralelo. Si es None o 1, se ejecuta en el proceso actual.
+        semilla: Semilla para reproducibilidad
+    
+    Returns:
+        tuple: (claves, distribuciones) donde claves son los grupos ordenados
+               y distribuciones un dict con una matriz (grupos, réplicas)
+               por estadístico
+    """
+    valores = pd.Series(np.asarray(valores, dtype=np.float64))
+    codigos, claves = pd.factorize(pd.Series(grupos).reset_index(drop=True), sort=True)
+    
+    validos = (codigos >= 0) & valores.notna().to_numpy()
+    x = valores.to_numpy()[validos]
+    codigos = codigos[validos]
+    
+    orden = np.lexsort((x, codigos))
+    x = x[orden]
+    tamaños = np.bincount(codigos, minlength=len(claves))
+    
+    # Los grupos sin observaciones válidas quedan fuera
+    presentes = tamaños > 0
+    claves = claves[presentes]
+    tamaños = tamaños[presentes]
+    inicios = np.r_[0, np.cumsum(tamaños)[:-1]]
+    
+    if tamaño_lote is None:
+        tamaño_lote = max(1, ELEMENTOS_POR_LOTE // max(len(x), 1))
+    
+    tamaños_lote = [min(tamaño_lote, replicas - i) for i in range(0, replicas, tamaño_lote)]
+    semillas = np.random.SeedSequence(semilla).spawn(len(tamaños_lote))
+    trabajos = [(s, x, inicios, tamaños, r) for s, r in zip(semillas, tamaños_lote)]
+    
+    if procesos is None or procesos <= 1:
+        lotes = [_bootstrap_lote(t) for t in trabajos]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            lotes = list(ejecutor.map(_bootstrap_lote, trabajos))
+    
+    return claves, {
+        clave: np.concatenate([l[clave] for l in lotes], axis=0).T
+        for clave in ESTADISTICOS_BOOTSTRAP
+    }
+
+def intervalos_bootstrap_por_grupo(valores, grupos, replicas=10_000, nivel=0.95,
+                                   tamaño_lote=None, procesos=None, semilla=None):
+    """
+    Intervalos de confianza bootstrap (percentiles) por grupo.
+    
+    Args:
+        valores, grupos, replicas, tamaño_lote, procesos, semilla:
+            ver bootstrap_por_grupo
+        nivel: Nivel de confianza de los intervalos
+    
+    Returns:
+        DataFrame: Indexado por grupo, con columnas <estadístico>_ic_inf y
+                   <estadístico>_ic_sup para media, mediana y desviación
+    """
+    claves, distribuciones = bootstrap_por_grupo(valores, grupos, replicas, tamaño_lote, procesos, semilla)
+    alfa = 1 - nivel
+    
+    columnas = {}
+    for estadistico in ESTADISTICOS_BOOTSTRAP:
+        inferior, superior = np.quantile(distribuciones[estadistico], [alfa / 2, 1 - alfa / 2], axis=1)
+        columnas[f'{estadistico}_ic_inf'] = inferior
+        columnas[f'{estadistico}_ic_sup'] = superior
+    
+    return pd.DataFrame(columnas, index=claves)
@@ -0,0 +1,109 @@
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+import plotly.io as pio
+from utils.carga_datos import version_dataset
+
+# Tamaño máximo (en bytes de JSON) de todas las figuras guardadas
+PRESUPUESTO_BYTES = 64 * 1024 * 1024
+
+# Caché LRU del proceso: clave → JSON de la figura. Es compartida por todas
+# las sesiones, por eso se protege con un candado.
+_figuras = OrderedDict()
+_estado = {'bytes': 0, 'aciertos': 0, 'fallos': 0}
+_candado = threading.Lock()
+
+def _leer(clave):
+    """
+    Devuelve el JSON guardado para la clave y lo marca como usado recientemente.
+    """
+    with _candado:
+        json_figura = _figuras.get(clave)
+        if json_figura is None:
+            _estado['fallos'] += 1
+            return None
+        _figuras.move_to_end(clave)
+        _estado['aciertos'] += 1
+        return json_figura
+
+def _guardar(clave, json_figura):
+    """
+    Guarda el JSON de una figura y desaloja las menos usadas si se excede el presupuesto.
+    """
+    tamaño = len(json_figura)
+    if tamaño > PRESUPUESTO_BYTES:
+        return
+    
+    with _candado:
+        anterior = _figuras.pop(clave, None)
+        if anterior is not None:
+            _estado['bytes'] -= len(anterior)
+        
+        _figuras[clave] = json_figura
+        _estado['bytes'] += tamaño
+        
+        while _estado['bytes'] > PRESUPUESTO_BYTES:
+            _, desalojada = _figuras.popitem(last=False)
+            _estado['bytes'] -= len(desalojada)
+
+def figura_cacheada(constructor):
+    """
+    Decorador que memoiza un constructor de gráficos `constructor(df, ...)`.
+    
+    La clave es (nombre del constructor, versión del dataset, parámetros).
+    Se guarda el JSON serializado de la figura, así que cada llamada recibe
+    una figura nueva que puede modificarse sin afectar la caché. Si el
+    DataFrame no tiene versión (un subconjunto filtrado o reordenado, ver
+    version_dataset) la figura se construye sin caché.
+    """
+    firma = inspect.signature(constructor)
+    
+    @functools.wraps(constructor)
+    def envoltura(df, *args, **kwargs):
+        version = version_dataset(df)
+        if version is None:
+            return constructor(df, *args, **kwargs)
+        
+        # Normalizar parámetros para que f(df, 20) y f(df, top_n=20) compartan clave
+        argumentos = firma.bind(df, *args, **kwargs)
+        argumentos.apply_defaults()
+        parametros = tuple(list(argumentos.arguments.items())[1:])
+        
+        clave = (constructor.__name__, version, parametros)
+        
+        json_figura = _leer(clave)
+        if json_figura is not None:
+            return pio.from_json(json_figura)
+        
+        fig = constructor(df, *args, **kwargs)
+        if fig is not None:
+            _guardar(clave, fig.to_json())
+        
+        return fig
+    
+    return envoltura
+
+def estadisticas_cache_figuras():
+    """
+    Retorna el estado actual de la caché de figuras.
+    
+    Returns:
+        dict: Cantidad de figuras, bytes usados, presupuesto, aciertos y fallos
+    """
+    with _candado:
+        return {
+            "figuras": len(_figuras),
+            "bytes": _estado['bytes'],
+            "presupuesto_bytes": PRESUPUESTO_BYTES,
+            "aciertos": _estado['aciertos'],
+            "fallos": _estado['fallos']
+        }
+
+def limpiar_cache_figuras():
+    """
+    Elimina todas las figuras guardadas.
+    """
+    with _candado:
+        _figuras.clear()
+        _estado['bytes'] = 0
@@ -1,43 +1,191 @@
 import os
+import io
+import hashlib
+import functools
+import inspect
+import numpy as np
 import pandas as pd
 import streamlit as st
+from utils.digitos import agregar_features_digitos, CLASES_PATRON
 
-@st.cache_data
-def cargar_datos_loteria():
+# Versión del pipeline de features. Incrementarla cada vez que cambie la
+# limpieza o las features derivadas para invalidar los snapshots en disco.
+VERSION_FEATURES = 6
+
+# Directorio donde se guardan los snapshots columnares del dataset procesado
+DIRECTORIO_SNAPSHOTS = os.path.join("data", ".cache")
+
+# Nombres de meses y días tal como los devuelve pandas, en orden de calendario
+MESES = ['January', 'February', 'March', 'April', 'May', 'June',
+         'July', 'August', 'September', 'October', 'November', 'December']
+DIAS_SEMANA = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Tipos compactos del dataset procesado. Las columnas categóricas con
+# categorías fijas usan su orden natural; el resto se define al crearlas.
+ESQUEMA_COMPACTO = {
+    'sorteo': 'int32',
+    'número': 'int32',
+    'serie': 'int32',
+    'año': 'int16',
+    'mes': 'int8',
+    'mes_nombre': pd.CategoricalDtype(MESES, ordered=True),
+    'dia_semana': 'int8',
+    'dia_semana_nombre': pd.CategoricalDtype(DIAS_SEMANA, ordered=True),
+    'trimestre': 'int8',
+    'semana_año': 'int8',
+    'dia_año': 'int16',
+    'primer_digito': 'uint8',
+    'segundo_digito': 'uint8',
+    'tercer_digito': 'uint8',
+    'ultimo_digito': 'uint8',
+    'suma_digitos': 'uint8',
+    'producto_digitos': 'uint16',
+    'digitos_distintos': 'uint8',
+    'max_repeticiones': 'uint8',
+    'tiene_digitos_repetidos': 'bool',
+    'es_palindromo': 'bool',
+    'patron_digitos': pd.CategoricalDtype(CLASES_PATRON),
+    'numero_par': 'bool',
+}
+
+
+def resolver_ruta_datos(filename="premio_mayor_loteria_medellin.csv", directorio="data"):
     """
-    Carga los datos de la lotería con parsing de fechas y features derivadas.
-    Usa caché de Streamlit para mejor rendimiento.
+    Resuelve la ruta del CSV de la lotería dentro del directorio de datos.
+    
+    Args:
+        filename: Nombre esperado del archivo
+        directorio: Directorio donde buscar el archivo
     
     Returns:
-        pd.DataFrame: DataFrame con los datos procesados
+        str: Ruta existente del archivo
     """
-    # Nombre esperado
-    filename = "premio_mayor_loteria_medellin.csv"
-
     # Ruta principal
-    ruta = os.path.join("data", filename)
-
-    # Si NO existe, intentar buscarlo dentro de /data/
+    ruta = os.path.join(directorio, filename)
+    
+    # Si NO existe, intentar buscarlo dentro del directorio
     if not os.path.exists(ruta):
-        posibles = os.listdir("data")
-        print("Archivos encontrados en /data/:", posibles)
-
+        posibles = os.listdir(directorio)
+        print(f"Archivos encontrados en {directorio}:", posibles)
+        
         # Buscar coincidencias IGNORANDO may/minus
         for file in posibles:
             if file.lower() == filename.lower():
-                ruta = os.path.join("data", file)
+                ruta = os.path.join(directorio, file)
                 break
-
+    
     # Si aún no existe → ERROR
     if not os.path.exists(ruta):
         raise FileNotFoundError(
             f"No se encontró el archivo en: {ruta}\n"
-            f"Archivos disponibles: {os.listdir('data')}"
+            f"Archivos disponibles: {os.listdir(directorio)}"
         )
+    
+    return ruta
+
+def hash_archivo(ruta, limite=None, tamaño_bloque=1 << 20):
+    """
+    Calcula el hash SHA-256 del contenido de un archivo leyendo por bloques.
+    
+    Args:
+        ruta: Ruta del archivo
+        limite: Si se indica, solo se consideran los primeros `limite` bytes
+        tamaño_bloque: Bytes leídos por iteración
+    
+    Returns:
+        str: Hash hexadecimal del contenido
+    """
+    h = hashlib.sha256()
+    pendientes = limite if limite is not None else float('inf')
+    with open(ruta, 'rb') as f:
+        while pendientes > 0:
+            bloque = f.read(int(min(tamaño_bloque, pendientes)))
+            if not bloque:
+                break
+            h.update(bloque)
+            pendientes -= len(bloque)
+    return h.hexdigest()
+
+def ruta_snapshot(hash_fuente, tamaño_fuente, directorio=DIRECTORIO_SNAPSHOTS):
+    """
+    Ruta del snapshot Parquet para un contenido de origen y versión del pipeline.
+    
+    El nombre guarda también el tamaño en bytes del CSV de origen, necesario
+    para detectar si una versión posterior del archivo solo agregó filas.
+    """
+    return os.path.join(
+        directorio,
+        f"loteria_{hash_fuente[:16]}_{tamaño_fuente}_v{VERSION_FEATURES}.parquet"
+    )
+
+def buscar_snapshot_previo(directorio=DIRECTORIO_SNAPSHOTS):
+    """
+    Busca el snapshot vigente de la versión actual del pipeline.
+    
+    Returns:
+        tuple: (ruta, hash_fuente, tamaño_fuente) o None si no hay snapshot
+    """
+    if not os.path.isdir(directorio):
+        return None
+    
+    sufijo = f"_v{VERSION_FEATURES}.parquet"
+    for archivo in sorted(os.listdir(directorio)):
+        if archivo.startswith('loteria_') and archivo.endswith(sufijo):
+            partes = archivo[:-len(sufijo)].split('_')
+            if len(partes) == 3 and partes[2].isdigit():
+                return os.path.join(directorio, archivo), partes[1], int(partes[2])
+    
+    return None
+
+def leer_snapshot(ruta):
+    """
+    Lee un snapshot Parquet mapeándolo en memoria.
+    
+    Returns:
+        DataFrame o None si el snapshot no existe o no se puede leer
+    """
+    if not os.path.exists(ruta):
+        return None
+    
+    try:
+        return pd.read_parquet(ruta, memory_map=True)
+    except Exception as e:
+        print(f"Snapshot inválido en {ruta}: {e}")
+        return None
+
+def escribir_snapshot(df, ruta):
+    """
+    Escribe el DataFrame procesado como snapshot Parquet.
+    
+    La escritura se hace sobre un archivo temporal que luego se renombra, para
+    que varias réplicas arrancando a la vez nunca lean un snapshot a medias.
+    Si el disco no es escribible solo se registra el error.
+    """
+    try:
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        df.to_parquet(temporal, index=False)
+        os.replace(temporal, ruta)
+        
+        # Eliminar snapshots de versiones anteriores del CSV o del pipeline
+        directorio = os.path.dirname(ruta)
+        for archivo in os.listdir(directorio):
+            antiguo = os.path.join(directorio, archivo)
+            if archivo.startswith('loteria_') and archivo.endswith('.parquet') and antiguo != ruta:
+                os.remove(antiguo)
+    except Exception as e:
+        print(f"No se pudo escribir el snapshot {ruta}: {e}")
 
-    # Cargar CSV con parsing de fechas
-    df = pd.read_csv(ruta)
+def procesar_datos_loteria(df):
+    """
+    Limpia el DataFrame crudo del CSV y agrega las features derivadas.
     
+    Args:
+        df: DataFrame tal como lo entrega pd.read_csv
+    
+    Returns:
+        pd.DataFrame: DataFrame con los datos procesados
+    """
     # Renombrar columnas a minúsculas para consistencia
     df.columns = df.columns.str.lower().str.strip()
     
@@ -65,7 +213,7 @@ def cargar_datos_loteria():
     df['serie'] = df['serie'].astype(int)
     
     # Ordenar por fecha
-    df = df.sort_values('fecha').reset_index(drop=True)
+    df = df.sort_values('fecha', kind='stable').reset_index(drop=True)
     
     # Extraer features temporales
     df = extraer_features_temporales(df)
@@ -73,8 +221,302 @@ def cargar_datos_loteria():
     # Agregar features adicionales
     df = agregar_features_analisis(df)
     
+    # Reducir tipos de datos
+    df = aplicar_esquema_compacto(df)
+    
+    return df
+
+def leer_filas_desde(ruta, desde_byte):
+    """
+    Lee del CSV solo las filas que empiezan a partir de un byte dado.
+    
+    Args:
+        ruta: Ruta del CSV
+        desde_byte: Posición donde empiezan las filas nuevas
+    
+    Returns:
+        pd.DataFrame: Filas nuevas con el encabezado original del CSV
+    """
+    with open(ruta, 'rb') as f:
+        encabezado = f.readline()
+        f.seek(desde_byte)
+        cola = f.read()
+    
+    return pd.read_csv(io.BytesIO(encabezado + cola))
+
+def anexar_sorteos(df, nuevos):
+    """
+    Agrega sorteos ya procesados al final del DataFrame manteniendo el orden por fecha.
+    
+    Args:
+        df: DataFrame procesado y ordenado por fecha
+        nuevos: DataFrame procesado con los sorteos a agregar
+    
+    Returns:
+        pd.DataFrame: DataFrame combinado y ordenado por fecha
+    """
+    if len(nuevos) == 0:
+        return df
+    
+    combinado = pd.concat([df, nuevos], ignore_index=True)
+    
+    # Lo normal es que los sorteos nuevos sean posteriores: no hace falta reordenar.
+    # Si no, ambas partes ya vienen ordenadas y el ordenamiento estable las mezcla
+    # en tiempo casi lineal.
+    if len(df) > 0 and nuevos['fecha'].iloc[0] < df['fecha'].iloc[-1]:
+        combinado = combinado.sort_values('fecha', kind='stable').reset_index(drop=True)
+    
+    return combinado
+
+def actualizar_incremental(ruta, tamaño_fuente, directorio=DIRECTORIO_SNAPSHOTS):
+    """
+    Intenta construir el dataset procesado a partir del último snapshot.
+    
+    Solo aplica cuando el CSV actual es el anterior con filas agregadas al
+    final (el prefijo del archivo coincide byte a byte). En ese caso se
+    parsean y procesan únicamente los bytes posteriores al prefijo: todas
+    sus filas son nuevas, aunque su `sorteo` no sea mayor al último (los
+    sorteos extra tienen numeración propia). Todas las features se calculan
+    fila a fila, así que el resultado es idéntico al de una carga completa.
+    
+    Args:
+        ruta: Ruta del CSV actual
+        tamaño_fuente: Tamaño en bytes del CSV actual
+        directorio: Directorio de los snapshots
+    
+    Returns:
+        pd.DataFrame o None si no es posible una actualización incremental
+    """
+    previo = buscar_snapshot_previo(directorio)
+    if previo is None:
+        return None
+    
+    ruta_previa, hash_previo, tamaño_previo = previo
+    if tamaño_previo >= tamaño_fuente:
+        return None
+    
+    # El archivo anterior debe terminar en un salto de línea y ser prefijo del actual
+    with open(ruta, 'rb') as f:
+        f.seek(tamaño_previo - 1)
+        if f.read(1) != b'\n':
+            return None
+    if hash_archivo(ruta, limite=tamaño_previo)[:16] != hash_previo:
+        return None
+    
+    df = leer_snapshot(ruta_previa)
+    if df is None:
+        return None
+    
+    nuevos = procesar_datos_loteria(leer_filas_desde(ruta, tamaño_previo))
+    
+    return anexar_sorteos(df, nuevos)
+
+def cargar_datos_loteria():
+    """
+    Carga los datos de la lotería con parsing de fechas y features derivadas.
+    Usa caché de Streamlit para mejor rendimiento.
+    
+    La caché se indexa por la fecha de modificación y el tamaño del CSV, de
+    modo que un sorteo nuevo en el archivo se detecta sin reiniciar la app.
+    
+    Returns:
+        pd.DataFrame: DataFrame con los datos procesados
+    """
+    ruta = resolver_ruta_datos()
+    estado = os.stat(ruta)
+    
+    return _cargar_datos_loteria(ruta, estado.st_mtime_ns, estado.st_size)
+
+@st.cache_data(max_entries=2)
+def _cargar_datos_loteria(ruta, mtime_ns, tamaño_fuente):
+    """
+    Carga el dataset procesado del CSV indicado.
+    
+    En frío, primero busca un snapshot Parquet del dataset ya procesado,
+    identificado por el hash del CSV y la versión del pipeline de features.
+    Si no existe, intenta agregar solo los sorteos nuevos al snapshot
+    anterior y, como último recurso, procesa el CSV completo. El resultado
+    se guarda como nuevo snapshot.
+    """
+    hash_fuente = hash_archivo(ruta)
+    snapshot = ruta_snapshot(hash_fuente, tamaño_fuente)
+    
+    df = leer_snapshot(snapshot)
+    
+    if df is None:
+        df = actualizar_incremental(ruta, tamaño_fuente)
+        
+        if df is None:
+            # Cargar CSV con parsing de fechas
+            df = procesar_datos_loteria(pd.read_csv(ruta))
+        
+        escribir_snapshot(df, snapshot)
+    
+    df.attrs['version_datos'] = f"{hash_fuente[:16]}_v{VERSION_FEATURES}"
+    df.attrs['filas_datos'] = len(df)
+    df.attrs['huella_datos'] = huella_filas(df)
+    
     return df
 
+def huella_filas(df):
+    """
+    Huella de las filas del DataFrame y de su orden.
+    
+    Se calcula sobre 'sorteo' (un valor por sorteo) o, si no existe, sobre
+    el índice, así que cambia con cualquier filtro o reordenamiento.
+    
+    Args:
+        df: DataFrame
+    
+    Returns:
+        str: Hash hexadecimal
+    """
+    valores = df['sorteo'].to_numpy() if 'sorteo' in df.columns else df.index.to_numpy()
+    return hashlib.blake2b(np.ascontiguousarray(valores).tobytes(), digest_size=16).hexdigest()
+
+def version_dataset(df):
+    """
+    Identificador de la versión del dataset cargado, para indexar cachés derivadas.
+    
+    pandas propaga `attrs` a los subconjuntos de filas, así que la versión
+    solo se devuelve si el DataFrame tiene exactamente las filas (y el orden)
+    con que se cargó: cantidad de filas y huella de 'sorteo'. Un subconjunto
+    filtrado o reordenado no tiene versión y sus resultados se calculan al
+    vuelo, sin compartir entradas con el dataset completo ni con otros filtros.
+    
+    Args:
+        df: DataFrame devuelto por cargar_datos_loteria (o un subconjunto)
+    
+    Returns:
+        str o None si el DataFrame no es el dataset cargado completo
+    """
+    version = df.attrs.get('version_datos')
+    if version is None or len(df) != df.attrs.get('filas_datos'):
+        return None
+    
+    if huella_filas(df) != df.attrs.get('huella_datos'):
+        return None
+    
+    return version
+
+def cache_por_version(constructor, max_entries=4):
+    """
+    Memoiza `constructor(df, ...)` por versión del dataset, entre reruns y sesiones.
+    
+    La clave es (versión, parámetros normalizados). Si el DataFrame no tiene
+    versión (ver version_dataset) el resultado se calcula al vuelo. Los
+    resultados compartidos son de solo lectura: no modificarlos.
+    
+    Args:
+        constructor: Función que recibe el DataFrame como primer argumento
+        max_entries: Versiones (y combinaciones de parámetros) que se conservan
+    
+    Returns:
+        function: Función con la misma firma que constructor
+    """
+    firma = inspect.signature(constructor)
+    
+    def en_cache(version, parametros, _df):
+        return constructor(_df, **dict(parametros))
+    
+    # Streamlit identifica cada caché por módulo y nombre calificado
+    en_cache.__module__ = constructor.__module__
+    en_cache.__qualname__ = f"{constructor.__qualname__}_en_cache"
+    en_cache = st.cache_resource(max_entries=max_entries)(en_cache)
+    
+    @functools.wraps(constructor)
+    def envoltura(df, *args, **kwargs):
+        version = version_dataset(df)
+        if version is None:
+            return constructor(df, *args, **kwargs)
+        
+        # Normalizar parámetros para que f(df, 40) y f(df, lags=40) compartan entrada
+        argumentos = firma.bind(df, *args, **kwargs)
+        argumentos.apply_defaults()
+        parametros = tuple(list(argumentos.arguments.items())[1:])
+        
+        return en_cache(version, parametros, df)
+    
+    return envoltura
+
+def descubrir_archivos_csv(directorio="data"):
+    """
+    Lista todos los CSV de un directorio (sin distinguir may/minus en la extensión).
+    
+    Args:
+        directorio: Directorio donde buscar
+    
+    Returns:
+        list: Rutas de los CSV encontrados, en orden alfabético
+    """
+    return [
+        os.path.join(directorio, archivo)
+        for archivo in sorted(os.listdir(directorio))
+        if archivo.lower().endswith('.csv') and os.path.isfile(os.path.join(directorio, archivo))
+    ]
+
+def nombre_loteria(ruta):
+    """
+    Deduce el nombre de la lotería a partir del nombre del archivo.
+    
+    Ejemplo: 'data/premio_mayor_loteria_medellin.csv' → 'medellin'
+    """
+    nombre = os.path.splitext(os.path.basename(ruta))[0].lower()
+    for prefijo in ('premio_mayor_loteria_', 'premio_mayor_', 'loteria_'):
+        if nombre.startswith(prefijo):
+            return nombre[len(prefijo):]
+    return nombre
+
+def iterar_chunks_loterias(directorio="data", chunksize=50_000):
+    """
+    Lee por bloques todos los CSV de un directorio y procesa cada bloque.
+    
+    Cada bloque pasa por la misma limpieza y features que la carga de un
+    solo archivo, y se le agrega la columna categórica `loteria`. Solo hay
+    un bloque crudo en memoria a la vez.
+    
+    Args:
+        directorio: Directorio con un CSV por lotería
+        chunksize: Filas leídas por bloque
+    
+    Yields:
+        pd.DataFrame: Bloque procesado
+    """
+    archivos = descubrir_archivos_csv(directorio)
+    categorias = sorted({nombre_loteria(ruta) for ruta in archivos})
+    
+    for ruta in archivos:
+        loteria = nombre_loteria(ruta)
+        for chunk in pd.read_csv(ruta, chunksize=chunksize):
+            bloque = procesar_datos_loteria(chunk)
+            bloque['loteria'] = pd.Categorical([loteria] * len(bloque), categories=categorias)
+            yield bloque
+
+def cargar_datos_loterias(directorio="data", chunksize=50_000):
+    """
+    Carga y procesa todas las loterías disponibles en un directorio.
+    
+    Los archivos se leen por bloques, de modo que el pico de memoria queda
+    acotado por el tamaño del bloque más el resultado final, en lugar de
+    mantener varias copias intermedias de todo el histórico.
+    
+    Args:
+        directorio: Directorio con un CSV por lotería
+        chunksize: Filas leídas por bloque
+    
+    Returns:
+        pd.DataFrame: Sorteos de todas las loterías ordenados por lotería y fecha
+    """
+    bloques = list(iterar_chunks_loterias(directorio, chunksize))
+    
+    if not bloques:
+        raise FileNotFoundError(f"No se encontraron archivos CSV en: {directorio}")
+    
+    df = pd.concat(bloques, ignore_index=True)
+    del bloques
+    
+    return df.sort_values(['loteria', 'fecha'], kind='stable').reset_index(drop=True)
+
 def extraer_features_temporales(df):
     """
     Extrae features temporales de la columna fecha.
@@ -107,10 +549,8 @@ def agregar_features_analisis(df):
     Returns:
         DataFrame con features adicionales
     """
-    # Dígitos del número
-    df['primer_digito'] = df['número'].astype(str).str[0].astype(int)
-    df['ultimo_digito'] = df['número'] % 10
-    df['suma_digitos'] = df['número'].astype(str).apply(lambda x: sum(int(d) for d in x))
+    # Dígitos del número (posiciones, suma, producto, repeticiones, palíndromo)
+    df = agregar_features_digitos(df, 'número')
     
     # Categorías de número
     df['rango_numero'] = pd.cut(df['número'], bins=[0, 2500, 5000, 7500, 10000], 
@@ -125,6 +565,46 @@ def agregar_features_analisis(df):
     
     return df
 
+def aplicar_esquema_compacto(df, esquema=None):
+    """
+    Convierte las columnas del dataset procesado a tipos de datos compactos.
+    
+    Enteros pequeños para rangos acotados, categorías para nombres de mes y
+    día, y booleanos para indicadores. Las columnas ausentes se ignoran.
+    
+    Args:
+        df: DataFrame procesado
+        esquema: Diccionario columna → tipo. Si es None, usa ESQUEMA_COMPACTO.
+    
+    Returns:
+        DataFrame con los tipos convertidos
+    """
+    if esquema is None:
+        esquema = ESQUEMA_COMPACTO
+    
+    return df.astype({col: tipo for col, tipo in esquema.items() if col in df.columns})
+
+def reporte_memoria(df):
+    """
+    Reporta el uso de memoria por columna del DataFrame.
+    
+    Args:
+        df: DataFrame
+    
+    Returns:
+        DataFrame: Columna, tipo, bytes y porcentaje del total
+    """
+    memoria = df.memory_usage(deep=True, index=False)
+    
+    reporte = pd.DataFrame({
+        'columna': memoria.index,
+        'tipo': df.dtypes.astype(str).values,
+        'bytes': memoria.values,
+        'porcentaje': (memoria.values / memoria.sum() * 100).round(2)
+    })
+    
+    return reporte.sort_values('bytes', ascending=False).reset_index(drop=True)
+
 def obtener_metadata_dataset():
     """
     Retorna metadata del dataset.
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+# Potencias de 10 para cada posición del número de 4 dígitos (millar → unidad)
+POTENCIAS = np.array([1000, 100, 10, 1], dtype=np.int64)
+
+# Nombres de las columnas de cada posición, en el mismo orden que POTENCIAS
+COLUMNAS_DIGITOS = ['primer_digito', 'segundo_digito', 'tercer_digito', 'ultimo_digito']
+
+# Clases de patrón de dígitos repetidos: todos distintos, un par, dos pares, trío y póker
+CLASES_PATRON = ['ABCD', 'AABC', 'AABB', 'AAAB', 'AAAA']
+
+def matriz_digitos(numeros):
+    """
+    Descompone números de 0 a 9999 en una matriz de dígitos con relleno a 4 cifras.
+    
+    El número 123 se interpreta como 0123, así que su primer dígito es 0.
+    
+    Args:
+        numeros: Array o Serie de enteros entre 0 y 9999
+    
+    Returns:
+        np.ndarray: Matriz uint8 de forma (n, 4) con un dígito por columna
+    """
+    n = np.asarray(numeros, dtype=np.int64)
+    return ((n[:, None] // POTENCIAS) % 10).astype(np.uint8)
+
+def descomponer_digitos(numeros):
+    """
+    Calcula todas las features de dígitos en una sola pasada vectorizada.
+    
+    Args:
+        numeros: Array o Serie de enteros entre 0 y 9999
+    
+    Returns:
+        dict: Nombre de feature → np.ndarray con un valor por número
+    """
+    d = matriz_digitos(numeros)
+    
+    # Veces que aparece el dígito de cada posición dentro del mismo número
+    repeticiones = (d[:, :, None] == d[:, None, :]).sum(axis=2)
+    max_repeticiones = repeticiones.max(axis=1).astype(np.uint8)
+    
+    # Cantidad de dígitos distintos: cambios entre dígitos consecutivos ya ordenados
+    digitos_distintos = 1 + (np.diff(np.sort(d, axis=1), axis=1) != 0).sum(axis=1)
+    
+    # Clase de patrón (índice en CLASES_PATRON) según distintos y repeticiones
+    clase_patron = np.select(
+        [digitos_distintos == 4, digitos_distintos == 3, (digitos_distintos == 2) & (max_repeticiones == 2),
+         digitos_distintos == 2],
+        [0, 1, 2, 3],
+        default=4
+    )
+    
+    features = {col: d[:, i] for i, col in enumerate(COLUMNAS_DIGITOS)}
+    features.update({
+        'suma_digitos': d.sum(axis=1, dtype=np.uint8),
+        'producto_digitos': d.prod(axis=1, dtype=np.uint16),
+        'digitos_distintos': digitos_distintos.astype(np.uint8),
+        'max_repeticiones': max_repeticiones,
+        'tiene_digitos_repetidos': max_repeticiones > 1,
+        'es_palindromo': (d[:, 0] == d[:, 3]) & (d[:, 1] == d[:, 2]),
+        'patron_digitos': pd.Categorical.from_codes(clase_patron, CLASES_PATRON),
+    })
+    
+    return features
+
+def agregar_features_digitos(df, columna='número'):
+    """
+    Agrega al DataFrame las features de dígitos de una columna numérica.
+    
+    Args:
+        df: DataFrame
+        columna: Columna con números entre 0 y 9999
+    
+    Returns:
+        DataFrame con las columnas de dígitos agregadas
+    """
+    for nombre, valores in descomponer_digitos(df[columna].to_numpy()).items():
+        df[nombre] = valores
+    
+    return df
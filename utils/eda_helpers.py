@@ -1,11 +1,23 @@
+from typing import NamedTuple
 import pandas as pd
 import numpy as np
 from scipy import stats
+from utils.bootstrap import intervalos_bootstrap_por_grupo
+from utils.perfilado import perfilar_chunks
+from utils.frecuencias import TablaFrecuencias
+from utils.carga_datos import cache_por_version
 
 def resumen_dataset(df):
     """
     Retorna un resumen completo del dataset.
+    
+    Si recibe un iterable de bloques (p. ej. iterar_chunks_loterias) en lugar
+    de un DataFrame, el resumen se calcula por streaming con PerfilDataset:
+    los cuartiles y la cantidad de valores distintos son aproximados.
     """
+    if not isinstance(df, pd.DataFrame):
+        return perfilar_chunks(df).resumen()
+    
     return {
         "Filas": df.shape[0],
         "Columnas": df.shape[1],
@@ -14,36 +26,234 @@ def resumen_dataset(df):
         "Estadísticas numéricas": df.describe().to_dict()
     }
 
-def analisis_outliers(df, columna):
+# Factor por defecto de cada método de detección de outliers
+FACTORES_OUTLIERS = {'iqr': 1.5, 'mad': 3.5, 'zscore': 3.0}
+
+class ResultadoOutliers(NamedTuple):
+    """
+    Outliers de varias columnas, sin convertir filas a diccionarios.
+    
+    `limites` tiene una fila por columna; `mascara` es una matriz booleana
+    (filas, columnas) alineada con las posiciones del DataFrame analizado.
+    """
+    metodo: str
+    columnas: list
+    limites: pd.DataFrame
+    mascara: np.ndarray
+    conteos: pd.Series
+    porcentajes: pd.Series
+    
+    def posiciones(self, columna=None):
+        """
+        Posiciones (para df.iloc) de los outliers de una columna, o de
+        cualquier columna si es None.
+        """
+        if columna is None:
+            return np.flatnonzero(self.mascara.any(axis=1))
+        return np.flatnonzero(self.mascara[:, self.columnas.index(columna)])
+    
+    def filas(self, df, columna=None):
+        """
+        Materializa las filas outlier del DataFrame analizado.
+        """
+        return df.iloc[self.posiciones(columna)]
+
+def detectar_outliers(df, columnas=None, metodo='iqr', factor=None):
+    """
+    Detecta outliers en varias columnas numéricas a la vez.
+    
+    Métodos:
+        'iqr': fuera de [Q1 - f·IQR, Q3 + f·IQR] (f = 1.5)
+        'mad': |x - mediana| / (1.4826·MAD) > f (f = 3.5, z modificado)
+        'zscore': |x - media| / desviación > f (f = 3)
+    
+    Todos los cuantiles se calculan con una sola llamada sobre la matriz de
+    columnas, y el resultado son máscaras y conteos; las filas solo se
+    materializan con ResultadoOutliers.filas.
+    
+    Args:
+        df: DataFrame
+        columnas: Columnas a analizar. Si es None, todas las numéricas.
+        metodo: 'iqr', 'mad' o 'zscore'
+        factor: Factor del método. Si es None, se usa FACTORES_OUTLIERS.
+    
+    Returns:
+        ResultadoOutliers
+    """
+    if metodo not in FACTORES_OUTLIERS:
+        raise ValueError(f"Método desconocido: {metodo}. Opciones: {list(FACTORES_OUTLIERS)}")
+    
+    if columnas is None:
+        columnas = list(df.select_dtypes(include=[np.number]).columns)
+    columnas = list(columnas)
+    
+    if factor is None:
+        factor = FACTORES_OUTLIERS[metodo]
+    
+    X = df[columnas].to_numpy(dtype=np.float64)
+    
+    with np.errstate(invalid='ignore'):
+        if metodo == 'iqr':
+            q1, q3 = np.nanquantile(X, [0.25, 0.75], axis=0)
+            iqr = q3 - q1
+            inferior, superior = q1 - factor * iqr, q3 + factor * iqr
+            extra = {'Q1': q1, 'Q3': q3, 'IQR': iqr}
+        elif metodo == 'mad':
+            mediana = np.nanmedian(X, axis=0)
+            escala = 1.4826 * np.nanmedian(np.abs(X - mediana), axis=0)
+            inferior, superior = mediana - factor * escala, mediana + factor * escala
+            extra = {'mediana': mediana, 'escala': escala}
+        else:
+            media = np.nanmean(X, axis=0)
+            escala = np.nanstd(X, axis=0, ddof=1)
+            inferior, superior = media - factor * escala, media + factor * escala
+            extra = {'media': media, 'escala': escala}
+        
+        mascara = (X < inferior) | (X > superior)
+    
+    conteos = pd.Series(mascara.sum(axis=0), index=columnas)
+    
+    limites = pd.DataFrame({**extra, 'limite_inferior': inferior, 'limite_superior': superior}, index=columnas)
+    
+    return ResultadoOutliers(
+        metodo=metodo,
+        columnas=columnas,
+        limites=limites,
+        mascara=mascara,
+        conteos=conteos,
+        porcentajes=conteos / len(df) * 100 if len(df) else conteos.astype(float)
+    )
+
+def analisis_outliers(df, columna, incluir_filas=False):
     """
     Detecta outliers usando el método IQR (Rango Intercuartílico).
     
     Args:
         df: DataFrame
         columna: Nombre de la columna a analizar
+        incluir_filas: Si es True, agrega las filas outlier como lista de
+                       diccionarios en 'outliers' (costoso en datasets grandes)
     
     Returns:
         dict: Información sobre outliers
     """
-    Q1 = df[columna].quantile(0.25)
-    Q3 = df[columna].quantile(0.75)
-    IQR = Q3 - Q1
+    resultado = detectar_outliers(df, [columna], metodo='iqr')
+    limites = resultado.limites.loc[columna]
     
-    limite_inferior = Q1 - 1.5 * IQR
-    limite_superior = Q3 + 1.5 * IQR
+    info = {
+        "Q1": limites['Q1'],
+        "Q3": limites['Q3'],
+        "IQR": limites['IQR'],
+        "limite_inferior": limites['limite_inferior'],
+        "limite_superior": limites['limite_superior'],
+        "cantidad_outliers": int(resultado.conteos[columna]),
+        "porcentaje_outliers": resultado.porcentajes[columna],
+        "posiciones": resultado.posiciones(columna)
+    }
     
-    outliers = df[(df[columna] < limite_inferior) | (df[columna] > limite_superior)]
+    if incluir_filas:
+        info["outliers"] = resultado.filas(df, columna).to_dict('records')
     
-    return {
-        "Q1": Q1,
-        "Q3": Q3,
-        "IQR": IQR,
-        "limite_inferior": limite_inferior,
-        "limite_superior": limite_superior,
-        "cantidad_outliers": len(outliers),
-        "porcentaje_outliers": (len(outliers) / len(df)) * 100,
-        "outliers": outliers.to_dict('records')
-    }
+    return info
+
+def tendencias_lineales(Y, x=None):
+    """
+    Ajusta una recta por mínimos cuadrados a muchas series a la vez.
+    
+    Usa la forma cerrada de OLS sobre la matriz apilada: las sumas
+    centradas de cada fila dan pendiente, intercepto, R² y el p-value de la
+    prueba t de la pendiente (los mismos valores que stats.linregress). Los
+    NaN se ignoran, así que las series pueden tener largos distintos.
+    
+    Args:
+        Y: Matriz (series, n) de valores, con NaN donde no hay dato
+        x: Abscisas (n,) o (series, n). Si es None, 0, 1, ..., n-1.
+    
+    Returns:
+        DataFrame: Una fila por serie con pendiente, intercepto, r_cuadrado,
+                   p_valor, error_estandar y n
+    """
+    Y = np.atleast_2d(np.asarray(Y, dtype=np.float64))
+    X = np.broadcast_to(np.arange(Y.shape[1], dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64), Y.shape)
+    
+    presentes = ~(np.isnan(Y) | np.isnan(X))
+    n = presentes.sum(axis=1)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        media_x = np.where(presentes, X, 0).sum(axis=1) / n
+        media_y = np.where(presentes, Y, 0).sum(axis=1) / n
+        
+        dx = np.where(presentes, X - media_x[:, None], 0)
+        dy = np.where(presentes, Y - media_y[:, None], 0)
+        
+        sxx = (dx * dx).sum(axis=1)
+        syy = (dy * dy).sum(axis=1)
+        sxy = (dx * dy).sum(axis=1)
+        
+        pendiente = sxy / sxx
+        r = np.clip(sxy / np.sqrt(sxx * syy), -1, 1)
+        error_estandar = np.sqrt((1 - r ** 2) * syy / (n - 2) / sxx)
+        t = pendiente / error_estandar
+    
+    p_valor = np.where(n > 2, 2 * stats.t.sf(np.abs(t), n - 2), np.nan)
+    
+    return pd.DataFrame({
+        'pendiente': pendiente,
+        'intercepto': media_y - pendiente * media_x,
+        'r_cuadrado': r ** 2,
+        'p_valor': p_valor,
+        'error_estandar': error_estandar,
+        'n': n
+    })
+
+def tendencias_por_grupo(df, columna_fecha, columnas_valor, grupo=None):
+    """
+    Tendencia lineal de varias columnas, opcionalmente por grupo (p. ej. lotería).
+    
+    Cada serie se ordena por fecha con un solo lexsort sobre arrays (sin
+    copiar el DataFrame) y todas se apilan en una matriz rellena con NaN
+    para ajustarlas juntas con tendencias_lineales. La abscisa es la
+    posición del sorteo dentro de su serie, como en analisis_tendencias.
+    
+    Args:
+        df: DataFrame
+        columna_fecha: Columna de fecha
+        columnas_valor: Columna o lista de columnas a analizar
+        grupo: Columna de agrupación o None
+    
+    Returns:
+        DataFrame: Una fila por (grupo, columna) con los resultados de
+                   tendencias_lineales y una columna 'tendencia'
+    """
+    columnas_valor = [columnas_valor] if isinstance(columnas_valor, str) else list(columnas_valor)
+    
+    if grupo is None:
+        codigos, claves = np.zeros(len(df), dtype=np.int64), pd.Index([None])
+    else:
+        codigos, claves = pd.factorize(df[grupo], sort=True)
+    
+    orden = np.lexsort((df[columna_fecha].to_numpy(), codigos))
+    codigos_ordenados = codigos[orden]
+    validos = codigos_ordenados >= 0
+    orden, codigos_ordenados = orden[validos], codigos_ordenados[validos]
+    
+    tamaños = np.bincount(codigos_ordenados, minlength=len(claves))
+    inicios = np.r_[0, np.cumsum(tamaños)[:-1]]
+    posicion = np.arange(len(orden)) - inicios[codigos_ordenados]
+    
+    # Matriz apilada: fila = grupo × columna, columna = posición en la serie
+    k = len(columnas_valor)
+    Y = np.full((len(claves) * k, max(tamaños.max(initial=0), 1)), np.nan)
+    for c, columna in enumerate(columnas_valor):
+        Y[codigos_ordenados * k + c, posicion] = df[columna].to_numpy(dtype=np.float64)[orden]
+    
+    resultado = tendencias_lineales(Y)
+    resultado.insert(0, 'columna', np.tile(columnas_valor, len(claves)))
+    if grupo is not None:
+        resultado.insert(0, grupo, np.repeat(np.asarray(claves), k))
+    resultado['tendencia'] = np.where(resultado['pendiente'] > 0, 'creciente', 'decreciente')
+    
+    return resultado
 
 def analisis_tendencias(df, columna_fecha, columna_valor):
     """
@@ -57,25 +267,18 @@ def analisis_tendencias(df, columna_fecha, columna_valor):
     Returns:
         dict: Información sobre tendencias
     """
-    df_sorted = df.sort_values(columna_fecha)
-    
-    # Calcular promedio móvil
-    df_sorted['promedio_movil_7'] = df_sorted[columna_valor].rolling(window=7, min_periods=1).mean()
-    
-    # Calcular tendencia lineal
-    x = np.arange(len(df_sorted))
-    y = df_sorted[columna_valor].values
-    slope, intercept, r_value, p_value, std_err = stats.linregress(x, y)
+    resultado = tendencias_por_grupo(df, columna_fecha, columna_valor).iloc[0]
     
     return {
-        "tendencia": "creciente" if slope > 0 else "decreciente",
-        "pendiente": slope,
-        "r_cuadrado": r_value**2,
-        "p_valor": p_value,
-        "significativa": p_value < 0.05
+        "tendencia": resultado['tendencia'],
+        "pendiente": resultado['pendiente'],
+        "r_cuadrado": resultado['r_cuadrado'],
+        "p_valor": resultado['p_valor'],
+        "significativa": resultado['p_valor'] < 0.05
     }
 
-def estadisticas_por_grupo(df, columna_grupo, columna_valor):
+def estadisticas_por_grupo(df, columna_grupo, columna_valor, intervalos=False,
+                           replicas=10_000, nivel=0.95, semilla=42):
     """
     Calcula estadísticas agrupadas.
     
@@ -83,6 +286,11 @@ def estadisticas_por_grupo(df, columna_grupo, columna_valor):
         df: DataFrame
         columna_grupo: Columna para agrupar
         columna_valor: Columna de valores a analizar
+        intervalos: Si es True, agrega intervalos de confianza bootstrap
+                    para la media, la mediana y la desviación estándar
+        replicas: Réplicas bootstrap
+        nivel: Nivel de confianza de los intervalos
+        semilla: Semilla del bootstrap
     
     Returns:
         DataFrame: Estadísticas por grupo
@@ -94,9 +302,23 @@ def estadisticas_por_grupo(df, columna_grupo, columna_valor):
         ('std', 'std'),
         ('min', 'min'),
         ('max', 'max')
-    ]).round(2)
+    ])
+    
+    if intervalos:
+        ic = intervalos_bootstrap_por_grupo(
+            df[columna_valor], df[columna_grupo], replicas=replicas, nivel=nivel, semilla=semilla
+        )
+        nombres = {'media': 'mean', 'mediana': 'median', 'desviacion': 'std'}
+        ic.columns = [
+            f"{nombres[columna.rsplit('_ic_', 1)[0]]}_ic_{columna.rsplit('_ic_', 1)[1]}"
+            for columna in ic.columns
+        ]
+        stats_grupo = stats_grupo.join(ic)
     
-    return stats_grupo.reset_index()
+    return stats_grupo.round(2).reset_index()
+
+# Con intervalos=True el bootstrap cuesta décimas de segundo: se calcula una vez por versión
+obtener_estadisticas_por_grupo = cache_por_version(estadisticas_por_grupo)
 
 def analisis_frecuencias(df, columna):
     """
@@ -109,8 +331,14 @@ def analisis_frecuencias(df, columna):
     Returns:
         DataFrame: Tabla de frecuencias
     """
-    frecuencias = df[columna].value_counts().reset_index()
-    frecuencias.columns = [columna, 'frecuencia']
+    valores = df[columna]
+    
+    if pd.api.types.is_integer_dtype(valores) and valores.min() >= 0:
+        # Dominio entero no negativo: tabla densa con bincount
+        frecuencias = TablaFrecuencias.desde_valores(valores, nombre=columna).top()
+    else:
+        frecuencias = valores.value_counts().reset_index()
+        frecuencias.columns = [columna, 'frecuencia']
     frecuencias['porcentaje'] = (frecuencias['frecuencia'] / len(df) * 100).round(2)
     
     return frecuencias
@@ -130,33 +358,111 @@ def detectar_valores_faltantes(df):
     
     return faltantes[faltantes['cantidad_faltantes'] > 0]
 
-def analisis_correlacion(df, umbral=0.5):
+def _correlacion_por_pares(A, MA, B, MB):
+    """
+    Correlación de Pearson entre las columnas de A y las de B usando solo las
+    filas donde ambas columnas tienen datos (como DataFrame.corr).
+    
+    A y B vienen centradas y con los nulos en 0; MA y MB son sus máscaras
+    de valores presentes (como float).
+    
+    Returns:
+        tuple: (matriz de correlaciones, matriz de observaciones por par)
+    """
+    n = MA.T @ MB
+    suma_a = A.T @ MB
+    suma_b = MA.T @ B
+    suma_ab = A.T @ B
+    suma_aa = (A * A).T @ MB
+    suma_bb = MA.T @ (B * B)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covarianza = n * suma_ab - suma_a * suma_b
+        varianzas = (n * suma_aa - suma_a ** 2) * (n * suma_bb - suma_b ** 2)
+        r = np.clip(covarianza / np.sqrt(varianzas), -1, 1)
+    
+    return r, n
+
+def _p_valor_correlacion(r, n):
+    """
+    P-value bilateral de H0: ρ = 0 con t = r·√((n-2)/(1-r²)).
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = r * np.sqrt((n - 2) / (1 - r ** 2))
+    return 2 * stats.t.sf(np.abs(t), n - 2)
+
+def analisis_correlacion(df, umbral=0.5, metodo='pearson', tamaño_bloque=None):
     """
     Encuentra correlaciones significativas entre variables numéricas.
     
+    Calcula Pearson y Spearman con sus p-values para todos los pares a la
+    vez. Con tamaño_bloque, la matriz se recorre por bloques de columnas y
+    nunca se arma más que un bloque × bloque de ella, para frames anchos.
+    Con valores nulos, cada par usa las filas donde ambas variables tienen
+    datos; los rangos de Spearman se calculan por columna.
+    
     Args:
         df: DataFrame
         umbral: Umbral mínimo de correlación (absoluto)
+        metodo: Coeficiente al que se aplica el umbral ('pearson' o 'spearman')
+        tamaño_bloque: Columnas por bloque. Si es None, un solo bloque.
     
     Returns:
-        DataFrame: Pares de variables con correlación significativa
-    """
-    # Seleccionar solo columnas numéricas
-    df_num = df.select_dtypes(include=[np.number])
-    
-    # Calcular matriz de correlación
-    corr_matrix = df_num.corr()
-    
-    # Encontrar correlaciones significativas
-    correlaciones = []
-    for i in range(len(corr_matrix.columns)):
-        for j in range(i+1, len(corr_matrix.columns)):
-            if abs(corr_matrix.iloc[i, j]) >= umbral:
-                correlaciones.append({
-                    'variable_1': corr_matrix.columns[i],
-                    'variable_2': corr_matrix.columns[j],
-                    'correlacion': round(corr_matrix.iloc[i, j], 3)
-                })
-    
-    return pd.DataFrame(correlaciones)
-
+        DataFrame: Pares de variables con correlación significativa, en el
+                   orden de las columnas, con ambos coeficientes y sus p-values
+    """
+    # Seleccionar columnas numéricas; los indicadores bool cuentan como 0/1
+    df_num = df.select_dtypes(include=[np.number, 'bool'])
+    columnas = df_num.columns
+    k = len(columnas)
+    
+    presentes = df_num.notna().to_numpy(dtype=np.float64)
+    
+    def preparar(valores):
+        centrados = valores - np.nanmean(valores, axis=0)
+        return np.nan_to_num(centrados)
+    
+    with np.errstate(invalid='ignore'):
+        X = preparar(df_num.to_numpy(dtype=np.float64))
+        R = preparar(df_num.rank().to_numpy(dtype=np.float64))
+    
+    if tamaño_bloque is None:
+        tamaño_bloque = max(k, 1)
+    
+    pares = []
+    for inicio_i in range(0, k, tamaño_bloque):
+        bloque_i = slice(inicio_i, min(inicio_i + tamaño_bloque, k))
+        for inicio_j in range(inicio_i, k, tamaño_bloque):
+            bloque_j = slice(inicio_j, min(inicio_j + tamaño_bloque, k))
+            
+            pearson, n = _correlacion_por_pares(X[:, bloque_i], presentes[:, bloque_i], X[:, bloque_j], presentes[:, bloque_j])
+            spearman, _ = _correlacion_por_pares(R[:, bloque_i], presentes[:, bloque_i], R[:, bloque_j], presentes[:, bloque_j])
+            
+            # Triángulo superior: índice global de columna j mayor que el de i
+            i_global = np.arange(bloque_i.start, bloque_i.stop)[:, None]
+            j_global = np.arange(bloque_j.start, bloque_j.stop)[None, :]
+            criterio = pearson if metodo == 'pearson' else spearman
+            filas, cols = np.nonzero((j_global > i_global) & (np.abs(criterio) >= umbral))
+            
+            if len(filas):
+                pares.append(pd.DataFrame({
+                    'i': filas + bloque_i.start,
+                    'j': cols + bloque_j.start,
+                    'correlacion': pearson[filas, cols],
+                    'p_valor': _p_valor_correlacion(pearson[filas, cols], n[filas, cols]),
+                    'spearman': spearman[filas, cols],
+                    'p_valor_spearman': _p_valor_correlacion(spearman[filas, cols], n[filas, cols]),
+                    'n': n[filas, cols].astype(np.int64)
+                }))
+    
+    if not pares:
+        return pd.DataFrame(columns=['variable_1', 'variable_2', 'correlacion', 'p_valor',
+                                     'spearman', 'p_valor_spearman', 'n'])
+    
+    resultado = pd.concat(pares, ignore_index=True).sort_values(['i', 'j'], ignore_index=True)
+    resultado.insert(0, 'variable_1', columnas[resultado['i']])
+    resultado.insert(1, 'variable_2', columnas[resultado['j']])
+    resultado['correlacion'] = resultado['correlacion'].round(3)
+    resultado['spearman'] = resultado['spearman'].round(3)
+    
+    return resultado.drop(columns=['i', 'j'])
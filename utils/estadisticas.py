@@ -0,0 +1,137 @@
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+from utils.carga_datos import cache_por_version, MESES, DIAS_SEMANA
+
+class ResumenColumna(NamedTuple):
+    """
+    Estadísticas descriptivas de una columna numérica.
+    """
+    conteo: int
+    nulos: int
+    media: float
+    desviacion: float
+    minimo: float
+    q1: float
+    mediana: float
+    q3: float
+    maximo: float
+    moda: float
+    frecuencia_moda: int
+    distintos: int
+    
+    @property
+    def coef_variacion(self):
+        """Desviación estándar como porcentaje de la media."""
+        return self.desviacion / self.media * 100 if self.media else float('nan')
+
+class ResumenDataset(NamedTuple):
+    """
+    Estadísticas del dataset completo que comparten las páginas.
+    """
+    filas: int
+    columnas: int
+    completitud: float
+    fecha_min: pd.Timestamp
+    fecha_max: pd.Timestamp
+    año_min: int
+    año_max: int
+    años: int
+    numero: ResumenColumna
+    serie: ResumenColumna
+    sorteo: ResumenColumna
+    dia_mas_comun: str
+    frecuencia_dia: int
+    mes_mas_comun: str
+    frecuencia_mes: int
+    pares: int
+
+def _cuantil_ordenado(ordenados, q):
+    """
+    Cuantil con interpolación lineal (igual que pandas) sobre datos ya ordenados.
+    """
+    posicion = (len(ordenados) - 1) * q
+    inferior = int(np.floor(posicion))
+    superior = min(inferior + 1, len(ordenados) - 1)
+    fraccion = posicion - inferior
+    return float(ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * fraccion)
+
+def resumir_columna(valores):
+    """
+    Calcula las estadísticas de una columna con un solo ordenamiento.
+    
+    Mínimo, máximo, cuartiles, moda y valores distintos salen del array
+    ordenado; la moda es el valor de la racha más larga (el menor en caso
+    de empate, como Series.mode()[0]).
+    
+    Args:
+        valores: Serie o array numérico
+    
+    Returns:
+        ResumenColumna
+    """
+    valores = pd.Series(valores)
+    nulos = int(valores.isna().sum())
+    ordenados = np.sort(valores.dropna().to_numpy())
+    n = len(ordenados)
+    
+    if n == 0:
+        nan = float('nan')
+        return ResumenColumna(0, nulos, nan, nan, nan, nan, nan, nan, nan, nan, 0, 0)
+    
+    # Rachas de valores iguales en el array ordenado
+    inicios = np.flatnonzero(np.r_[True, ordenados[1:] != ordenados[:-1]])
+    largos = np.diff(np.r_[inicios, n])
+    mas_larga = int(np.argmax(largos))
+    
+    return ResumenColumna(
+        conteo=n,
+        nulos=nulos,
+        media=float(ordenados.mean()),
+        desviacion=float(ordenados.std(ddof=1)) if n > 1 else float('nan'),
+        minimo=ordenados[0].item(),
+        q1=_cuantil_ordenado(ordenados, 0.25),
+        mediana=_cuantil_ordenado(ordenados, 0.5),
+        q3=_cuantil_ordenado(ordenados, 0.75),
+        maximo=ordenados[-1].item(),
+        moda=ordenados[inicios[mas_larga]].item(),
+        frecuencia_moda=int(largos[mas_larga]),
+        distintos=len(inicios)
+    )
+
+def construir_resumen_estadistico(df):
+    """
+    Calcula el resumen estadístico del dataset procesado.
+    
+    Args:
+        df: DataFrame con los datos procesados
+    
+    Returns:
+        ResumenDataset
+    """
+    filas, columnas = df.shape
+    
+    dias = np.bincount(df['dia_semana'].to_numpy(), minlength=7)
+    meses = np.bincount(df['mes'].to_numpy() - 1, minlength=12)
+    
+    return ResumenDataset(
+        filas=filas,
+        columnas=columnas,
+        completitud=float((1 - df.isnull().sum().sum() / (filas * columnas)) * 100) if filas else 0.0,
+        fecha_min=df['fecha'].min(),
+        fecha_max=df['fecha'].max(),
+        año_min=int(df['año'].min()),
+        año_max=int(df['año'].max()),
+        años=int(df['año'].nunique()),
+        numero=resumir_columna(df['número']),
+        serie=resumir_columna(df['serie']),
+        sorteo=resumir_columna(df['sorteo']),
+        dia_mas_comun=DIAS_SEMANA[int(np.argmax(dias))],
+        frecuencia_dia=int(dias.max()),
+        mes_mas_comun=MESES[int(np.argmax(meses))],
+        frecuencia_mes=int(meses.max()),
+        pares=int(df['numero_par'].sum())
+    )
+
+# Compartido entre sesiones: se construye una vez por versión del dataset
+obtener_resumen_estadistico = cache_por_version(construir_resumen_estadistico)
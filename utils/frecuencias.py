@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+
+class TablaFrecuencias:
+    """
+    Tabla densa de frecuencias de enteros no negativos en [0, tamaño).
+    
+    Los conteos viven en un array indexado por valor (np.bincount), así que
+    construirla es O(n), el top-k es O(tamaño) con argpartition y combinar o
+    restar tablas (por año, por lotería o por ventana) es una suma de arrays.
+    """
+    
+    def __init__(self, conteos, nombre='valor'):
+        self.conteos = np.asarray(conteos, dtype=np.int64)
+        self.nombre = nombre
+    
+    @classmethod
+    def desde_valores(cls, valores, tamaño=None, nombre=None):
+        """
+        Cuenta los valores (los nulos se descartan).
+        
+        Args:
+            valores: Serie o array de enteros no negativos
+            tamaño: Tamaño mínimo del dominio (p. ej. 10000 para 'número')
+            nombre: Nombre de la columna de valores. Si es None, el de la Serie.
+        
+        Returns:
+            TablaFrecuencias
+        """
+        if nombre is None:
+            nombre = getattr(valores, 'name', None) or 'valor'
+        
+        valores = pd.Series(valores)
+        enteros = valores.dropna().to_numpy(dtype=np.int64)
+        
+        return cls(np.bincount(enteros, minlength=tamaño or 0), nombre)
+    
+    @classmethod
+    def por_grupo(cls, valores, grupos, tamaño=None, nombre=None):
+        """
+        Una tabla por grupo con un solo np.bincount sobre (grupo, valor).
+        
+        Args:
+            valores: Serie o array de enteros no negativos
+            grupos: Serie o array del mismo largo con el grupo de cada valor
+            tamaño: Tamaño mínimo del dominio
+            nombre: Nombre de la columna de valores
+        
+        Returns:
+            dict: {grupo: TablaFrecuencias}, con los grupos ordenados
+        """
+        if nombre is None:
+            nombre = getattr(valores, 'name', None) or 'valor'
+        
+        valores = pd.Series(valores).reset_index(drop=True)
+        codigos, claves = pd.factorize(pd.Series(grupos).reset_index(drop=True), sort=True)
+        
+        validos = (codigos >= 0) & valores.notna().to_numpy()
+        enteros = valores.to_numpy()[validos].astype(np.int64)
+        codigos = codigos[validos]
+        
+        ancho = max(tamaño or 0, int(enteros.max(initial=-1)) + 1)
+        conteos = np.bincount(codigos * ancho + enteros, minlength=len(claves) * ancho).reshape(len(claves), ancho)
+        
+        return {clave: cls(fila, nombre) for clave, fila in zip(claves, conteos)}
+    
+    @property
+    def total(self):
+        """Cantidad de observaciones contadas."""
+        return int(self.conteos.sum())
+    
+    @property
+    def distintos(self):
+        """Cantidad de valores con al menos una observación."""
+        return int(np.count_nonzero(self.conteos))
+    
+    def _alinear(self, otra):
+        """
+        Conteos de ambas tablas con el mismo largo (rellenando con ceros).
+        """
+        largo = max(len(self.conteos), len(otra.conteos))
+        a = np.pad(self.conteos, (0, largo - len(self.conteos)))
+        b = np.pad(otra.conteos, (0, largo - len(otra.conteos)))
+        return a, b
+    
+    def combinar(self, otra):
+        """
+        Tabla con los conteos de ambas (p. ej. dos años o dos loterías).
+        """
+        a, b = self._alinear(otra)
+        return TablaFrecuencias(a + b, self.nombre)
+    
+    def restar(self, otra):
+        """
+        Tabla sin las observaciones de otra contenida en ella (p. ej. para
+        pasar de una historia acumulada a una ventana).
+        
+        Raises:
+            ValueError: Si algún conteo queda negativo
+        """
+        a, b = self._alinear(otra)
+        diferencia = a - b
+        
+        if (diferencia < 0).any():
+            raise ValueError("La tabla a restar no está contenida en esta tabla")
+        
+        return TablaFrecuencias(diferencia, self.nombre)
+    
+    __add__ = combinar
+    __sub__ = restar
+    
+    def top(self, k=None):
+        """
+        Los k valores más frecuentes, de mayor a menor frecuencia.
+        
+        Los empates se ordenan por valor ascendente. Solo se ordenan los k
+        seleccionados con argpartition, no el dominio completo.
+        
+        Args:
+            k: Cantidad de valores. Si es None, todos los observados.
+        
+        Returns:
+            DataFrame: Columnas <nombre> y 'frecuencia'
+        """
+        observados = self.distintos
+        k = observados if k is None else min(int(k), observados)
+        
+        # Clave única por valor: más frecuencia primero y, a igual frecuencia, menor valor
+        tamaño = len(self.conteos)
+        claves = self.conteos * tamaño + (tamaño - 1 - np.arange(tamaño))
+        
+        if 0 < k < tamaño:
+            seleccion = np.argpartition(-claves, k - 1)[:k]
+        else:
+            seleccion = np.arange(tamaño)[:k]
+        seleccion = seleccion[np.argsort(-claves[seleccion])]
+        
+        return pd.DataFrame({self.nombre: seleccion, 'frecuencia': self.conteos[seleccion]})
+    
+    def moda(self):
+        """
+        Valor más frecuente y su frecuencia (el menor valor en caso de
+        empate, como Series.mode()[0]).
+        
+        Returns:
+            tuple: (valor, frecuencia), o (None, 0) si la tabla está vacía
+        """
+        if self.total == 0:
+            return None, 0
+        
+        valor = int(np.argmax(self.conteos))
+        return valor, int(self.conteos[valor])
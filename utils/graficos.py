@@ -1,16 +1,22 @@
 import plotly.express as px
 import plotly.graph_objects as go
-import pandas as pd
+from plotly.subplots import make_subplots
 import numpy as np
+from scipy import stats
+from utils.agregados import obtener_cubo_agregados
+from utils.autocorrelacion import obtener_autocorrelaciones
+from utils.deriva import deriva_por_grupo
+from utils.transiciones import obtener_transiciones
+from utils.digitos import COLUMNAS_DIGITOS
+from utils.cache_figuras import figura_cacheada
 
+@figura_cacheada
 def grafico_sorteos_tiempo(df):
     """
     Gráfico de línea mostrando la frecuencia de sorteos en el tiempo.
     """
     # Contar sorteos por mes
-    sorteos_mes = df.groupby([df['fecha'].dt.to_period('M')]).size().reset_index()
-    sorteos_mes.columns = ['mes', 'cantidad']
-    sorteos_mes['mes'] = sorteos_mes['mes'].dt.to_timestamp()
+    sorteos_mes = obtener_cubo_agregados(df)['por_periodo_mes'].reset_index()
     
     fig = px.line(
         sorteos_mes,
@@ -24,17 +30,52 @@ def grafico_sorteos_tiempo(df):
     fig.update_layout(height=500)
     return fig
 
+def _figura_histograma(valores, bordes, titulo, etiqueta_x, color):
+    """
+    Histograma calculado en el servidor y dibujado como barras.
+    
+    El navegador recibe solo un conteo por bin en lugar de todos los valores.
+    
+    Args:
+        valores: Array con los valores a agrupar
+        bordes: Bordes de los bins (los bins son [a, b))
+        titulo: Título del gráfico
+        etiqueta_x: Nombre del eje X
+        color: Color de las barras
+    """
+    bordes = np.asarray(bordes)
+    conteos, _ = np.histogram(valores, bins=bordes)
+    
+    fig = go.Figure(go.Bar(
+        x=(bordes[:-1] + bordes[1:]) / 2,
+        y=conteos,
+        width=np.diff(bordes),
+        customdata=np.column_stack([bordes[:-1], bordes[1:] - 1]),
+        hovertemplate=f'{etiqueta_x}: %{{customdata[0]}}-%{{customdata[1]}}<br>Frecuencia: %{{y}}<extra></extra>',
+        marker_color=color
+    ))
+    
+    fig.update_layout(
+        title=titulo,
+        xaxis_title=etiqueta_x,
+        yaxis_title='Frecuencia',
+        bargap=0
+    )
+    
+    return fig
+
+@figura_cacheada
 def grafico_distribucion_numeros(df):
     """
     Histograma de la distribución de números ganadores.
     """
-    fig = px.histogram(
-        df,
-        x='número',
-        nbins=50,
-        title='Distribución de Números Ganadores',
-        labels={'número': 'Número Ganador', 'count': 'Frecuencia'},
-        color_discrete_sequence=['#636EFA']
+    # 50 bins fijos de 200 números entre 0 y 9999
+    fig = _figura_histograma(
+        df['número'].to_numpy(),
+        np.arange(0, 10001, 200),
+        'Distribución de Números Ganadores',
+        'Número Ganador',
+        '#636EFA'
     )
     
     fig.update_layout(
@@ -44,17 +85,27 @@ def grafico_distribucion_numeros(df):
     
     return fig
 
+@figura_cacheada
 def grafico_distribucion_series(df):
     """
     Histograma de la distribución de series.
     """
-    fig = px.histogram(
-        df,
-        x='serie',
-        nbins=50,
-        title='Distribución de Series Ganadoras',
-        labels={'serie': 'Serie', 'count': 'Frecuencia'},
-        color_discrete_sequence=['#EF553B']
+    series = df['serie'].to_numpy()
+    
+    # Hasta 50 bins de ancho entero entre la serie mínima y la máxima (sin
+    # datos, p. ej. con filtros vacíos, un histograma vacío de 000 a 999)
+    if len(series) == 0:
+        minimo, maximo = 0, 999
+    else:
+        minimo, maximo = int(series.min()), int(series.max())
+    ancho = max(1, -(-(maximo - minimo + 1) // 50))
+    
+    fig = _figura_histograma(
+        series,
+        np.arange(minimo, maximo + ancho + 1, ancho),
+        'Distribución de Series Ganadoras',
+        'Serie',
+        '#EF553B'
     )
     
     fig.update_layout(
@@ -64,6 +115,7 @@ def grafico_distribucion_series(df):
     
     return fig
 
+@figura_cacheada
 def grafico_numeros_por_año(df):
     """
     Box plot de números ganadores por año.
@@ -85,6 +137,7 @@ def grafico_numeros_por_año(df):
     
     return fig
 
+@figura_cacheada
 def grafico_series_por_año(df):
     """
     Box plot de series por año.
@@ -106,17 +159,15 @@ def grafico_series_por_año(df):
     
     return fig
 
+@figura_cacheada
 def grafico_heatmap_mes_año(df):
     """
     Mapa de calor mostrando cantidad de sorteos por mes y año.
     """
-    pivot_data = df.pivot_table(
-        values='sorteo',
-        index='año',
-        columns='mes',
-        aggfunc='count',
-        fill_value=0
-    )
+    pivot_data = obtener_cubo_agregados(df)['año_mes']
+    
+    # Solo los meses con al menos un sorteo
+    pivot_data = pivot_data.loc[:, pivot_data.sum() > 0]
     
     # Nombres de meses
     meses = ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 
@@ -135,6 +186,7 @@ def grafico_heatmap_mes_año(df):
     
     return fig
 
+@figura_cacheada
 def grafico_frecuencia_digitos(df, posicion='primer'):
     """
     Gráfico de barras de frecuencia de dígitos.
@@ -148,7 +200,7 @@ def grafico_frecuencia_digitos(df, posicion='primer'):
     if columna not in df.columns:
         return None
     
-    frecuencias = df[columna].value_counts().sort_index().reset_index()
+    frecuencias = obtener_cubo_agregados(df)['digitos'][columna].reset_index()
     frecuencias.columns = ['digito', 'frecuencia']
     
     titulo = f'Frecuencia del {"Primer" if posicion == "primer" else "Último"} Dígito'
@@ -167,12 +219,13 @@ def grafico_frecuencia_digitos(df, posicion='primer'):
     
     return fig
 
+@figura_cacheada
 def grafico_scatter_numero_serie(df):
     """
     Gráfico de dispersión entre número y serie.
     """
-    # Tomar una muestra si hay muchos datos
-    df_sample = df.sample(min(500, len(df)))
+    # Tomar una muestra si hay muchos datos (con semilla fija: la figura se cachea)
+    df_sample = df.sample(min(500, len(df)), random_state=0)
     
     fig = px.scatter(
         df_sample,
@@ -189,6 +242,7 @@ def grafico_scatter_numero_serie(df):
     
     return fig
 
+@figura_cacheada
 def grafico_tendencia_sorteos(df):
     """
     Gráfico de tendencia de sorteos acumulados en el tiempo.
@@ -208,6 +262,7 @@ def grafico_tendencia_sorteos(df):
     
     return fig
 
+@figura_cacheada
 def grafico_numeros_pares_impares(df):
     """
     Gráfico de pie mostrando proporción de números pares vs impares.
@@ -215,9 +270,8 @@ def grafico_numeros_pares_impares(df):
     if 'numero_par' not in df.columns:
         return None
     
-    conteo = df['numero_par'].value_counts().reset_index()
+    conteo = obtener_cubo_agregados(df)['paridad'].sort_values(ascending=False).reset_index()
     conteo.columns = ['tipo', 'cantidad']
-    conteo['tipo'] = conteo['tipo'].map({1: 'Par', 0: 'Impar'})
     
     fig = px.pie(
         conteo,
@@ -231,12 +285,12 @@ def grafico_numeros_pares_impares(df):
     
     return fig
 
+@figura_cacheada
 def grafico_top_numeros(df, top_n=20):
     """
     Gráfico de los números más frecuentes.
     """
-    top_numeros = df['número'].value_counts().head(top_n).reset_index()
-    top_numeros.columns = ['número', 'frecuencia']
+    top_numeros = obtener_cubo_agregados(df)['frecuencia_numero'].top(top_n)
     
     fig = px.bar(
         top_numeros,
@@ -252,12 +306,12 @@ def grafico_top_numeros(df, top_n=20):
     
     return fig
 
+@figura_cacheada
 def grafico_top_series(df, top_n=20):
     """
     Gráfico de las series más frecuentes.
     """
-    top_series = df['serie'].value_counts().head(top_n).reset_index()
-    top_series.columns = ['serie', 'frecuencia']
+    top_series = obtener_cubo_agregados(df)['frecuencia_serie'].top(top_n)
     
     fig = px.bar(
         top_series,
@@ -273,17 +327,17 @@ def grafico_top_series(df, top_n=20):
     
     return fig
 
+@figura_cacheada
 def grafico_sorteos_por_dia_semana(df):
     """
     Gráfico de barras de sorteos por día de la semana.
     """
-    if 'dia_semana_nombre' not in df.columns:
+    if 'dia_semana' not in df.columns:
         return None
     
-    dias_orden = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
     dias_es = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
     
-    conteo = df['dia_semana_nombre'].value_counts().reindex(dias_orden, fill_value=0).reset_index()
+    conteo = obtener_cubo_agregados(df)['por_dia_semana'].reset_index()
     conteo.columns = ['dia', 'cantidad']
     conteo['dia'] = dias_es
     
@@ -301,11 +355,12 @@ def grafico_sorteos_por_dia_semana(df):
     
     return fig
 
+@figura_cacheada
 def grafico_evolucion_por_año(df):
     """
     Gráfico de líneas mostrando evolución de sorteos por año.
     """
-    sorteos_año = df.groupby('año').size().reset_index()
+    sorteos_año = obtener_cubo_agregados(df)['por_año'].reset_index()
     sorteos_año.columns = ['año', 'cantidad']
     
     fig = px.line(
@@ -330,3 +385,105 @@ def grafico_evolucion_por_año(df):
     fig.update_layout(height=500)
     
     return fig
+
+@figura_cacheada
+def grafico_acf_pacf(df, columna='número', lags=40):
+    """
+    Correlograma (ACF y PACF) con bandas de confianza al 95%.
+    
+    Args:
+        df: DataFrame
+        columna: Columna a analizar (ver COLUMNAS_AUTOCORRELACION)
+        lags: Cantidad máxima de rezagos
+    """
+    resultado = obtener_autocorrelaciones(df, lags=lags)[columna]
+    rezagos = np.arange(1, len(resultado['acf']))
+    
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True,
+                        subplot_titles=('Autocorrelación (ACF)', 'Autocorrelación Parcial (PACF)'))
+    
+    for fila, (valores, banda) in enumerate([
+        (resultado['acf'], resultado['banda_acf']),
+        (resultado['pacf'], resultado['banda_pacf'])
+    ], start=1):
+        fig.add_trace(
+            go.Scatter(x=rezagos, y=banda[1:], mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip'),
+            row=fila, col=1
+        )
+        fig.add_trace(
+            go.Scatter(x=rezagos, y=-banda[1:], mode='lines', line=dict(width=0), fill='tonexty',
+                       fillcolor='rgba(99, 110, 250, 0.2)', showlegend=False, hoverinfo='skip'),
+            row=fila, col=1
+        )
+        fig.add_trace(
+            go.Bar(x=rezagos, y=valores[1:], marker_color='#636EFA', showlegend=False),
+            row=fila, col=1
+        )
+    
+    fig.update_xaxes(title_text='Rezago', row=2, col=1)
+    fig.update_layout(height=600, title=f'Correlograma de {columna}')
+    
+    return fig
+
+@figura_cacheada
+def grafico_deriva_uniformidad(df, ventana=200, bins=10, h=4.0):
+    """
+    χ² de uniformidad en ventanas deslizantes y su CUSUM de alarma.
+    
+    Args:
+        df: DataFrame
+        ventana: Sorteos por ventana
+        bins: Bins de igual ancho para χ²
+        h: Umbral de alarma del CUSUM
+    """
+    deriva = deriva_por_grupo(df, ventana=ventana, bins=bins, h=h)
+    
+    if deriva.empty:
+        return None
+    
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True,
+                        subplot_titles=(f'χ² de los últimos {ventana} sorteos', 'CUSUM de desviación'))
+    
+    fig.add_trace(go.Scatter(x=deriva['fecha'], y=deriva['chi2'], mode='lines', name='χ²'), row=1, col=1)
+    fig.add_hline(y=stats.chi2.ppf(0.95, bins - 1), line_dash="dash", line_color="red",
+                  annotation_text="Crítico 5%", row=1, col=1)
+    
+    fig.add_trace(go.Scatter(x=deriva['fecha'], y=deriva['cusum'], mode='lines', name='CUSUM'), row=2, col=1)
+    fig.add_hline(y=h, line_dash="dash", line_color="red", annotation_text="Alarma", row=2, col=1)
+    
+    fig.update_xaxes(title_text='Fecha', row=2, col=1)
+    fig.update_layout(height=600, showlegend=False, title='Monitoreo de Deriva de la Uniformidad')
+    
+    return fig
+
+@figura_cacheada
+def grafico_matriz_transicion(df, posicion='primer_digito', lag=1):
+    """
+    Mapa de calor de P(dígito siguiente | dígito actual) en una posición.
+    
+    Args:
+        df: DataFrame
+        posicion: Columna de dígito (ver COLUMNAS_DIGITOS)
+        lag: Rezago entre los sorteos comparados
+    """
+    lags = (1, 2, 3) if lag in (1, 2, 3) else (lag,)
+    _, conteos = obtener_transiciones(df, lags)
+    matriz = conteos[0, COLUMNAS_DIGITOS.index(posicion), lags.index(lag)]
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        probabilidades = np.nan_to_num(matriz / matriz.sum(axis=1, keepdims=True)) * 100
+    
+    fig = px.imshow(
+        probabilidades,
+        title=f'Transiciones de {posicion} (rezago {lag}): % por dígito de origen',
+        labels=dict(x="Dígito siguiente", y="Dígito actual", color="%"),
+        x=list(range(10)),
+        y=list(range(10)),
+        color_continuous_scale='RdBu_r',
+        color_continuous_midpoint=10,
+        text_auto='.1f'
+    )
+    
+    fig.update_layout(height=550)
+    
+    return fig
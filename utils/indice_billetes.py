@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+from utils.carga_datos import cache_por_version
+
+# Bits reservados para la serie en la clave empaquetada (número << 16 | serie)
+BITS_SERIE = 16
+
+def empaquetar_billetes(numeros, series):
+    """
+    Empaqueta (número, serie) en una clave uint32: número << 16 | serie.
+    
+    Args:
+        numeros: Array de números entre 0 y 9999
+        series: Array de series entre 0 y 65535
+    
+    Returns:
+        np.ndarray: Claves uint32
+    """
+    numeros = np.asarray(numeros, dtype=np.uint32)
+    series = np.asarray(series, dtype=np.uint32)
+    return (numeros << BITS_SERIE) | series
+
+def construir_indice_billetes(df):
+    """
+    Construye el índice de billetes ganadores (número + serie).
+    
+    Las claves empaquetadas se guardan ordenadas (4 bytes por sorteo) junto
+    con la fecha de cada sorteo, así que un lote de billetes se resuelve con
+    dos np.searchsorted, sin filtrar el DataFrame billete por billete.
+    
+    Args:
+        df: DataFrame con columnas 'fecha', 'número' y 'serie'
+    
+    Returns:
+        dict: 'claves' ordenadas, 'fechas' alineadas con ellas (cronológicas
+              dentro de cada clave) y 'total'
+    """
+    claves = empaquetar_billetes(df['número'].to_numpy(), df['serie'].to_numpy())
+    fechas = df['fecha'].to_numpy()
+    orden = np.lexsort((fechas, claves))
+    
+    return {
+        'claves': claves[orden],
+        'fechas': fechas[orden],
+        'total': len(df)
+    }
+
+def buscar_billetes(indice, numeros, series):
+    """
+    Verifica en una sola llamada si cada billete ha ganado alguna vez.
+    
+    Args:
+        indice: Índice creado con construir_indice_billetes
+        numeros: Array con el número de cada billete
+        series: Array con la serie de cada billete
+    
+    Returns:
+        DataFrame: Una fila por billete (en el orden recibido) con número,
+                   serie, ganador, veces, ultima_fecha y fechas (array con
+                   las fechas en que ganó)
+    """
+    numeros = np.asarray(numeros, dtype=np.int64)
+    series = np.asarray(series, dtype=np.int64)
+    
+    # Los valores fuera de rango no pueden haber ganado (y no se empaquetan)
+    validos = (numeros >= 0) & (numeros <= 9999) & (series >= 0) & (series < 1 << BITS_SERIE)
+    consultas = empaquetar_billetes(np.where(validos, numeros, 0), np.where(validos, series, 0))
+    
+    desde = np.searchsorted(indice['claves'], consultas, side='left')
+    hasta = np.searchsorted(indice['claves'], consultas, side='right')
+    veces = np.where(validos, hasta - desde, 0)
+    ganador = veces > 0
+    
+    ultima_fecha = np.full(len(consultas), np.datetime64('NaT'), dtype=indice['fechas'].dtype)
+    ultima_fecha[ganador] = indice['fechas'][hasta[ganador] - 1]
+    
+    # Fechas de cada billete: tramos [desde, hasta) del índice, cortados con np.split
+    inicios = np.cumsum(veces) - veces
+    posiciones = np.repeat(desde - inicios, veces) + np.arange(veces.sum())
+    fechas = np.empty(len(consultas), dtype=object)
+    fechas[:] = np.split(indice['fechas'][posiciones], np.cumsum(veces)[:-1])
+    
+    return pd.DataFrame({
+        'número': numeros,
+        'serie': series,
+        'ganador': ganador,
+        'veces': veces,
+        'ultima_fecha': ultima_fecha,
+        'fechas': fechas
+    })
+
+def parsear_billetes(texto):
+    """
+    Extrae billetes de un texto con uno por línea ('1234 056', '1234-056', '1234,56').
+    
+    Args:
+        texto: Texto pegado o contenido de un archivo
+    
+    Returns:
+        tuple: (numeros, series, lineas_invalidas) con los arrays de los
+               billetes reconocidos y las líneas que no se pudieron leer
+    """
+    lineas = pd.Series(texto.splitlines()).str.strip()
+    lineas = lineas[lineas != '']
+    
+    partes = lineas.str.extract(r'^(\d{1,4})\s*[-,;\s]\s*(\d{1,5})$')
+    reconocidas = partes.notna().all(axis=1)
+    
+    return (
+        partes.loc[reconocidas, 0].astype(np.int64).to_numpy(),
+        partes.loc[reconocidas, 1].astype(np.int64).to_numpy(),
+        lineas[~reconocidas].tolist()
+    )
+
+# Compartido entre sesiones: se construye una vez por versión del dataset
+obtener_indice_billetes = cache_por_version(construir_indice_billetes)
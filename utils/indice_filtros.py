@@ -0,0 +1,81 @@
+import numpy as np
+from utils.carga_datos import cache_por_version
+
+def construir_indice_filtros(df):
+    """
+    Construye un índice para filtrar por año, rango de número y rango de serie.
+    
+    Las filas se ordenan por (año, número), de modo que cada año ocupa un
+    bloque contiguo y, dentro de él, los números quedan ordenados. Así un
+    rango de números se resuelve con dos búsquedas binarias por año.
+    
+    Args:
+        df: DataFrame con columnas 'año', 'número' y 'serie'
+    
+    Returns:
+        dict: Arrays del índice (años, inicio/fin de cada año, números,
+              series y posiciones originales en el orden del índice)
+    """
+    años = df['año'].to_numpy()
+    numeros = df['número'].to_numpy()
+    
+    orden = np.lexsort((numeros, años))
+    años_ordenados = años[orden]
+    
+    años_unicos = np.unique(años_ordenados)
+    
+    return {
+        'años': años_unicos,
+        'inicio': np.searchsorted(años_ordenados, años_unicos, side='left'),
+        'fin': np.searchsorted(años_ordenados, años_unicos, side='right'),
+        'numeros': numeros[orden],
+        'series': df['serie'].to_numpy()[orden],
+        'posiciones': orden,
+        'total': len(df)
+    }
+
+def filtrar_posiciones(indice, años=None, rango_numero=None, rango_serie=None):
+    """
+    Devuelve las posiciones de las filas que cumplen los filtros.
+    
+    Args:
+        indice: Índice creado con construir_indice_filtros
+        años: Años a incluir. Si es None, se incluyen todos.
+        rango_numero: Tupla (mínimo, máximo) inclusiva o None
+        rango_serie: Tupla (mínimo, máximo) inclusiva o None
+    
+    Returns:
+        np.ndarray: Posiciones (para usar con df.iloc) en orden ascendente
+    """
+    if años is None:
+        seleccion = np.arange(len(indice['años']))
+    else:
+        años = np.asarray(list(años))
+        seleccion = np.flatnonzero(np.isin(indice['años'], años))
+    
+    # Tramos del índice que cumplen año y rango de número
+    tramos = []
+    for i in seleccion:
+        inicio, fin = indice['inicio'][i], indice['fin'][i]
+        if rango_numero is not None:
+            numeros = indice['numeros'][inicio:fin]
+            desde = inicio + np.searchsorted(numeros, rango_numero[0], side='left')
+            hasta = inicio + np.searchsorted(numeros, rango_numero[1], side='right')
+            inicio, fin = desde, hasta
+        if fin > inicio:
+            tramos.append(np.arange(inicio, fin))
+    
+    if not tramos:
+        return np.empty(0, dtype=np.int64)
+    
+    candidatos = np.concatenate(tramos)
+    
+    # La serie se verifica solo sobre los candidatos
+    if rango_serie is not None:
+        series = indice['series'][candidatos]
+        candidatos = candidatos[(series >= rango_serie[0]) & (series <= rango_serie[1])]
+    
+    return np.sort(indice['posiciones'][candidatos])
+
+# Compartido entre sesiones: se construye una vez por versión del dataset
+obtener_indice_filtros = cache_por_version(construir_indice_filtros)
@@ -0,0 +1,139 @@
+import numpy as np
+from utils.carga_datos import cache_por_version
+from utils.digitos import matriz_digitos, descomponer_digitos, CLASES_PATRON
+
+# Caracteres que en un patrón aceptan cualquier dígito
+COMODINES = '*?_xX'
+
+def _listas_invertidas(claves, tamaño):
+    """
+    Listas invertidas en formato CSR: para cada clave (menor a 256), las
+    posiciones en orden ascendente.
+    
+    Returns:
+        tuple: (inicios de largo tamaño + 1, posiciones concatenadas)
+    """
+    # Con claves de un byte, el ordenamiento estable de numpy es radix sort (O(n))
+    orden = np.argsort(claves.astype(np.uint8), kind='stable')
+    inicios = np.r_[0, np.cumsum(np.bincount(claves, minlength=tamaño))]
+    return inicios, orden
+
+def construir_indice_patrones(df):
+    """
+    Construye un índice invertido de los dígitos de los números ganadores.
+    
+    Para cada (posición, dígito) guarda las posiciones de los sorteos que
+    lo tienen, en orden ascendente, y lo mismo para la suma de dígitos, las
+    repeticiones máximas, la clase de patrón y los palíndromos. Un patrón
+    como '*7*3' se resuelve intersecando dos listas cortas en lugar de
+    recorrer el DataFrame.
+    
+    Args:
+        df: DataFrame con la columna 'número' (y, si existen, las features de dígitos)
+    
+    Returns:
+        dict: Listas invertidas por criterio ('digitos', 'suma',
+              'repeticiones', 'patron', 'palindromo') y 'total'
+    """
+    numeros = df['número'].to_numpy()
+    d = matriz_digitos(numeros).astype(np.int64)
+    
+    if 'patron_digitos' in df.columns:
+        features = {
+            'suma_digitos': df['suma_digitos'].to_numpy(),
+            'max_repeticiones': df['max_repeticiones'].to_numpy(),
+            'patron_digitos': df['patron_digitos'].cat.codes.to_numpy(),
+            'es_palindromo': df['es_palindromo'].to_numpy()
+        }
+    else:
+        features = descomponer_digitos(numeros)
+        features['patron_digitos'] = features['patron_digitos'].codes
+    
+    # Clave posición·10 + dígito; la posición del sorteo es el índice de fila
+    inicios, orden = _listas_invertidas((np.arange(4) * 10 + d).ravel(), 40)
+    
+    return {
+        'total': len(df),
+        'digitos': (inicios, orden // 4),
+        'suma': _listas_invertidas(features['suma_digitos'].astype(np.int64), 37),
+        'repeticiones': _listas_invertidas(features['max_repeticiones'].astype(np.int64), 5),
+        'patron': _listas_invertidas(features['patron_digitos'].astype(np.int64), len(CLASES_PATRON)),
+        'palindromo': _listas_invertidas(features['es_palindromo'].astype(np.int64), 2)
+    }
+
+def _lista(indice, criterio, clave):
+    """
+    Posiciones (ascendentes) de los sorteos con esa clave en el criterio.
+    """
+    inicios, posiciones = indice[criterio]
+    if clave < 0 or clave >= len(inicios) - 1:
+        return posiciones[:0]
+    return posiciones[inicios[clave]:inicios[clave + 1]]
+
+def parsear_patron(patron):
+    """
+    Interpreta un patrón de 4 caracteres con dígitos y comodines.
+    
+    Args:
+        patron: Texto como '*7*3' o '12??' (comodines: * ? _ x)
+    
+    Returns:
+        list: Un dígito o None (cualquier dígito) por posición
+    
+    Raises:
+        ValueError: Si el patrón no tiene 4 caracteres válidos
+    """
+    patron = patron.strip()
+    
+    if len(patron) != 4 or any(c not in COMODINES and not c.isdigit() for c in patron):
+        raise ValueError(f"Patrón inválido '{patron}': use 4 caracteres con dígitos o comodines ({' '.join(COMODINES[:4])})")
+    
+    return [None if c in COMODINES else int(c) for c in patron]
+
+def buscar_patron(indice, patron=None, suma=None, repeticiones=None, clase=None, palindromo=None):
+    """
+    Posiciones de los sorteos que cumplen todos los criterios indicados.
+    
+    Las listas se intersecan de la más corta a la más larga, así que el
+    costo depende del tamaño de las listas y no del dataset.
+    
+    Args:
+        indice: Índice creado con construir_indice_patrones
+        patron: Patrón de dígitos (ver parsear_patron) o None
+        suma: Suma de dígitos (0-36) o None
+        repeticiones: Máximo de repeticiones de un dígito (1-4) o None
+        clase: Clase de patrón de CLASES_PATRON (p. ej. 'AABB') o None
+        palindromo: True/False para filtrar palíndromos o None
+    
+    Returns:
+        np.ndarray: Posiciones (para usar con df.iloc) en orden ascendente
+    """
+    listas = []
+    
+    if patron is not None:
+        for posicion, digito in enumerate(parsear_patron(patron)):
+            if digito is not None:
+                listas.append(_lista(indice, 'digitos', posicion * 10 + digito))
+    if suma is not None:
+        listas.append(_lista(indice, 'suma', int(suma)))
+    if repeticiones is not None:
+        listas.append(_lista(indice, 'repeticiones', int(repeticiones)))
+    if clase is not None:
+        listas.append(_lista(indice, 'patron', CLASES_PATRON.index(clase)))
+    if palindromo is not None:
+        listas.append(_lista(indice, 'palindromo', int(bool(palindromo))))
+    
+    if not listas:
+        return np.arange(indice['total'])
+    
+    listas.sort(key=len)
+    resultado = listas[0]
+    for lista in listas[1:]:
+        if len(resultado) == 0:
+            break
+        resultado = np.intersect1d(resultado, lista, assume_unique=True)
+    
+    return resultado
+
+# Compartido entre sesiones: se construye una vez por versión del dataset
+obtener_indice_patrones = cache_por_version(construir_indice_patrones)
@@ -0,0 +1,187 @@
+import numpy as np
+import pandas as pd
+from utils.carga_datos import cache_por_version
+
+# Tamaño fijo de cada espacio de claves (números 0000-9999 y series 000-999)
+TAMAÑO_NUMEROS = 10000
+TAMAÑO_SERIES = 1000
+
+# Buckets del histograma de huecos: [1], [2, 3], [4, 7], ..., [2^(B-1), ∞)
+BUCKETS_HUECOS = 12
+
+def _bucket_hueco(huecos):
+    """
+    Bucket logarítmico (base 2) de cada hueco, con el último bucket abierto.
+    """
+    return np.minimum(np.floor(np.log2(np.maximum(huecos, 1))).astype(np.int64), BUCKETS_HUECOS - 1)
+
+def _construir_espacio(claves, fechas, tamaño):
+    """
+    Arrays de recencia de un espacio de claves a partir de la historia cronológica.
+    """
+    posiciones = np.arange(len(claves))
+    
+    # Agrupar apariciones por clave conservando el orden cronológico
+    orden = np.argsort(claves, kind='stable')
+    claves_ordenadas = claves[orden]
+    posiciones_ordenadas = posiciones[orden]
+    
+    # Huecos entre apariciones consecutivas de la misma clave
+    misma_clave = claves_ordenadas[1:] == claves_ordenadas[:-1]
+    huecos = np.diff(posiciones_ordenadas)[misma_clave]
+    claves_huecos = claves_ordenadas[1:][misma_clave]
+    
+    apariciones = np.bincount(claves, minlength=tamaño)
+    
+    # Última aparición: el último elemento de cada grupo del orden estable
+    # (cada clave se asigna una sola vez, sin depender de índices repetidos)
+    fin_grupo = np.append(~misma_clave, True)[:len(claves)]
+    claves_ultimas = claves_ordenadas[fin_grupo]
+    posiciones_ultimas = posiciones_ordenadas[fin_grupo]
+    
+    ultima = np.full(tamaño, -1, dtype=np.int64)
+    ultima[claves_ultimas] = posiciones_ultimas
+    
+    ultima_fecha = np.full(tamaño, np.datetime64('NaT'), dtype='datetime64[ns]')
+    ultima_fecha[claves_ultimas] = fechas[posiciones_ultimas]
+    
+    maximo_hueco = np.zeros(tamaño, dtype=np.int64)
+    np.maximum.at(maximo_hueco, claves_huecos, huecos)
+    
+    histograma = np.bincount(
+        claves_huecos * BUCKETS_HUECOS + _bucket_hueco(huecos),
+        minlength=tamaño * BUCKETS_HUECOS
+    ).reshape(tamaño, BUCKETS_HUECOS)
+    
+    return {
+        'apariciones': apariciones,
+        'ultima': ultima,
+        'ultima_fecha': ultima_fecha,
+        'suma_huecos': np.bincount(claves_huecos, weights=huecos, minlength=tamaño).astype(np.int64),
+        'maximo_hueco': maximo_hueco,
+        'histograma': histograma
+    }
+
+def construir_indice_recencia(df):
+    """
+    Construye el índice de recencia de números y series en una pasada.
+    
+    Para cada número (0-9999) y cada serie guarda, en arrays de tamaño fijo:
+    apariciones, posición y fecha de la última aparición, suma y máximo de
+    los huecos (sorteos entre apariciones) e histograma logarítmico de huecos.
+    
+    Args:
+        df: DataFrame con columnas 'fecha', 'número' y 'serie'
+    
+    Returns:
+        dict: 'sorteos' y un espacio por clave ('numeros', 'series')
+    """
+    if df['fecha'].is_monotonic_increasing:
+        orden = np.arange(len(df))
+    else:
+        orden = np.argsort(df['fecha'].to_numpy(), kind='stable')
+    
+    fechas = df['fecha'].to_numpy()[orden]
+    numeros = df['número'].to_numpy(dtype=np.int64)[orden]
+    series = df['serie'].to_numpy(dtype=np.int64)[orden]
+    
+    return {
+        'sorteos': len(df),
+        'numeros': _construir_espacio(numeros, fechas, TAMAÑO_NUMEROS),
+        'series': _construir_espacio(series, fechas, max(TAMAÑO_SERIES, int(series.max(initial=0)) + 1))
+    }
+
+def _registrar(espacio, clave, posicion, fecha):
+    """
+    Registra una aparición de la clave en O(1).
+    """
+    anterior = espacio['ultima'][clave]
+    if anterior >= 0:
+        hueco = posicion - anterior
+        espacio['suma_huecos'][clave] += hueco
+        espacio['maximo_hueco'][clave] = max(espacio['maximo_hueco'][clave], hueco)
+        espacio['histograma'][clave, _bucket_hueco(np.array([hueco]))[0]] += 1
+    
+    espacio['apariciones'][clave] += 1
+    espacio['ultima'][clave] = posicion
+    espacio['ultima_fecha'][clave] = np.datetime64(fecha, 'ns')
+
+def actualizar_indice_recencia(indice, numero, serie, fecha):
+    """
+    Agrega un sorteo nuevo (posterior a todos los anteriores) al índice.
+    
+    Modifica el índice recibido; no debe usarse sobre el índice compartido
+    que devuelve obtener_indice_recencia.
+    
+    Args:
+        indice: Índice creado con construir_indice_recencia
+        numero: Número ganador
+        serie: Serie ganadora
+        fecha: Fecha del sorteo
+    
+    Returns:
+        dict: El mismo índice, actualizado
+    """
+    posicion = indice['sorteos']
+    
+    if serie >= len(indice['series']['apariciones']):
+        # Ampliar el espacio de series hasta cubrir la serie nueva
+        faltantes = int(serie) + 1 - len(indice['series']['apariciones'])
+        rellenos = {'ultima': -1, 'ultima_fecha': np.datetime64('NaT')}
+        for clave, array in indice['series'].items():
+            relleno = np.full((faltantes,) + array.shape[1:], rellenos.get(clave, 0), dtype=array.dtype)
+            indice['series'][clave] = np.concatenate([array, relleno])
+    
+    _registrar(indice['numeros'], int(numero), posicion, fecha)
+    _registrar(indice['series'], int(serie), posicion, fecha)
+    indice['sorteos'] += 1
+    
+    return indice
+
+def consultar_recencia(indice, clave, espacio='numeros'):
+    """
+    Recencia de un número o una serie, sin recorrer la historia.
+    
+    Args:
+        indice: Índice creado con construir_indice_recencia
+        clave: Número o serie a consultar
+        espacio: 'numeros' o 'series'
+    
+    Returns:
+        dict: apariciones, ultima_fecha, sorteos_desde_ultima, hueco_medio,
+              hueco_maximo e histograma de huecos ({'1': n, '2-3': n, ...})
+    """
+    datos = indice[espacio]
+    clave = int(clave)
+    
+    if clave < 0 or clave >= len(datos['apariciones']) or datos['apariciones'][clave] == 0:
+        return {
+            'apariciones': 0,
+            'ultima_fecha': None,
+            'sorteos_desde_ultima': None,
+            'hueco_medio': None,
+            'hueco_maximo': None,
+            'histograma': {}
+        }
+    
+    apariciones = int(datos['apariciones'][clave])
+    etiquetas = [
+        f"{2 ** b}" if b == 0 else (f"{2 ** b}+" if b == BUCKETS_HUECOS - 1 else f"{2 ** b}-{2 ** (b + 1) - 1}")
+        for b in range(BUCKETS_HUECOS)
+    ]
+    
+    return {
+        'apariciones': apariciones,
+        'ultima_fecha': pd.Timestamp(datos['ultima_fecha'][clave]),
+        'sorteos_desde_ultima': int(indice['sorteos'] - 1 - datos['ultima'][clave]),
+        'hueco_medio': float(datos['suma_huecos'][clave] / (apariciones - 1)) if apariciones > 1 else None,
+        'hueco_maximo': int(datos['maximo_hueco'][clave]) if apariciones > 1 else None,
+        'histograma': {
+            etiqueta: int(conteo)
+            for etiqueta, conteo in zip(etiquetas, datos['histograma'][clave])
+            if conteo
+        }
+    }
+
+# Compartido entre sesiones: se construye una vez por versión del dataset
+obtener_indice_recencia = cache_por_version(construir_indice_recencia)
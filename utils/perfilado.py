@@ -0,0 +1,376 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from utils.carga_datos import procesar_datos_loteria, nombre_loteria
+
+# Bits de índice de HyperLogLog: 2^14 registros, error estándar ≈ 1.04/√m ≈ 0.8%
+BITS_HLL = 14
+
+# Capacidad de cada nivel del sketch de cuantiles
+CAPACIDAD_SKETCH = 256
+
+def _combinar_momentos(n_a, media_a, m2_a, n_b, media_b, m2_b):
+    """
+    Combina (n, media, M2) de dos particiones (Chan et al.).
+    """
+    n = n_a + n_b
+    if n == 0:
+        return 0, 0.0, 0.0
+    delta = media_b - media_a
+    media = media_a + delta * n_b / n
+    m2 = m2_a + m2_b + delta ** 2 * n_a * n_b / n
+    return n, media, m2
+
+class SketchCuantiles:
+    """
+    Sketch de cuantiles tipo KLL con niveles de compactación.
+    
+    Cada nivel guarda hasta `capacidad` valores con peso 2^nivel. Cuando un
+    nivel se llena, se ordena y se promueve uno de cada dos valores (con
+    desplazamiento aleatorio) al nivel siguiente, lo que introduce un error
+    de rango acotado por el peso del nivel. Dos sketches se combinan
+    uniendo sus niveles.
+    """
+    
+    def __init__(self, capacidad=CAPACIDAD_SKETCH, semilla=None):
+        self.capacidad = capacidad
+        self.niveles = [np.empty(0)]
+        self.n = 0
+        self.rng = np.random.default_rng(semilla)
+    
+    def _compactar(self):
+        """
+        Promueve la mitad de cada nivel que excede la capacidad al siguiente.
+        """
+        nivel = 0
+        while nivel < len(self.niveles):
+            valores = self.niveles[nivel]
+            if len(valores) > self.capacidad:
+                valores = np.sort(valores)
+                resto = valores[len(valores) - len(valores) % 2:]
+                promovidos = valores[self.rng.integers(2):len(valores) - len(resto):2]
+                
+                self.niveles[nivel] = resto
+                if nivel + 1 == len(self.niveles):
+                    self.niveles.append(np.empty(0))
+                self.niveles[nivel + 1] = np.concatenate([self.niveles[nivel + 1], promovidos])
+            nivel += 1
+    
+    def actualizar(self, valores):
+        """
+        Agrega un array de valores (los NaN se ignoran).
+        """
+        valores = np.asarray(valores, dtype=np.float64)
+        valores = valores[~np.isnan(valores)]
+        self.n += len(valores)
+        self.niveles[0] = np.concatenate([self.niveles[0], valores])
+        self._compactar()
+    
+    def combinar(self, otro):
+        """
+        Incorpora otro sketch (por ejemplo, de otro proceso).
+        """
+        while len(self.niveles) < len(otro.niveles):
+            self.niveles.append(np.empty(0))
+        for nivel, valores in enumerate(otro.niveles):
+            self.niveles[nivel] = np.concatenate([self.niveles[nivel], valores])
+        self.n += otro.n
+        self._compactar()
+    
+    def cuantiles(self, q):
+        """
+        Cuantiles aproximados para las probabilidades q.
+        """
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        if self.n == 0:
+            return np.full(len(q), np.nan)
+        
+        valores = np.concatenate(self.niveles)
+        pesos = np.concatenate([np.full(len(v), 2.0 ** nivel) for nivel, v in enumerate(self.niveles)])
+        
+        orden = np.argsort(valores, kind='stable')
+        acumulado = np.cumsum(pesos[orden])
+        posiciones = np.searchsorted(acumulado, q * acumulado[-1], side='left')
+        return valores[orden][np.minimum(posiciones, len(valores) - 1)]
+
+class HyperLogLog:
+    """
+    Conteo aproximado de valores distintos (HyperLogLog).
+    
+    Los valores se convierten a hashes de 64 bits con pd.util.hash_array;
+    los primeros `bits` eligen el registro y el resto aporta la posición
+    del primer bit en 1. Dos estimadores se combinan con el máximo por registro.
+    """
+    
+    def __init__(self, bits=BITS_HLL):
+        self.bits = bits
+        self.registros = np.zeros(1 << bits, dtype=np.uint8)
+        # Potencias de 2 para obtener la longitud en bits con searchsorted
+        self._potencias = np.left_shift(np.uint64(1), np.arange(64 - bits, dtype=np.uint64))
+    
+    def actualizar(self, valores):
+        """
+        Agrega un array de valores no nulos.
+        """
+        if len(valores) == 0:
+            return
+        
+        hashes = pd.util.hash_array(np.asarray(valores))
+        indices = (hashes >> np.uint64(64 - self.bits)).astype(np.intp)
+        resto = hashes & np.uint64((1 << (64 - self.bits)) - 1)
+        
+        largo = np.searchsorted(self._potencias, resto, side='right')
+        rho = (64 - self.bits - largo + 1).astype(np.uint8)
+        
+        np.maximum.at(self.registros, indices, rho)
+    
+    def combinar(self, otro):
+        """
+        Incorpora otro estimador con los mismos bits.
+        """
+        np.maximum(self.registros, otro.registros, out=self.registros)
+    
+    def estimar(self):
+        """
+        Cantidad aproximada de valores distintos.
+        """
+        m = len(self.registros)
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimacion = alfa * m * m / np.sum(2.0 ** -self.registros.astype(np.float64))
+        
+        # Corrección para cardinalidades bajas (conteo lineal)
+        vacios = int(np.count_nonzero(self.registros == 0))
+        if estimacion <= 2.5 * m and vacios > 0:
+            estimacion = m * np.log(m / vacios)
+        
+        return int(round(estimacion))
+
+class PerfilColumna:
+    """
+    Estado combinable del perfil de una columna.
+    """
+    
+    def __init__(self, tipo):
+        self.tipo = str(tipo)
+        self.numerica = pd.api.types.is_numeric_dtype(tipo)
+        self.conteo = 0
+        self.nulos = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = None
+        self.maximo = None
+        self.cuantiles = SketchCuantiles() if self.numerica else None
+        self.distintos = HyperLogLog()
+    
+    def actualizar(self, serie):
+        """
+        Agrega un bloque de la columna.
+        """
+        nulos = serie.isna().to_numpy()
+        valores = serie[~nulos]
+        
+        self.nulos += int(nulos.sum())
+        self.distintos.actualizar(valores.to_numpy())
+        
+        if len(valores) == 0:
+            return
+        
+        if self.numerica:
+            x = valores.to_numpy(dtype=np.float64)
+            media = x.mean()
+            self.conteo, self.media, self.m2 = _combinar_momentos(
+                self.conteo, self.media, self.m2, len(x), media, float(((x - media) ** 2).sum())
+            )
+            self.cuantiles.actualizar(x)
+        else:
+            self.conteo += len(valores)
+        
+        if self.numerica or pd.api.types.is_datetime64_any_dtype(valores.dtype):
+            minimo, maximo = valores.min(), valores.max()
+            self.minimo = minimo if self.minimo is None else min(self.minimo, minimo)
+            self.maximo = maximo if self.maximo is None else max(self.maximo, maximo)
+    
+    def combinar(self, otro):
+        """
+        Incorpora el perfil de la misma columna calculado en otra partición.
+        """
+        if self.numerica and otro.numerica:
+            self.conteo, self.media, self.m2 = _combinar_momentos(
+                self.conteo, self.media, self.m2, otro.conteo, otro.media, otro.m2
+            )
+            self.cuantiles.combinar(otro.cuantiles)
+        else:
+            self.conteo += otro.conteo
+        
+        self.nulos += otro.nulos
+        self.distintos.combinar(otro.distintos)
+        
+        if otro.minimo is not None:
+            self.minimo = otro.minimo if self.minimo is None else min(self.minimo, otro.minimo)
+            self.maximo = otro.maximo if self.maximo is None else max(self.maximo, otro.maximo)
+    
+    @property
+    def desviacion(self):
+        """Desviación estándar muestral."""
+        return float(np.sqrt(self.m2 / (self.conteo - 1))) if self.conteo > 1 else float('nan')
+
+class PerfilDataset:
+    """
+    Perfil de un dataset construido bloque a bloque.
+    
+    Mantiene filas, y por columna: nulos, momentos, mínimo/máximo, un
+    sketch de cuantiles y un HyperLogLog. Los perfiles parciales de
+    distintos procesos se combinan con `combinar`.
+    """
+    
+    def __init__(self):
+        self.filas = 0
+        self.columnas = {}
+    
+    def actualizar(self, bloque):
+        """
+        Agrega un bloque (DataFrame) al perfil.
+        """
+        self.filas += len(bloque)
+        for columna in bloque.columns:
+            if columna not in self.columnas:
+                self.columnas[columna] = PerfilColumna(bloque[columna].dtype)
+            self.columnas[columna].actualizar(bloque[columna])
+        return self
+    
+    def combinar(self, otro):
+        """
+        Incorpora el perfil de otra partición.
+        """
+        self.filas += otro.filas
+        for columna, perfil in otro.columnas.items():
+            if columna in self.columnas:
+                self.columnas[columna].combinar(perfil)
+            else:
+                self.columnas[columna] = perfil
+        return self
+    
+    def estadisticas(self):
+        """
+        Tabla con una fila por columna.
+        
+        Returns:
+            DataFrame: tipo, conteo, nulos, distintos (aprox.), media,
+                       desviación, mínimo, cuartiles (aprox.) y máximo
+        """
+        filas = []
+        for columna, perfil in self.columnas.items():
+            q1, mediana, q3 = perfil.cuantiles.cuantiles([0.25, 0.5, 0.75]) if perfil.numerica else (np.nan,) * 3
+            filas.append({
+                'columna': columna,
+                'tipo': perfil.tipo,
+                'conteo': perfil.conteo,
+                'nulos': perfil.nulos,
+                'distintos_aprox': perfil.distintos.estimar(),
+                'media': perfil.media if perfil.numerica and perfil.conteo else np.nan,
+                'desviacion': perfil.desviacion if perfil.numerica else np.nan,
+                'minimo': perfil.minimo,
+                'q1': q1,
+                'mediana': mediana,
+                'q3': q3,
+                'maximo': perfil.maximo
+            })
+        return pd.DataFrame(filas)
+    
+    def resumen(self):
+        """
+        Resumen con el mismo formato que eda_helpers.resumen_dataset.
+        """
+        return {
+            "Filas": self.filas,
+            "Columnas": len(self.columnas),
+            "Nulos por columna": {c: p.nulos for c, p in self.columnas.items()},
+            "Tipos de datos": {c: p.tipo for c, p in self.columnas.items()},
+            "Estadísticas numéricas": {
+                c: {
+                    'count': float(p.conteo),
+                    'mean': float(p.media) if p.conteo else np.nan,
+                    'std': p.desviacion,
+                    'min': float(p.minimo) if p.conteo else np.nan,
+                    '25%': float(q[0]),
+                    '50%': float(q[1]),
+                    '75%': float(q[2]),
+                    'max': float(p.maximo) if p.conteo else np.nan
+                }
+                for c, p in self.columnas.items() if p.numerica
+                for q in [p.cuantiles.cuantiles([0.25, 0.5, 0.75])]
+            },
+            "Distintos aproximados": {c: p.distintos.estimar() for c, p in self.columnas.items()}
+        }
+
+def iterar_chunks_parquet(ruta, filas_por_bloque=50_000):
+    """
+    Lee un archivo Parquet por bloques de filas sin cargarlo completo.
+    
+    Yields:
+        pd.DataFrame: Bloque de filas
+    """
+    import pyarrow.parquet as pq
+    
+    for lote in pq.ParquetFile(ruta).iter_batches(batch_size=filas_por_bloque):
+        yield lote.to_pandas()
+
+def perfilar_chunks(chunks):
+    """
+    Perfila una secuencia de bloques (p. ej. iterar_chunks_loterias).
+    
+    Args:
+        chunks: Iterable de DataFrames
+    
+    Returns:
+        PerfilDataset
+    """
+    perfil = PerfilDataset()
+    for chunk in chunks:
+        perfil.actualizar(chunk)
+    return perfil
+
+def _perfilar_archivo(args):
+    """
+    Perfila un archivo completo por bloques (se ejecuta en un proceso aparte).
+    """
+    ruta, chunksize, procesar = args
+    
+    if ruta.lower().endswith('.parquet'):
+        return perfilar_chunks(iterar_chunks_parquet(ruta, chunksize))
+    
+    chunks = pd.read_csv(ruta, chunksize=chunksize)
+    if procesar:
+        loteria = nombre_loteria(ruta)
+        chunks = (procesar_datos_loteria(c).assign(loteria=loteria) for c in chunks)
+    return perfilar_chunks(chunks)
+
+def perfilar_archivos(rutas, chunksize=50_000, procesos=None, procesar=True):
+    """
+    Perfila varios archivos CSV o Parquet, opcionalmente en paralelo.
+    
+    Cada archivo se lee por bloques en su propio proceso y los perfiles
+    parciales se combinan al final, así que nunca hay un archivo completo
+    en memoria.
+    
+    Args:
+        rutas: Rutas de los archivos
+        chunksize: Filas por bloque
+        procesos: Procesos en paralelo. Si es None o 1, se ejecuta en el proceso actual.
+        procesar: Si es True, los CSV pasan por procesar_datos_loteria
+    
+    Returns:
+        PerfilDataset
+    """
+    trabajos = [(ruta, chunksize, procesar) for ruta in rutas]
+    
+    if procesos is None or procesos <= 1:
+        parciales = [_perfilar_archivo(t) for t in trabajos]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            parciales = list(ejecutor.map(_perfilar_archivo, trabajos))
+    
+    perfil = PerfilDataset()
+    for parcial in parciales:
+        perfil.combinar(parcial)
+    return perfil
@@ -0,0 +1,211 @@
+import numpy as np
+import streamlit as st
+from concurrent.futures import ProcessPoolExecutor
+from scipy import stats
+
+# Elementos (réplicas × sorteos) generados por lote, para acotar la memoria
+ELEMENTOS_POR_LOTE = 2_000_000
+
+def _polinomio(coeficientes, x):
+    """
+    Evalúa c0 + c1*x + c2*x² + ... (coeficientes en orden creciente).
+    """
+    return sum(c * x ** i for i, c in enumerate(coeficientes))
+
+def coeficientes_shapiro(n):
+    """
+    Coeficientes de Shapiro-Wilk según la aproximación de Royston (1992).
+    
+    Es la misma aproximación que usa scipy.stats.shapiro, pero devuelta como
+    un vector completo para calcular W de muchas muestras con un producto
+    matricial sobre los datos ordenados.
+    
+    Args:
+        n: Tamaño de la muestra (n >= 3)
+    
+    Returns:
+        np.ndarray: Vector antisimétrico de n coeficientes
+    """
+    if n < 3:
+        raise ValueError("Shapiro-Wilk requiere al menos 3 observaciones")
+    
+    mitad = n // 2
+    a = np.zeros(mitad)
+    
+    if n == 3:
+        a[0] = np.sqrt(0.5)
+    else:
+        m = -stats.norm.ppf((np.arange(1, mitad + 1) - 0.375) / (n + 0.25))
+        suma_m2 = 2 * np.sum(m ** 2)
+        rsn = 1 / np.sqrt(n)
+        
+        a1 = _polinomio([0, 0.221157, -0.147981, -2.071190, 4.434685, -2.706056], rsn) + m[0] / np.sqrt(suma_m2)
+        
+        if n > 5:
+            a2 = _polinomio([0, 0.042981, -0.293762, -1.752461, 5.682633, -3.582633], rsn) + m[1] / np.sqrt(suma_m2)
+            factor = np.sqrt((suma_m2 - 2 * m[0] ** 2 - 2 * m[1] ** 2) / (1 - 2 * a1 ** 2 - 2 * a2 ** 2))
+            a[1] = a2
+            a[2:] = m[2:] / factor
+        else:
+            factor = np.sqrt((suma_m2 - 2 * m[0] ** 2) / (1 - 2 * a1 ** 2))
+            a[1:] = m[1:] / factor
+        
+        a[0] = a1
+    
+    coeficientes = np.zeros(n)
+    coeficientes[:mitad] = -a
+    coeficientes[n - mitad:] = a[::-1]
+    return coeficientes
+
+def estadisticos_aleatoriedad(muestras, bins=20, maximo=10000, coef_shapiro=None):
+    """
+    Calcula los estadísticos de la página 5 para muchas muestras a la vez.
+    
+    Args:
+        muestras: Matriz (réplicas, n) con números entre 0 y maximo-1
+        bins: Cantidad de bins de igual ancho para chi-cuadrado
+        maximo: Límite superior (exclusivo) del dominio de los números
+        coef_shapiro: Coeficientes de Shapiro-Wilk precalculados (opcional)
+    
+    Returns:
+        dict: 'chi2', 'shapiro_w' y 'autocorr_lag1', un valor por réplica
+    """
+    X = np.atleast_2d(np.asarray(muestras))
+    replicas, n = X.shape
+    
+    # Chi-cuadrado: un solo bincount sobre índices (réplica, bin) aplanados
+    bin_de = (X.astype(np.int64) * bins) // maximo
+    indices = (np.arange(replicas)[:, None] * bins + bin_de).ravel()
+    observados = np.bincount(indices, minlength=replicas * bins).reshape(replicas, bins)
+    esperado = n / bins
+    chi2 = ((observados - esperado) ** 2).sum(axis=1) / esperado
+    
+    # Autocorrelación lag-1, igual que np.corrcoef(x[:-1], x[1:]) fila por fila
+    X = X.astype(np.float64)
+    a = X[:, :-1] - X[:, :-1].mean(axis=1, keepdims=True)
+    b = X[:, 1:] - X[:, 1:].mean(axis=1, keepdims=True)
+    autocorr = (a * b).sum(axis=1) / np.sqrt((a * a).sum(axis=1) * (b * b).sum(axis=1))
+    
+    # Shapiro-Wilk: W = (coeficientes · x ordenado)² / suma de cuadrados
+    if coef_shapiro is None:
+        coef_shapiro = coeficientes_shapiro(n)
+    X.sort(axis=1)
+    centrados = X - X.mean(axis=1, keepdims=True)
+    w = (X @ coef_shapiro) ** 2 / (centrados ** 2).sum(axis=1)
+    
+    return {
+        "chi2": chi2,
+        "shapiro_w": np.minimum(w, 1.0),
+        "autocorr_lag1": autocorr
+    }
+
+def _simular_lotes(trabajos):
+    """
+    Simula varios lotes seguidos de historias uniformes (el trabajo de un
+    proceso) y devuelve sus estadísticos concatenados.
+    """
+    coef_shapiro = None
+    lotes = []
+    for semilla, replicas, n, bins, maximo in trabajos:
+        if coef_shapiro is None:
+            coef_shapiro = coeficientes_shapiro(n)
+        rng = np.random.default_rng(semilla)
+        muestras = rng.integers(0, maximo, size=(replicas, n), dtype=np.int32)
+        lotes.append(estadisticos_aleatoriedad(muestras, bins, maximo, coef_shapiro))
+    
+    return {clave: np.concatenate([l[clave] for l in lotes]) for clave in lotes[0]}
+
+def simular_distribucion_nula(n, replicas=10_000, bins=20, maximo=10000,
+                              tamaño_lote=None, procesos=None, semilla=None):
+    """
+    Distribución nula de los estadísticos bajo sorteos uniformes e independientes.
+    
+    Genera `replicas` historias sintéticas de `n` sorteos uniformes en
+    [0, maximo) por lotes, para acotar la memoria. Cada lote recibe su
+    propia semilla derivada, así que el resultado es el mismo con o sin
+    procesos paralelos.
+    
+    Args:
+        n: Sorteos por historia simulada
+        replicas: Cantidad de historias simuladas
+        bins: Bins para chi-cuadrado
+        maximo: Límite superior (exclusivo) de los números
+        tamaño_lote: Réplicas por lote. Si es None, se ajusta a ELEMENTOS_POR_LOTE.
+        procesos: Procesos en paralelo. Si es None o 1, se ejecuta en el proceso actual.
+        semilla: Semilla para reproducibilidad
+    
+    Returns:
+        dict: Arrays 'chi2', 'shapiro_w' y 'autocorr_lag1' de largo `replicas`
+    """
+    if tamaño_lote is None:
+        tamaño_lote = max(1, ELEMENTOS_POR_LOTE // n)
+    
+    tamaños = [min(tamaño_lote, replicas - i) for i in range(0, replicas, tamaño_lote)]
+    semillas = np.random.SeedSequence(semilla).spawn(len(tamaños))
+    trabajos = [(s, r, n, bins, maximo) for s, r in zip(semillas, tamaños)]
+    
+    if procesos is None or procesos <= 1:
+        return _simular_lotes(trabajos)
+    
+    # Un solo trabajo por proceso con lotes consecutivos (~replicas / procesos
+    # réplicas): enviar cada lote por separado costaba más de lo que se ganaba
+    por_proceso = -(-len(trabajos) // procesos)
+    grupos = [trabajos[i:i + por_proceso] for i in range(0, len(trabajos), por_proceso)]
+    
+    with ProcessPoolExecutor(max_workers=len(grupos)) as ejecutor:
+        partes = list(ejecutor.map(_simular_lotes, grupos))
+    
+    return {clave: np.concatenate([p[clave] for p in partes]) for clave in partes[0]}
+
+def pvalores_monte_carlo(numeros, replicas=10_000, bins=20, maximo=10000,
+                         tamaño_lote=None, procesos=None, semilla=None):
+    """
+    P-values empíricos de las pruebas de aleatoriedad de la página 5.
+    
+    Compara los estadísticos observados con su distribución nula simulada,
+    sin depender de aproximaciones asintóticas. El p-value se calcula como
+    (1 + réplicas al menos tan extremas) / (1 + réplicas).
+    
+    Args:
+        numeros: Números ganadores en orden cronológico
+        replicas, bins, maximo, tamaño_lote, procesos, semilla:
+            ver simular_distribucion_nula
+    
+    Returns:
+        dict: Por estadístico, el valor observado, el p-value empírico y la
+              distribución nula simulada
+    """
+    numeros = np.asarray(numeros)
+    observados = estadisticos_aleatoriedad(numeros[None, :], bins, maximo)
+    nula = simular_distribucion_nula(len(numeros), replicas, bins, maximo,
+                                     tamaño_lote, procesos, semilla)
+    
+    # Extremo: chi² alto, W bajo, |autocorrelación| alta
+    extremos = {
+        "chi2": nula["chi2"] >= observados["chi2"][0],
+        "shapiro_w": nula["shapiro_w"] <= observados["shapiro_w"][0],
+        "autocorr_lag1": np.abs(nula["autocorr_lag1"]) >= abs(observados["autocorr_lag1"][0])
+    }
+    
+    return {
+        clave: {
+            "observado": float(observados[clave][0]),
+            "p_valor": (1 + int(extremos[clave].sum())) / (1 + replicas),
+            "nula": nula[clave]
+        }
+        for clave in extremos
+    }
+
+@st.cache_data(max_entries=8)
+def pvalores_monte_carlo_cacheado(numeros, replicas=10_000, semilla=42):
+    """
+    Versión con caché de Streamlit de pvalores_monte_carlo para las páginas.
+    
+    Solo devuelve valores observados y p-values (sin las distribuciones nulas)
+    para que la copia guardada en caché sea pequeña.
+    """
+    resultados = pvalores_monte_carlo(numeros, replicas=replicas, semilla=semilla)
+    return {
+        clave: {"observado": r["observado"], "p_valor": r["p_valor"]}
+        for clave, r in resultados.items()
+    }
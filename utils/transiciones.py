@@ -0,0 +1,206 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+from statsmodels.stats.multitest import multipletests
+from utils.carga_datos import cache_por_version
+from utils.digitos import matriz_digitos, COLUMNAS_DIGITOS
+
+def _claves_grupo(df, grupo):
+    """
+    Códigos y claves de los grupos (un solo grupo 'total' si grupo es None).
+    """
+    if grupo is None:
+        return np.zeros(len(df), dtype=np.int64), pd.Index(['total'], name='grupo')
+    
+    columnas = [grupo] if isinstance(grupo, str) else list(grupo)
+    codigos, claves = pd.MultiIndex.from_frame(df[columnas]).factorize(sort=True)
+    claves = claves.set_names(columnas)
+    if len(columnas) == 1:
+        claves = claves.get_level_values(0)
+    
+    return codigos.astype(np.int64), claves
+
+def conteos_transicion(df, lags=(1,), grupo=None):
+    """
+    Matrices de transición 10×10 de cada posición de dígito entre sorteos.
+    
+    Cada sorteo se compara con el que está `lag` sorteos antes en la misma
+    historia (grupo), en orden cronológico. Todas las transiciones de todos
+    los grupos, posiciones y rezagos se cuentan con un solo np.bincount
+    sobre el índice aplanado (grupo, posición, rezago, dígito origen,
+    dígito destino).
+    
+    Args:
+        df: DataFrame con columnas 'fecha' y 'número' (o las de dígitos)
+        lags: Rezagos a considerar
+        grupo: Columna o lista de columnas con historias independientes
+               (p. ej. 'loteria' o ['loteria', 'año']) o None
+    
+    Returns:
+        tuple: (claves, conteos) donde claves tiene un elemento por grupo y
+               conteos es una matriz (grupos, 4, rezagos, 10, 10)
+    """
+    lags = list(lags)
+    codigos, claves = _claves_grupo(df, grupo)
+    
+    if set(COLUMNAS_DIGITOS).issubset(df.columns):
+        digitos = df[COLUMNAS_DIGITOS].to_numpy(dtype=np.int64)
+    else:
+        digitos = matriz_digitos(df['número']).astype(np.int64)
+    
+    # Orden cronológico dentro de cada grupo
+    orden = np.lexsort((df['fecha'].to_numpy(), codigos))
+    codigos = codigos[orden]
+    digitos = digitos[orden]
+    
+    posiciones = len(COLUMNAS_DIGITOS)
+    indices = []
+    for i, lag in enumerate(lags):
+        # Pares (t - lag, t) que pertenecen al mismo grupo
+        mismo_grupo = np.flatnonzero(codigos[lag:] == codigos[:len(codigos) - lag]) + lag
+        base = (codigos[mismo_grupo, None] * posiciones + np.arange(posiciones)) * len(lags) + i
+        indices.append(((base * 10 + digitos[mismo_grupo - lag]) * 10 + digitos[mismo_grupo]).ravel())
+    
+    tamaño = len(claves) * posiciones * len(lags) * 100
+    conteos = np.bincount(np.concatenate(indices), minlength=tamaño)
+    
+    return claves, conteos.reshape(len(claves), posiciones, len(lags), 10, 10)
+
+def prueba_independencia(conteos):
+    """
+    Chi-cuadrado de independencia (dígito origen vs. destino) de cada matriz.
+    
+    Trabaja sobre cualquier arreglo (..., 10, 10) a la vez. Las filas y
+    columnas sin observaciones no cuentan en los grados de libertad.
+    
+    Args:
+        conteos: Matrices de transición de forma (..., 10, 10)
+    
+    Returns:
+        tuple: (transiciones, chi2, grados, p_valores) con la forma de las
+               dimensiones iniciales
+    """
+    conteos = np.asarray(conteos, dtype=np.float64)
+    filas = conteos.sum(axis=-1)
+    columnas = conteos.sum(axis=-2)
+    total = filas.sum(axis=-1)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        esperados = filas[..., :, None] * columnas[..., None, :] / total[..., None, None]
+        chi2 = np.where(esperados > 0, (conteos - esperados) ** 2 / esperados, 0).sum(axis=(-2, -1))
+    
+    grados = np.maximum((filas > 0).sum(axis=-1) - 1, 0) * np.maximum((columnas > 0).sum(axis=-1) - 1, 0)
+    p_valores = np.where(grados > 0, stats.chi2.sf(chi2, np.maximum(grados, 1)), np.nan)
+    
+    return total.astype(np.int64), chi2, grados, p_valores
+
+def independencia_transiciones(claves, conteos, lags, alfa=0.05):
+    """
+    Pruebas de independencia de las matrices con corrección de Benjamini-Hochberg.
+    
+    Args:
+        claves: Claves de los grupos (ver conteos_transicion)
+        conteos: Matriz (grupos, 4, rezagos, 10, 10)
+        lags: Rezagos de la tercera dimensión de conteos
+        alfa: Nivel de significancia de la corrección
+    
+    Returns:
+        DataFrame: Una fila por grupo, posición y rezago con transiciones,
+                   chi2, grados, p_valor, p_bh y rechazo_bh
+    """
+    transiciones, chi2, grados, p_valores = prueba_independencia(conteos)
+    por_grupo = len(COLUMNAS_DIGITOS) * len(lags)
+    
+    validos = ~np.isnan(p_valores.ravel())
+    p_bh = np.full(p_valores.size, np.nan)
+    rechazo_bh = np.zeros(p_valores.size, dtype=bool)
+    if validos.any():
+        rechazo_bh[validos], p_bh[validos], _, _ = multipletests(p_valores.ravel()[validos], alpha=alfa, method='fdr_bh')
+    
+    tabla = claves.repeat(por_grupo).to_frame(index=False)
+    tabla['posicion'] = np.tile(np.repeat(COLUMNAS_DIGITOS, len(lags)), len(claves))
+    tabla['lag'] = np.tile(lags, len(claves) * len(COLUMNAS_DIGITOS))
+    
+    return tabla.assign(
+        transiciones=transiciones.ravel(),
+        chi2=chi2.ravel(),
+        grados=grados.ravel(),
+        p_valor=p_valores.ravel(),
+        p_bh=p_bh,
+        rechazo_bh=rechazo_bh
+    )
+
+class MatricesTransicion:
+    """
+    Matrices de transición de dígitos que se actualizan sorteo a sorteo.
+    
+    Guarda los conteos (grupos, 4, rezagos, 10, 10) y, por grupo, los
+    dígitos de los últimos max(lags) sorteos. Cada sorteo nuevo suma sus
+    4 × rezagos transiciones con un solo np.add.at.
+    """
+    
+    def __init__(self, lags=(1,)):
+        self.lags = list(lags)
+        self.claves = []
+        self.nombres = ['grupo']
+        self.conteos = np.zeros((0, len(COLUMNAS_DIGITOS), len(self.lags), 10, 10), dtype=np.int64)
+        self.recientes = {}
+    
+    @classmethod
+    def desde_historia(cls, df, lags=(1,), grupo=None):
+        """
+        Crea las matrices con la historia ya cargada (cálculo vectorizado).
+        """
+        matrices = cls(lags)
+        claves, matrices.conteos = conteos_transicion(df, matrices.lags, grupo)
+        matrices.claves = list(claves)
+        matrices.nombres = list(claves.names)
+        
+        # Dígitos de los últimos sorteos de cada grupo, del más antiguo al más reciente
+        codigos, _ = _claves_grupo(df, grupo)
+        orden = np.lexsort((df['fecha'].to_numpy(), codigos))
+        digitos = matriz_digitos(df['número'].to_numpy()[orden]).astype(np.int64)
+        fin = np.searchsorted(codigos[orden], np.arange(len(claves)), side='right')
+        inicio = np.r_[0, fin[:-1]]
+        
+        for clave, desde, hasta in zip(matrices.claves, np.maximum(inicio, fin - max(matrices.lags)), fin):
+            matrices.recientes[clave] = digitos[desde:hasta]
+        
+        return matrices
+    
+    def agregar(self, numero, grupo='total'):
+        """
+        Suma las transiciones de un sorteo nuevo (posterior a los del grupo).
+        
+        Args:
+            numero: Número ganador
+            grupo: Clave del grupo (la de desde_historia; 'total' sin grupos)
+        """
+        if grupo not in self.recientes:
+            self.claves.append(grupo)
+            self.recientes[grupo] = np.empty((0, len(COLUMNAS_DIGITOS)), dtype=np.int64)
+            self.conteos = np.concatenate([self.conteos, np.zeros((1,) + self.conteos.shape[1:], dtype=np.int64)])
+        
+        g = self.claves.index(grupo)
+        digitos = matriz_digitos([numero])[0].astype(np.int64)
+        recientes = self.recientes[grupo]
+        
+        # Transiciones (posición, rezago, origen, destino) de los rezagos con historia suficiente
+        disponibles = [(i, lag) for i, lag in enumerate(self.lags) if lag <= len(recientes)]
+        if disponibles:
+            rezagos = np.repeat([i for i, _ in disponibles], len(COLUMNAS_DIGITOS))
+            origenes = np.concatenate([recientes[-lag] for _, lag in disponibles])
+            posiciones = np.tile(np.arange(len(COLUMNAS_DIGITOS)), len(disponibles))
+            np.add.at(self.conteos[g], (posiciones, rezagos, origenes, digitos[posiciones]), 1)
+        
+        self.recientes[grupo] = np.vstack([recientes, digitos])[-max(self.lags):]
+    
+    def pruebas(self, alfa=0.05):
+        """
+        Pruebas de independencia de las matrices actuales (ver independencia_transiciones).
+        """
+        claves = pd.Index(self.claves).set_names(self.nombres)
+        return independencia_transiciones(claves, self.conteos, self.lags, alfa)
+
+# Compartido entre sesiones: se construye una vez por versión del dataset
+obtener_transiciones = cache_por_version(conteos_transicion)